@@ -0,0 +1,206 @@
+import gzip
+import io
+import logging
+import queue
+import tarfile
+import threading
+import time
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Optional, Iterator, Tuple, Callable
+
+try:
+    import py7zr
+except ImportError:  # optional: .7z bundles are only read when py7zr is installed
+    py7zr = None
+
+logger = logging.getLogger(__name__)
+
+# Longest suffixes first, '.tar.gz' must win over '.gz'
+ARCHIVE_SUFFIXES = ('.tar.gz', '.tgz', '.zip', '.gz') + (('.7z',) if py7zr is not None else ())
+REPORT_SUFFIX = '.txt'
+
+Member = Tuple[str, bytes, Optional[float]]
+
+# .7z members decompressed ahead of the reader
+SEVEN_ZIP_READ_AHEAD = 2
+
+_END = object()
+
+
+def archive_kind(file_path) -> Optional[str]:
+    """The archive suffix of file_path (one of ARCHIVE_SUFFIXES), or None for a plain file"""
+    name = str(file_path).lower()
+    for suffix in ARCHIVE_SUFFIXES:
+        if name.endswith(suffix):
+            return suffix
+    return None
+
+
+def member_path(archive_path: Path, member_name: str) -> Path:
+    """Path an archive member is known by: the archive path followed by the member's path inside it"""
+    return Path(archive_path).joinpath(*PurePosixPath(member_name.replace('\\', '/')).parts)
+
+
+def _is_report(name: str) -> bool:
+    return name.lower().endswith(REPORT_SUFFIX)
+
+
+class _MemberWriter:
+    """py7zr output for one .7z member, passed on to the reader once it is complete"""
+
+    def __init__(self, factory: '_MemberFactory', name: str):
+        self.factory = factory
+        self.name = name
+        self.buffer = io.BytesIO()
+        self.complete = False
+
+    def write(self, data) -> int:
+        return self.buffer.write(data)
+
+    def read(self, size: Optional[int] = None) -> bytes:
+        return self.buffer.read(size)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self.buffer.seek(offset, whence)
+
+    def flush(self) -> None:
+        pass
+
+    def size(self) -> int:
+        return self.buffer.getbuffer().nbytes
+
+    def close(self) -> None:
+        # py7zr 1.1+ calls this when the member is done (not after a CRC error)
+        self.factory.finish(self)
+
+
+class _MemberFactory:
+    """py7zr writer factory that hands each member over as soon as it is complete"""
+
+    def __init__(self, hand_over: Callable[[str, bytes], None]):
+        self.hand_over = hand_over
+        self.current: Optional[_MemberWriter] = None
+
+    def create(self, filename: str) -> _MemberWriter:
+        # Members are written one after the other: a new one means the last one is done
+        if self.current is not None:
+            self.finish(self.current)
+        self.current = _MemberWriter(self, filename)
+        return self.current
+
+    def finish(self, writer: _MemberWriter) -> None:
+        if writer is self.current:
+            self.current = None
+        if not writer.complete:
+            writer.complete = True
+            data, writer.buffer = writer.buffer.getvalue(), None
+            self.hand_over(writer.name, data)
+
+
+def _iter_7z(data: bytes, keep: Callable[[str], bool]) -> Iterator[Member]:
+    """Members of a .7z that keep() accepts, decompressed in one pass
+
+    py7zr extracts through a callback interface, so it runs on a thread of its own and
+    hands each member over through a queue of SEVEN_ZIP_READ_AHEAD; the members are not
+    all held in memory at once. Errors from py7zr are raised here, in the reader.
+    """
+    with py7zr.SevenZipFile(io.BytesIO(data), mode='r') as archive:
+        infos = {info.filename: info for info in archive.list()
+                 if not info.is_directory and keep(info.filename)}
+        if not infos:
+            return
+        if hasattr(archive, 'readall'):
+            # py7zr before 1.0 has no writer factories; readall() is a single pass too
+            for name, content in archive.readall().items():
+                if name in infos:
+                    yield name, content.read(), _7z_mtime(infos[name])
+            return
+        members: 'queue.Queue' = queue.Queue(maxsize=SEVEN_ZIP_READ_AHEAD)
+        abandoned = threading.Event()
+
+        def hand_over(item) -> None:
+            while not abandoned.is_set():
+                try:
+                    members.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def extract() -> None:
+            factory = _MemberFactory(lambda name, content: hand_over((name, content)))
+            try:
+                archive.extract(targets=list(infos), factory=factory)
+                if factory.current is not None:
+                    factory.finish(factory.current)
+                hand_over(_END)
+            except BaseException as e:
+                hand_over(e)
+
+        extractor = threading.Thread(target=extract, name='7z-extract', daemon=True)
+        extractor.start()
+        try:
+            while True:
+                item = members.get()
+                if item is _END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                name, content = item
+                if name in infos:
+                    yield name, content, _7z_mtime(infos[name])
+        finally:
+            # The reader may stop early (read_report found its member): let the extractor finish
+            abandoned.set()
+            extractor.join()
+
+
+def _7z_mtime(info) -> Optional[float]:
+    modified = getattr(info, 'creationtime', None)
+    return modified.timestamp() if modified else None
+
+
+def archive_members(archive_path: Path, data: bytes, wanted: Optional[Path] = None) -> Iterator[Member]:
+    """Yield (member name, bytes, mtime) for each report inside an archive held in memory
+
+    Members are decompressed in one pass and nothing is written to disk. mtime is the
+    member's own timestamp where the format stores one, else None. wanted limits it to
+    the report member_path() names so. Raises the format's own errors
+    (zipfile.BadZipFile, tarfile.TarError, OSError, EOFError, py7zr's) on damaged archives.
+    """
+    kind = archive_kind(archive_path)
+
+    def skip(name: str) -> bool:
+        return not _is_report(name) or (wanted is not None and member_path(archive_path, name) != Path(wanted))
+    if kind == '.zip':
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or skip(info.filename):
+                    continue
+                yield info.filename, archive.read(info), time.mktime(info.date_time + (0, 0, -1))
+    elif kind in ('.tar.gz', '.tgz'):
+        # Stream mode: one forward pass over the decompressed tar
+        with tarfile.open(fileobj=io.BytesIO(data), mode='r|*') as archive:
+            for info in archive:
+                if not info.isfile() or skip(info.name):
+                    continue
+                yield info.name, archive.extractfile(info).read(), float(info.mtime)
+    elif kind == '.gz':
+        name = Path(archive_path).name[:-3]
+        if not skip(name):
+            yield name, gzip.decompress(data), None
+    elif kind == '.7z':
+        yield from _iter_7z(data, lambda name: not skip(name))
+
+
+def read_report(file_path: Path) -> bytes:
+    """Bytes of a report, loose or inside a bundle (named as member_path() names it); only that member is decompressed"""
+    file_path = Path(file_path)
+    if file_path.is_file():
+        return file_path.read_bytes()
+    for archive_path in file_path.parents:
+        if archive_kind(archive_path) and archive_path.is_file():
+            for name, data, mtime in archive_members(archive_path, archive_path.read_bytes(), wanted=file_path):
+                return data
+            break
+    raise FileNotFoundError(f"No such report: {file_path}")
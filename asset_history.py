@@ -0,0 +1,228 @@
+import json
+import logging
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, List, Iterable, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: without pyarrow no history is kept
+    pa = pq = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from fleet_table import FLEET_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_FOLDER = Path('.asset_history')
+INDEX_FILE = 'index.jsonl'
+# Held while a writer compares hashes and appends, so two sessions recording the same change write it once
+LOCK_FILE = 'index.lock'
+
+# Fleet table columns kept in the history. A new row is written when any of them but
+# last_modified changes, so a report rewritten with the same content adds nothing.
+HISTORY_COLUMNS = ['computer_name', 'ip_address', 'mac_address', 'os_version', 'os_family', 'os_language',
+                   'os_activation', 'manufacturer', 'model', 'serial_number', 'bios_version', 'cpu', 'gpu', 'ram_gb',
+                   'storage_total_gb', 'c_free_gb', 'anydesk_id', 'user_email', 'last_modified']
+_HASHED_COLUMNS = [column for column in HISTORY_COLUMNS if column != 'last_modified']
+
+# (recorded at, part file relative to the history folder or None for a removal, row hash)
+Change = Tuple[str, Optional[str], Optional[int]]
+
+
+def _timestamp(moment: datetime) -> str:
+    # Fixed width, so index timestamps compare as strings
+    return moment.isoformat(timespec='microseconds')
+
+
+@contextmanager
+def _locked(lock_file: Path):
+    """Exclusive lock on lock_file, between processes and between instances in one process"""
+    with open(lock_file, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    # Gives up after 10 tries, a second apart
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class AssetHistory:
+    """Append-only Parquet history of the typed fields of every asset
+
+    Rows live in date partitions, date=YYYY-MM-DD/part-*.parquet, one part per refresh
+    that changed something and holding only the assets that changed. index.jsonl logs
+    which part holds each asset's versions, so a query opens only the parts it needs:
+    the ones with that asset for series(), the ones with each asset's last version
+    before the cut-off for snapshot().
+
+    Every dashboard session and fleet_snapshot.py run has its own instance. Before
+    comparing hashes, record() takes in the index lines others appended since, under
+    a lock file, so a change they already recorded is not written again.
+    """
+
+    def __init__(self, folder: Path = DEFAULT_HISTORY_FOLDER):
+        self.folder = Path(folder)
+        self.index_file = self.folder / INDEX_FILE
+        # Asset name -> its changes, oldest first
+        self.changes: Dict[str, List[Change]] = {}
+        # Bytes of index.jsonl taken in so far
+        self._offset = 0
+        if pq is None:
+            logger.info("pyarrow is not installed, asset history is disabled")
+            return
+        self._load()
+
+    @property
+    def available(self) -> bool:
+        return pq is not None
+
+    def _load(self) -> None:
+        """Take in the index lines appended since the last call, by this instance or another"""
+        try:
+            with open(self.index_file, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < self._offset:
+                    # The history was deleted and started again
+                    self.changes, self._offset = {}, 0
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning(f"Cannot read asset history index {self.index_file}: {e}")
+            return
+        # A line still being written is taken in on a later call
+        end = data.rfind(b'\n') + 1
+        self._offset += end
+        for line in data[:end].decode('utf-8', errors='replace').splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash; its part file is simply never read
+                logger.warning(f"Skipping damaged line in {self.index_file}")
+                continue
+            self.changes.setdefault(entry['name'], []).append((entry['at'], entry.get('file'), entry.get('hash')))
+
+    def _latest_hash(self, name: str) -> Optional[int]:
+        changes = self.changes.get(name)
+        return changes[-1][2] if changes else None
+
+    def record(self, table: pd.DataFrame, removed: Iterable[str] = (), complete: bool = False,
+               now: Optional[datetime] = None) -> int:
+        """Append the rows of a fleet table whose fields changed since their last version
+
+        table is indexed by asset name (see fleet_table.build_fleet_table) and may hold
+        only the assets that were touched. removed names assets that are gone; with
+        complete=True, every known asset missing from table counts as removed too.
+        Returns the number of rows written.
+        """
+        if pq is None:
+            return 0
+        categories = [column for column in HISTORY_COLUMNS if FLEET_COLUMNS[column] == 'category']
+        frame = table[HISTORY_COLUMNS].astype({column: 'object' for column in categories})
+        hashes = [int(h) for h in pd.util.hash_pandas_object(frame[_HASHED_COLUMNS], index=False)]
+        self.folder.mkdir(parents=True, exist_ok=True)
+        with _locked(self.folder / LOCK_FILE):
+            self._load()
+            return self._append(frame, hashes, removed, complete, now or datetime.now())
+
+    def _append(self, frame: pd.DataFrame, hashes: List[int], removed: Iterable[str], complete: bool,
+                now: datetime) -> int:
+        """The compare-and-append part of record(), under the lock with the index up to date"""
+        recorded_at = _timestamp(now)
+        changed = [i for i, (name, row_hash) in enumerate(zip(frame.index, hashes)) if self._latest_hash(name) != row_hash]
+
+        gone = set(removed)
+        if complete:
+            gone.update(name for name in self.changes if name not in frame.index)
+        # Only assets whose last change is not already a removal
+        gone = sorted(name for name in gone if self._latest_hash(name) is not None)
+
+        entries = []
+        if changed:
+            rows = frame.iloc[changed].reset_index(names='name')
+            rows.insert(1, 'recorded_at', pd.Timestamp(now))
+            part = self.folder / f"date={now:%Y-%m-%d}" / f"part-{now:%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+            part.parent.mkdir(parents=True, exist_ok=True)
+            # The part is complete on disk before the index points at it
+            pq.write_table(pa.Table.from_pandas(rows, preserve_index=False), part)
+            file = part.relative_to(self.folder).as_posix()
+            entries += [{'name': str(frame.index[i]), 'at': recorded_at, 'file': file, 'hash': hashes[i]} for i in changed]
+        entries += [{'name': name, 'at': recorded_at} for name in gone]
+        if not entries:
+            return 0
+
+        with open(self.index_file, 'ab') as f:
+            # After a line cut short by a crash, start on a line of its own
+            lead = '\n' if f.tell() > self._offset else ''
+            f.write((lead + ''.join(json.dumps(entry) + '\n' for entry in entries)).encode('utf-8'))
+        self._load()
+        logger.info(f"Asset history: {len(changed)} changed, {len(gone)} removed")
+        return len(changed)
+
+    def _read(self, names_by_file: Dict[str, List[str]]) -> pd.DataFrame:
+        frames = []
+        for file, names in names_by_file.items():
+            try:
+                frames.append(pq.read_table(self.folder / file, filters=[('name', 'in', names)]).to_pandas())
+            except (OSError, pa.ArrowException) as e:
+                logger.warning(f"Cannot read asset history part {file}: {e}")
+        if not frames:
+            return pd.DataFrame(columns=['name', 'recorded_at'] + HISTORY_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def versions(self, name: str) -> int:
+        """How many versions of an asset the history holds"""
+        return sum(1 for change in self.changes.get(name, []) if change[1])
+
+    def series(self, name: str) -> pd.DataFrame:
+        """Every recorded version of one asset, oldest first"""
+        if pq is None:
+            return self._read({})
+        files = dict.fromkeys(change[1] for change in self.changes.get(name, []) if change[1])
+        history = self._read({file: [name] for file in files})
+        return history.sort_values('recorded_at', ignore_index=True)
+
+    def snapshot(self, at: Optional[datetime] = None) -> pd.DataFrame:
+        """The fleet as it stood at a point in time (default: now), one row per asset indexed by name"""
+        if pq is None:
+            return self._read({}).set_index('name')
+        cutoff = _timestamp(at or datetime.now())
+        names_by_file: Dict[str, List[str]] = {}
+        for name, changes in self.changes.items():
+            latest = None
+            for change in changes:
+                if change[0] > cutoff:
+                    break
+                latest = change
+            if latest is not None and latest[1]:
+                names_by_file.setdefault(latest[1], []).append(name)
+        return self._read(names_by_file).set_index('name')
+
+    def summary(self) -> str:
+        rows = sum(self.versions(name) for name in self.changes)
+        return f"{len(self.changes)} assets, {rows} versions"
@@ -0,0 +1,290 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Tuple
+
+from asset_archive import ARCHIVE_SUFFIXES, REPORT_SUFFIX, archive_kind, archive_members, member_path
+from asset_parser import AssetParser
+from parallel_parser import map_files, map_files_guarded, parse_prefetched, default_workers, PARALLEL_MIN_FILES
+from parse_cache import ParseCache, file_digest
+from report_formats import FormatStats, GENERIC_FORMAT
+
+logger = logging.getLogger(__name__)
+
+# Reads kept in flight by the prefetcher; SMB latency is hidden by having several outstanding
+DEFAULT_PREFETCH_THREADS = 8
+# Trust an unchanged directory listing (same mtime and entry count) for at most this long;
+# reports rewritten in place do not touch the directory mtime, so a full stat pass is still due now and then
+DEFAULT_LISTING_TTL = 300.0
+# Loose reports and the report bundles read in place
+REPORT_SUFFIXES = (REPORT_SUFFIX,) + ARCHIVE_SUFFIXES
+
+
+@dataclass(frozen=True)
+class ScannedFile:
+    """A report found by the folder scan, with the metadata of its directory entry"""
+    path: Path
+    st_size: int
+    st_mtime_ns: int
+
+    @property
+    def st_mtime(self) -> float:
+        # Same rounding as os.stat_result.st_mtime
+        seconds, nanoseconds = divmod(self.st_mtime_ns, 10 ** 9)
+        return seconds + nanoseconds * 1e-9
+
+
+@dataclass
+class IngestStats:
+    """Where the time of one load went: listing, waiting on reads, parsing"""
+    files: int = 0
+    cached: int = 0
+    parsed: int = 0
+    quarantined: int = 0
+    archive_members: int = 0
+    listing_reused: bool = False
+    bytes_read: int = 0
+    scan_seconds: float = 0.0
+    read_seconds: float = 0.0
+    io_wait_seconds: float = 0.0
+    parse_cpu_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    # Reports parsed (not cached) in this load and their parse CPU time, per report format
+    formats: FormatStats = field(default_factory=FormatStats)
+
+    def summary(self) -> str:
+        listing = 'listing reused' if self.listing_reused else f"scan {self.scan_seconds:.2f}s"
+        archives = f", {self.archive_members} from archives" if self.archive_members else ''
+        return (f"{self.files} files ({self.cached} cached, {self.parsed} parsed{archives}), {listing}, "
+                f"I/O wait {self.io_wait_seconds:.2f}s, parse CPU {self.parse_cpu_seconds:.2f}s, "
+                f"{self.bytes_read / 2 ** 20:.1f} MB read")
+
+
+class FolderScanner:
+    """Lists the reports of a folder with os.scandir, reusing the entries' metadata
+
+    On Windows the size and mtime come with the directory listing itself, so a whole
+    share is enumerated in a few round trips. When the directory mtime and the number
+    of entries are unchanged since the last scan (and that scan is younger than
+    listing_ttl), the previous metadata is reused without touching the files.
+    """
+
+    def __init__(self, folder: Path, suffixes: Tuple[str, ...] = REPORT_SUFFIXES, listing_ttl: float = DEFAULT_LISTING_TTL):
+        self.folder = Path(folder)
+        self.suffixes = tuple(suffix.lower() for suffix in suffixes)
+        self.listing_ttl = listing_ttl
+        self._signature: Optional[Tuple[int, int]] = None
+        self._scanned_at = 0.0
+        self._files: List[ScannedFile] = []
+        self.reused = False
+
+    def scan(self, force: bool = False) -> List[ScannedFile]:
+        """Return the folder's reports sorted by name"""
+        folder_mtime_ns = os.stat(self.folder).st_mtime_ns
+        with os.scandir(self.folder) as it:
+            entries = [entry for entry in it if entry.name.lower().endswith(self.suffixes)]
+        signature = (folder_mtime_ns, len(entries))
+        self.reused = (not force and signature == self._signature
+                       and time.monotonic() - self._scanned_at < self.listing_ttl)
+        if self.reused:
+            return self._files
+
+        files = []
+        for entry in entries:
+            try:
+                if not entry.is_file():
+                    continue
+                stat_result = entry.stat()
+            except OSError as e:
+                logger.warning(f"Skipping {entry.path}: {e}")
+                continue
+            files.append(ScannedFile(Path(entry.path), stat_result.st_size, stat_result.st_mtime_ns))
+        files.sort(key=lambda f: f.path.name)
+        self._signature, self._scanned_at, self._files = signature, time.monotonic(), files
+        return files
+
+
+def scanned_files(paths: Iterable[Path]) -> List[ScannedFile]:
+    """ScannedFiles for an explicit list of paths (one stat each); unreadable paths are skipped"""
+    files = []
+    for file_path in paths:
+        try:
+            stat_result = os.stat(file_path)
+        except OSError as e:
+            logger.error(f"Cannot stat asset file {file_path}: {e}")
+            continue
+        files.append(ScannedFile(Path(file_path), stat_result.st_size, stat_result.st_mtime_ns))
+    return files
+
+
+def _read(file: ScannedFile) -> Tuple[Optional[bytes], float]:
+    t0 = time.perf_counter()
+    try:
+        with open(file.path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        logger.error(f"Cannot read asset file {file.path}: {e}")
+        data = None
+    return data, time.perf_counter() - t0
+
+
+def prefetch(files: List[ScannedFile], stats: IngestStats,
+             threads: int = DEFAULT_PREFETCH_THREADS) -> Iterator[Tuple[str, bytes, float]]:
+    """Yield (path, data, mtime) for files in order, reading up to 2 x threads files ahead
+
+    Time spent blocked on a read that has not finished yet is added to stats.io_wait_seconds;
+    unreadable files are skipped.
+    """
+    if not files:
+        return
+    window = max(1, threads) * 2
+    with ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix='prefetch') as executor:
+        futures = [executor.submit(_read, file) for file in files[:window]]
+        for n, file in enumerate(files):
+            t0 = time.perf_counter()
+            data, read_seconds = futures[n].result()
+            stats.io_wait_seconds += time.perf_counter() - t0
+            futures[n] = None
+            if n + window < len(files):
+                futures.append(executor.submit(_read, files[n + window]))
+            stats.read_seconds += read_seconds
+            if data is None:
+                continue
+            stats.bytes_read += len(data)
+            yield str(file.path), data, file.st_mtime
+
+
+Entry = Tuple[Path, Optional[Dict[str, Any]]]
+
+
+def _expand_archives(items: Iterator[Tuple[str, bytes, float]], archives: Dict[str, Tuple[str, List[str]]],
+                     stats: IngestStats) -> Iterator[Tuple[str, bytes, float]]:
+    """Pass loose reports through and replace each archive by its members, decompressed one by one
+
+    archives is filled in as a side effect: archive path -> (content digest, member paths).
+    """
+    for item in items:
+        name, data, mtime = item
+        if archive_kind(name) is None:
+            yield item
+            continue
+        members: List[str] = []
+        archives[name] = (file_digest(data), members)
+        try:
+            for member_name, member_data, member_mtime in archive_members(Path(name), data):
+                path = str(member_path(Path(name), member_name))
+                members.append(path)
+                stats.archive_members += 1
+                yield path, member_data, member_mtime if member_mtime is not None else mtime
+        except Exception as e:
+            # Damaged or still uploading: keep what was read, the archive is retried once it changes
+            logger.error(f"Cannot read archive {name} past {len(members)} reports: {e}")
+
+
+def parse_scanned(cache: ParseCache, parser: AssetParser, files: List[ScannedFile], stats: Optional[IngestStats] = None,
+                  workers: Optional[int] = None, chunk_size: Optional[int] = None, budget: Optional[float] = None,
+                  prefetch_threads: int = DEFAULT_PREFETCH_THREADS,
+                  min_files: int = PARALLEL_MIN_FILES) -> List[Entry]:
+    """(report path, asset) pairs for the scanned files, in order: cached ones from the cache, the rest read and parsed
+
+    Archives are expanded in place into one pair per report inside them, named by
+    member_path(). Reads are prefetched by a thread pool while parsing runs. With a
+    per-file time budget every file goes through the guarded worker pool, whatever the
+    batch size, so one pathological report cannot hang the caller. Without one, small
+    batches are parsed in this process and large ones (or archives) over a process pool.
+    Loose files over budget are quarantined, archive members over budget are left out of
+    the archive. Quarantined files come back with a None asset.
+    """
+    stats = stats if stats is not None else IngestStats()
+    results: List[Any] = [None] * len(files)
+    pending: List[Tuple[int, ScannedFile]] = []
+    for i, file in enumerate(files):
+        if cache.quarantine_reason(file.path, file):
+            stats.quarantined += 1
+            continue
+        hit, asset = cache.lookup(file.path, file)
+        if hit:
+            results[i] = asset
+            stats.cached += 1
+        else:
+            pending.append((i, file))
+    stats.files += len(files)
+
+    if pending:
+        pending_files = [file for _, file in pending]
+        # Map each prefetched item back to its position, since unreadable files are dropped from the stream
+        positions = {str(file.path): (i, file) for i, file in pending}
+        archives: Dict[str, Tuple[str, List[str]]] = {}
+        items = _expand_archives(prefetch(pending_files, stats, prefetch_threads), archives, stats)
+        workers = workers or default_workers()
+        parsed: Dict[str, Tuple[Any, ...]] = {}
+        if budget:
+            names = []
+
+            def named(items):
+                for item in items:
+                    names.append(item[0])
+                    yield item
+            outputs, failures = map_files_guarded(parser, parse_prefetched, named(items), budget, workers)
+            for j, output in enumerate(outputs):
+                if j not in failures:
+                    parsed[names[j]] = output
+                elif names[j] in positions:
+                    i, file = positions[names[j]]
+                    cache.add_quarantine(file.path, file, failures[j])
+                    stats.quarantined += 1
+                else:
+                    logger.warning(f"Leaving {names[j]} out of its archive: {failures[j]}")
+                    stats.quarantined += 1
+        elif workers > 1 and (len(pending_files) >= min_files or any(archive_kind(f.path) for f in pending_files)):
+            # Archives only show their report count once expanded
+            items = list(items)
+            outputs = map_files(parser, parse_prefetched, items, workers, chunk_size, min_files)
+            parsed = {item[0]: output for item, output in zip(items, outputs)}
+        else:
+            parsed = {item[0]: parse_prefetched(parser, item) for item in items}
+
+        for name, (asset, digest, cpu_seconds) in parsed.items():
+            stats.parsed += 1
+            stats.parse_cpu_seconds += cpu_seconds
+            if asset:
+                stats.formats.record(asset.get('report_format', GENERIC_FORMAT), cpu_seconds)
+            if name in positions:
+                i, file = positions[name]
+                results[i] = asset
+                cache.store(file.path, file, None, asset, digest=digest)
+        for name, (digest, members) in archives.items():
+            i, file = positions[name]
+            # One cache entry per archive: its fingerprint decides whether any member is parsed again
+            results[i] = [[member, parsed[member][0]] for member in members if member in parsed]
+            cache.store(file.path, file, None, results[i], digest=digest)
+
+    entries: List[Entry] = []
+    for file, result in zip(files, results):
+        if archive_kind(file.path) is None:
+            entries.append((file.path, result))
+        elif result:
+            entries.extend((Path(member), asset) for member, asset in result)
+    return entries
+
+
+def load_folder(scanner: FolderScanner, cache: ParseCache, parser: AssetParser, force_scan: bool = False,
+                **options) -> Tuple[List[ScannedFile], List[Entry], IngestStats]:
+    """Scan a folder and return (files, (report path, asset) pairs, stats); options go to parse_scanned
+
+    force_scan stats every file even if the directory looks unchanged.
+    """
+    stats = IngestStats()
+    t0 = time.perf_counter()
+    files = scanner.scan(force=force_scan)
+    stats.scan_seconds = time.perf_counter() - t0
+    stats.listing_reused = scanner.reused
+    assets = parse_scanned(cache, parser, files, stats, **options)
+    stats.wall_seconds = time.perf_counter() - t0
+    logger.info(f"Ingest: {stats.summary()}")
+    if stats.formats:
+        logger.info(f"Report formats: {stats.formats.summary()}")
+    return files, assets, stats
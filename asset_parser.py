@@ -1,133 +1,372 @@
 import re
+import os
+import mmap
 import json
+import time
+import hashlib
 import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Iterable, Iterator, Union
 from datetime import datetime
 
+from asset_archive import archive_kind, archive_members, member_path, read_report
+from parse_profiler import ParseProfiler
+from report_formats import ReportFormat, FormatStats, REPORT_FORMATS, GENERIC_FORMAT, fingerprint
+
 logger = logging.getLogger(__name__)
 
+PARSER_ENGINES = ('regex', 'tokenizer')
+
+# Bump whenever the shape or content of the parsed asset dict changes, so cached parses are invalidated
+PARSER_VERSION = '6'
+
+# Multi-line sections a lazy parser leaves out until AssetParser.load_sections() asks for them
+LAZY_SECTIONS = ('bitlocker_status', 'installed_programs', 'adobe_autodesk', 'shared_folders', 'stored_credentials')
+
+DEFAULT_VALUE_PATTERN = r'[^\n\r]+'
+
+# Reports at least this big are memory-mapped instead of read into a bytes object
+MMAP_THRESHOLD = 256 * 1024
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+@contextmanager
+def open_report(file_path: Path) -> Iterator[Tuple[Buffer, os.stat_result]]:
+    """Yield a report's raw content and stat, with one open and one fstat; large files are memory-mapped"""
+    with open(file_path, 'rb') as f:
+        stat_result = os.fstat(f.fileno())
+        if stat_result.st_size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped, stat_result
+        else:
+            yield f.read(), stat_result
+
+
+def detect_encoding(data: Buffer) -> Tuple[Optional[str], int]:
+    """Return (encoding, BOM length) from the BOM or the NUL byte layout; None means UTF-8 or cp1252"""
+    head = data[:1024]
+    if head.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8', 3
+    if head.startswith(b'\xff\xfe'):
+        return 'utf-16-le', 2
+    if head.startswith(b'\xfe\xff'):
+        return 'utf-16-be', 2
+    # PowerShell output without a BOM: mostly-ASCII UTF-16 has a NUL in every other byte
+    half = len(head) // 2
+    if half >= 2:
+        even_nuls, odd_nuls = head[0::2].count(0), head[1::2].count(0)
+        if odd_nuls > half * 0.3 and even_nuls < half * 0.05:
+            return 'utf-16-le', 0
+        if even_nuls > half * 0.3 and odd_nuls < half * 0.05:
+            return 'utf-16-be', 0
+    return None, 0
+
+
+def decode_report(data: Buffer) -> Tuple[str, str]:
+    """Decode a report once and normalise line endings the way text-mode reads do; returns (text, encoding)"""
+    encoding, bom_length = detect_encoding(data)
+    view = memoryview(data)[bom_length:]
+    try:
+        if encoding:
+            text = str(view, encoding, 'replace')
+        else:
+            try:
+                encoding = 'utf-8'
+                text = str(view, encoding)
+            except UnicodeDecodeError:
+                encoding = 'cp1252'
+                text = str(view, encoding, 'replace')
+    finally:
+        view.release()
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text, encoding
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """Declarative description of one field in an asset report"""
+    name: str
+    labels: Tuple[str, ...] = ()
+    value: str = DEFAULT_VALUE_PATTERN
+    multiple: bool = False
+    extra_patterns: Tuple[str, ...] = ()
+
+    @property
+    def patterns(self) -> List[str]:
+        """Regex fallbacks in priority order, group 1 captures the value
+
+        The value is captured in a lookahead, so a single sweep goes on at the value itself:
+        after a label with an empty value, the label on the next line is still matched.
+        """
+        label_patterns = [re.escape(label).replace('\\ ', ' ') + r'[:\s]+(?=(' + self.value + '))' for label in self.labels]
+        return label_patterns + list(self.extra_patterns)
+
+
+# Fields extracted from every report. Labels are listed in priority order: the
+# first label that is present in the file wins, whatever its position.
+FIELD_SPECS = (
+    FieldSpec('computer_name', ('Computer Name', 'System Name', 'Hostname')),
+    FieldSpec('ip_address', ('IP Address', 'IPv4 Address', 'Network Address'), value=r'\d+\.\d+\.\d+\.\d+'),
+    FieldSpec('os_version', ('Operating System', 'OS Version', 'Windows Version')),
+    FieldSpec('manufacturer', ('Manufacturer', 'System Manufacturer', 'Computer Manufacturer')),
+    FieldSpec('model', ('Model', 'System Model', 'Computer Model')),
+    FieldSpec('processor', ('Processor', 'CPU', 'Central Processor')),
+    FieldSpec('memory', ('Total Physical Memory', 'RAM', 'Memory')),
+    FieldSpec('anydesk_id', ('AnyDesk ID', 'AnyDesk', 'Remote ID'), value=r'\d+'),
+    FieldSpec('user_email', ('User Email(s)', 'Email', 'User Account')),
+    FieldSpec('gpu', ('GPU', 'Graphics', 'Video Card')),
+    FieldSpec('bios_version', ('BIOS Version', 'BIOS')),
+    FieldSpec('windows_language', ('Windows Language', 'Language')),
+    FieldSpec('antivirus', ('Antivirus', 'Anti-virus')),
+    FieldSpec('office_version', ('Office Version', 'Microsoft Office')),
+    FieldSpec('os_activation', ('OS Activation', 'Windows Activation'), extra_patterns=(r'Licensed[:\s]*\n(.*)',)),
+    FieldSpec('network_mode', ('Network Mode', 'DHCP', 'IP Configuration')),
+    FieldSpec('pc_domain', ('PC Domain',)),
+    FieldSpec('os_install_date', ('OS Install Date', 'Original Install Date')),
+    FieldSpec('last_reboot_time', ('Last Reboot Time',)),
+    FieldSpec('system_uptime', ('System Uptime',)),
+    FieldSpec('monitor_model', ('Monitor Model',)),
+    FieldSpec('serial_number', ('Serial Number',)),
+    FieldSpec('dns_servers', ('DNS Servers',)),
+    FieldSpec('default_gateway', ('Default Gateway',)),
+    FieldSpec('winrm_command', extra_patterns=(r'(Enter-PSSession\s+[^\n\r]+)',)),
+    FieldSpec('mac_address', ('MAC Address',), value=r'[A-Fa-f0-9:-]{17}'),
+    FieldSpec('network_adapter', ('Network Adapter',), multiple=True),
+    FieldSpec('disk_drive', ('Disk Drive', 'Hard Disk', 'Storage Device'), multiple=True)
+)
+
+DEFAULT_FIELD_NAMES = frozenset(spec.name for spec in FIELD_SPECS)
+
+
+def _name_first_group(pattern: str, group_name: str) -> str:
+    """Turn the first capturing group of a pattern into a named group"""
+    i = 0
+    in_class = False
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            if char == ']':
+                in_class = False
+        elif char == '[':
+            in_class = True
+        elif char == '(' and not pattern.startswith('(?', i):
+            return f"{pattern[:i]}(?P<{group_name}>{pattern[i + 1:]}"
+        i += 1
+    raise ValueError(f"Pattern has no capturing group: {pattern}")
+
+
+class FieldMatcher:
+    """Compiles field specs into a single alternation regex swept once per file"""
+
+    def __init__(self, specs: Iterable[FieldSpec], flags: int = re.IGNORECASE | re.MULTILINE):
+        self.specs = {spec.name: spec for spec in specs}
+        self.multiple_fields = [name for name, spec in self.specs.items() if spec.multiple]
+        self._compiled = {
+            name: [re.compile(pattern, flags) for pattern in spec.patterns]
+            for name, spec in self.specs.items()
+        }
+
+        # Each (field, priority) pair becomes a named group; the match's lastgroup tells which one fired.
+        # Alternatives are anchored at the start of a (possibly indented or BOM-prefixed) line so the regex engine
+        # only has to try them where a label can begin.
+        self._groups = {}
+        alternatives = []
+        for name, spec in self.specs.items():
+            for priority, pattern in enumerate(spec.patterns):
+                group_name = f"f{len(self._groups)}"
+                self._groups[group_name] = (name, priority)
+                alternatives.append(_name_first_group(pattern, group_name))
+        self.combined = re.compile(r'^[ \t\ufeff]*(?:' + '|'.join(alternatives) + ')', flags)
+
+    def match(self, content: str) -> Dict[str, Any]:
+        """Match every field in one finditer sweep, keeping the highest priority hit per field"""
+        best = {}
+        found = {name: [] for name in self.multiple_fields}
+        for match in self.combined.finditer(content):
+            group_name = match.lastgroup
+            name, priority = self._groups[group_name]
+            value = match.group(group_name).strip()
+            if name in found:
+                found[name].append(value)
+            elif name not in best or priority < best[name][0]:
+                best[name] = (priority, value)
+        fields = {name: value for name, (priority, value) in best.items()}
+        fields.update(found)
+        return fields
+
+    def extract(self, content: str, field_name: str) -> Optional[str]:
+        """Search one field on its own, trying its precompiled patterns in priority order"""
+        for pattern in self._compiled.get(field_name, []):
+            match = pattern.search(content)
+            if match:
+                return match.group(1).strip()
+        return None
+
+    def extract_all(self, content: str, field_name: str) -> List[str]:
+        """Return every occurrence of a field, in pattern order"""
+        return [
+            match.group(1).strip()
+            for pattern in self._compiled.get(field_name, [])
+            for match in pattern.finditer(content)
+        ]
+
+
+class SectionIndex:
+    """Offsets of the '=== Title ===' sections and 'Label:' blocks of one report
+
+    A section or block starts on the line after its header and runs until the next blank
+    line or '===' header. Keys are lower-cased titles/labels; the first occurrence wins.
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+        self.spans: Dict[str, List[int]] = {}
+        self._open = None
+        self._in_section = False
+
+    @classmethod
+    def build(cls, content: str) -> 'SectionIndex':
+        """Index a whole report in a single pass over its lines"""
+        index = cls(content)
+        position = 0
+        for line in content.split('\n'):
+            end = position + len(line)
+            index.feed(line.strip(), end)
+            position = end + 1
+        return index
+
+    def feed(self, stripped: str, line_end: int) -> None:
+        """Account for the next line of the content, given stripped and with its end offset"""
+        if not stripped:
+            self._open = None
+            self._in_section = False
+            return
+        if stripped.startswith('===') and stripped.endswith('===') and len(stripped) > 6:
+            self._start(stripped.strip('=').strip().lower(), line_end + 1)
+            self._in_section = True
+            return
+        if self._open is not None:
+            self.spans[self._open][1] = line_end
+        # Inside '===' sections every line is 'Key: value', so empty values do not open blocks
+        if not self._in_section and stripped.endswith(':'):
+            self._start(stripped[:-1].strip().lower(), line_end + 1)
+
+    def _start(self, key: str, start: int) -> None:
+        if key in self.spans:
+            self._open = None
+        else:
+            self.spans[key] = [start, start]
+            self._open = key
+
+    def get(self, key: str) -> Optional[str]:
+        """Text of the section or block with this exact (case-insensitive) title"""
+        span = self.spans.get(key.lower())
+        return self.content[span[0]:span[1]] if span else None
+
+    def first(self, *keys: str) -> Optional[str]:
+        """Text of the first of several candidate titles that is present"""
+        for key in keys:
+            text = self.get(key)
+            if text is not None:
+                return text
+        return None
+
+    def find(self, prefix: str) -> Optional[str]:
+        """Text of the first section whose title starts with prefix, e.g. 'local disks'"""
+        prefix = prefix.lower()
+        for key, (start, end) in self.spans.items():
+            if key.startswith(prefix):
+                return self.content[start:end]
+        return None
+
+
 class AssetParser:
     """Parser for Windows PC asset data files"""
     
-    def __init__(self):
-        self.patterns = {
-            'computer_name': [
-                r'Computer Name[:\s]+([^\n\r]+)',
-                r'System Name[:\s]+([^\n\r]+)',
-                r'Hostname[:\s]+([^\n\r]+)'
-            ],
-            'ip_address': [
-                r'IP Address[:\s]+(\d+\.\d+\.\d+\.\d+)',
-                r'IPv4 Address[:\s]+(\d+\.\d+\.\d+\.\d+)',
-                r'Network Address[:\s]+(\d+\.\d+\.\d+\.\d+)'
-            ],
-            'os_version': [
-                r'Operating System[:\s]+([^\n\r]+)',
-                r'OS Version[:\s]+([^\n\r]+)',
-                r'Windows Version[:\s]+([^\n\r]+)'
-            ],
-            'manufacturer': [
-                r'Manufacturer[:\s]+([^\n\r]+)',
-                r'System Manufacturer[:\s]+([^\n\r]+)',
-                r'Computer Manufacturer[:\s]+([^\n\r]+)'
-            ],
-            'model': [
-                r'Model[:\s]+([^\n\r]+)',
-                r'System Model[:\s]+([^\n\r]+)',
-                r'Computer Model[:\s]+([^\n\r]+)'
-            ],
-            'processor': [
-                r'Processor[:\s]+([^\n\r]+)',
-                r'CPU[:\s]+([^\n\r]+)',
-                r'Central Processor[:\s]+([^\n\r]+)'
-            ],
-            'memory': [
-                r'Total Physical Memory[:\s]+([^\n\r]+)',
-                r'RAM[:\s]+([^\n\r]+)',
-                r'Memory[:\s]+([^\n\r]+)'
-            ],
-            'anydesk_id': [
-                r'AnyDesk ID[:\s]+(\d+)',
-                r'AnyDesk[:\s]+(\d+)',
-                r'Remote ID[:\s]+(\d+)'
-            ],
-            'user_email': [
-                r'User Email\(s\)[:\s]+([^\n\r]+)',
-                r'Email[:\s]+([^\n\r]+)',
-                r'User Account[:\s]+([^\n\r]+)'
-            ],
-            'gpu': [
-                r'GPU[:\s]+([^\n\r]+)',
-                r'Graphics[:\s]+([^\n\r]+)',
-                r'Video Card[:\s]+([^\n\r]+)'
-            ],
-            'bios_version': [
-                r'BIOS Version[:\s]+([^\n\r]+)',
-                r'BIOS[:\s]+([^\n\r]+)'
-            ],
-            'windows_language': [
-                r'Windows Language[:\s]+([^\n\r]+)',
-                r'Language[:\s]+([^\n\r]+)'
-            ],
-            'antivirus': [
-                r'Antivirus[:\s]+([^\n\r]+)',
-                r'Anti-virus[:\s]+([^\n\r]+)'
-            ],
-            'office_version': [
-                r'Office Version[:\s]+([^\n\r]+)',
-                r'Microsoft Office[:\s]+([^\n\r]+)'
-            ],
-            'os_activation': [
-                r'OS Activation[:\s]+([^\n\r]+)',
-                r'Windows Activation[:\s]+([^\n\r]+)',
-                r'Licensed[:\s]*\n(.*)'
-            ],
-            'network_mode': [
-                r'Network Mode[:\s]+([^\n\r]+)',
-                r'DHCP[:\s]+([^\n\r]+)',
-                r'IP Configuration[:\s]+([^\n\r]+)'
-            ],
-            'pc_domain': [
-                r'PC Domain[:\s]+([^\n\r]+)'
-            ],
-            'os_install_date': [
-                r'OS Install Date[:\s]+([^\n\r]+)',
-                r'Original Install Date[:\s]+([^\n\r]+)'
-            ],
-            'last_reboot_time': [
-                r'Last Reboot Time[:\s]+([^\n\r]+)'
-            ],
-            'system_uptime': [
-                r'System Uptime[:\s]+([^\n\r]+)'
-            ],
-            'monitor_model': [
-                r'Monitor Model[:\s]+([^\n\r]+)'
-            ],
-            'serial_number': [
-                r'Serial Number[:\s]+([^\n\r]+)'
-            ],
-            'dns_servers': [
-                r'DNS Servers[:\s]+([^\n\r]+)'
-            ],
-            'default_gateway': [
-                r'Default Gateway[:\s]+([^\n\r]+)'
-            ],
-            'winrm_command': [
-                r'(Enter-PSSession\s+[^\n\r]+)'
-            ]
+    def __init__(self, engine: str = 'regex', field_specs: Optional[Iterable[FieldSpec]] = None, profile: bool = False,
+                 lazy: bool = False, formats: bool = True):
+        if engine not in PARSER_ENGINES:
+            raise ValueError(f"Unknown parser engine: {engine}")
+        self.engine = engine
+        # Lazy mode leaves LAZY_SECTIONS out of the parse until load_sections() asks for them
+        self.lazy = lazy
+
+        self.field_specs = list(field_specs if field_specs is not None else FIELD_SPECS)
+        self.field_matcher = FieldMatcher(self.field_specs)
+        # Plain pattern strings per field, kept for callers that inspect or time them one by one
+        self.patterns = {spec.name: spec.patterns for spec in self.field_specs if not spec.multiple}
+
+        # Labels of the multi-line blocks, in priority order
+        self.block_labels = {
+            'software': ['Installed Programs', 'Installed Program', 'Software', 'Applications', 'Application'],
+            'shared_folders': ['Shared Folders'],
+            'bitlocker_status': ['Bitlocker Status'],
+            'stored_credentials': ['Stored Network Credentials', 'Network Credentials'],
+            'adobe_autodesk': ['Adobe/Autodesk']
+        }
+
+        # The tokenizer looks labels up directly; values must still have the spec's shape
+        self._token_index = self._build_token_index(self.field_specs)
+        self._value_shapes = {
+            spec.name: re.compile(spec.value)
+            for spec in self.field_specs
+            if spec.value != DEFAULT_VALUE_PATTERN
+        }
+
+        # Reports of a known layout (see report_formats.py) are read with only the labels that layout writes;
+        # the generic specs above are left for reports no fingerprint recognises
+        self.formats = formats
+        self.format_stats = FormatStats()
+        self._format_matchers = {}
+        self._format_token_indexes = {}
+        if formats:
+            for report_format in REPORT_FORMATS:
+                specs = self._format_specs(report_format)
+                self._format_matchers[report_format.name] = FieldMatcher(specs)
+                self._format_token_indexes[report_format.name] = self._build_token_index(specs)
+
+        # Opt-in instrumentation: per-pattern and per-method timings, see parse_profiler.py
+        self.profiler = ParseProfiler() if profile else None
+        if self.profiler is not None:
+            self.profiler.instrument(self)
+
+    @property
+    def cache_key(self) -> str:
+        """Identifies everything that influences the parser output: version, engine, lazy mode, field specs and formats"""
+        specs = repr(self.field_specs) + (repr(REPORT_FORMATS) if self.formats else '')
+        specs_digest = hashlib.sha1(specs.encode('utf-8')).hexdigest()[:12]
+        return f"{PARSER_VERSION}/{self.engine}{'+lazy' if self.lazy else ''}/{specs_digest}"
+
+    @staticmethod
+    def _build_token_index(specs: Iterable[FieldSpec]) -> Dict[str, Tuple[str, int]]:
+        return {
+            label.lower(): (spec.name, priority)
+            for spec in specs
+            for priority, label in enumerate(spec.labels)
         }
 
+    def _format_specs(self, report_format: ReportFormat) -> List[FieldSpec]:
+        """The field specs narrowed to the labels report_format writes; custom specs are left as they are"""
+        labels = dict(report_format.labels)
+        return [
+            replace(spec, labels=labels[spec.name], extra_patterns=())
+            if spec.name in labels and spec in FIELD_SPECS else spec
+            for spec in self.field_specs
+        ]
+
+    def detect_format(self, content: str) -> Optional[ReportFormat]:
+        """The known layout of a report, or None for the generic path (always None with formats off)"""
+        return fingerprint(content) if self.formats else None
+
     def extract_field(self, content: str, field_name: str) -> Optional[str]:
         """Extract a specific field from the content using regex patterns"""
-        patterns = self.patterns.get(field_name, [])
-        
-        for pattern in patterns:
-            match = re.search(pattern, content, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        
-        return None
+        return self.field_matcher.extract(content, field_name)
 
     def parse_memory_size(self, memory_str: str) -> Optional[float]:
         """Parse memory string and convert to GB"""
@@ -170,199 +409,171 @@ class AssetParser:
         
         return None
 
-    def parse_storage_info(self, content: str) -> List[Dict[str, Any]]:
-        """Parse storage/disk information from content including Italian format"""
+    def _parse_disk_line(self, line: str) -> Optional[Dict[str, Any]]:
+        """Parse one Local Disks line, e.g. 'C:  Total: 485637 MB, Free: 412269.2 MB, Type: SSD'"""
+        line = line.strip()
+        if not line or not (':' in line and 'Total:' in line and 'Free:' in line):
+            return None
+        # Extract drive letter, size, and optionally Type
+        drive_match = re.match(r'([A-Z]):.*?Total:\s*(\d+\.?\d*)\s*MB.*?Free:\s*(\d+\.?\d*)\s*MB(?:.*?Type:\s*([^\n\r]+))?', line, re.IGNORECASE)
+        if not drive_match:
+            return None
+        try:
+            drive_letter = drive_match.group(1)
+            total_mb = float(drive_match.group(2).replace(',', '.'))
+            free_mb = float(drive_match.group(3).replace(',', '.'))
+            drive_type = drive_match.group(4).strip() if drive_match.group(4) else ""
+        except Exception:
+            return None
+        
+        # Convert MB to GB
+        total_gb = total_mb / 1024
+        free_gb = free_mb / 1024
+        
+        type_str = f" ({drive_type})" if drive_type else ""
+        return {
+            'name': f"{drive_letter}: Drive{type_str} ({total_gb:.1f} GB)",
+            'size_gb': total_gb,
+            'free_space_gb': free_gb,
+            'drive_letter': drive_letter,
+            'type': drive_type
+        }
+
+    def _parse_disk_description(self, disk_info: str) -> Dict[str, Any]:
+        """Parse an older free-text disk description such as 'Disk Drive: Samsung 512 GB'"""
+        # Try to extract size information
+        size_gb = None
+        size_match = re.search(r'(\d+\.?\d*)\s*(GB|TB|MB)', disk_info, re.IGNORECASE)
+        if size_match:
+            size_value = float(size_match.group(1).replace(',', '.'))
+            unit = size_match.group(2).upper()
+            
+            if unit == 'TB':
+                size_gb = size_value * 1024
+            elif unit == 'GB':
+                size_gb = size_value
+            elif unit == 'MB':
+                size_gb = size_value / 1024
+        
+        return {
+            'name': disk_info,
+            'size_gb': size_gb,
+            'free_space_gb': None
+        }
+
+    def parse_storage_info(self, content: str, fields: Optional[Dict[str, Any]] = None, index: Optional[SectionIndex] = None,
+                           report_format: Optional[ReportFormat] = None) -> List[Dict[str, Any]]:
+        """Parse storage/disk information from content including Italian format
+
+        fields are the values already matched by the field spec sweep and index the
+        report's section index, if the caller has them, so nothing is searched twice.
+        """
         storage_devices = []
+        index = index or SectionIndex.build(content)
         
-        # Look for Local Disks section in the content
-        local_disks_pattern = r'=== Local Disks \(in MB\) ===(.*?)(?=\n\n|\n===|\Z)'
-        disks_match = re.search(local_disks_pattern, content, re.IGNORECASE | re.MULTILINE | re.DOTALL)
+        # Look for the Local Disks section, "(in MB)" or "(Space & Type)" depending on the script version
+        disks_section = index.get(report_format.disks_title) if report_format and report_format.disks_title else None
+        if disks_section is None:
+            disks_section = index.find('local disks')
         
-        if disks_match:
-            disks_section = disks_match.group(1)
+        if disks_section:
             # Parse each disk line: C:  Total: 485637 MB, Free: 412269.2 MB, Type: SSD
-            disk_lines = disks_section.strip().split('\n')
-            
-            for line in disk_lines:
-                line = line.strip()
-                if not line: continue
-                if ':' in line and 'Total:' in line and 'Free:' in line:
-                    # Extract drive letter, size, and optionally Type
-                    drive_match = re.match(r'([A-Z]):.*?Total:\s*(\d+\.?\d*)\s*MB.*?Free:\s*(\d+\.?\d*)\s*MB(?:.*?Type:\s*([^\n\r]+))?', line, re.IGNORECASE)
-                    if drive_match:
-                        try:
-                            drive_letter = drive_match.group(1)
-                            total_mb = float(drive_match.group(2).replace(',', '.'))
-                            free_mb = float(drive_match.group(3).replace(',', '.'))
-                            drive_type = drive_match.group(4).strip() if drive_match.group(4) else ""
-                            
-                            # Convert MB to GB
-                            total_gb = total_mb / 1024
-                            free_gb = free_mb / 1024
-                            
-                            type_str = f" ({drive_type})" if drive_type else ""
-                            storage_devices.append({
-                                'name': f"{drive_letter}: Drive{type_str} ({total_gb:.1f} GB)",
-                                'size_gb': total_gb,
-                                'free_space_gb': free_gb,
-                                'drive_letter': drive_letter,
-                                'type': drive_type
-                            })
-                        except Exception:
-                            pass
+            for line in disks_section.split('\n'):
+                device = self._parse_disk_line(line)
+                if device:
+                    storage_devices.append(device)
         
         # Fallback: Look for older disk drive patterns
         if not storage_devices:
-            disk_patterns = [
-                r'Disk Drive[:\s]+([^\n\r]+)',
-                r'Hard Disk[:\s]+([^\n\r]+)',
-                r'Storage Device[:\s]+([^\n\r]+)'
-            ]
-            
-            for pattern in disk_patterns:
-                matches = re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE)
-                for match in matches:
-                    disk_info = match.group(1).strip()
-                    
-                    # Try to extract size information
-                    size_gb = None
-                    size_match = re.search(r'(\d+\.?\d*)\s*(GB|TB|MB)', disk_info, re.IGNORECASE)
-                    if size_match:
-                        size_value = float(size_match.group(1).replace(',', '.'))
-                        unit = size_match.group(2).upper()
-                        
-                        if unit == 'TB':
-                            size_gb = size_value * 1024
-                        elif unit == 'GB':
-                            size_gb = size_value
-                        elif unit == 'MB':
-                            size_gb = size_value / 1024
-                    
-                    storage_devices.append({
-                        'name': disk_info,
-                        'size_gb': size_gb,
-                        'free_space_gb': None
-                    })
+            disk_drives = fields['disk_drive'] if fields is not None else self.field_matcher.extract_all(content, 'disk_drive')
+            storage_devices = [self._parse_disk_description(disk_info) for disk_info in disk_drives]
         
         return storage_devices
 
-    def parse_software_list(self, content: str) -> List[str]:
+    def _block_items(self, block: str, section: str) -> List[str]:
+        """Split the raw text of a multi-line block into its cleaned-up entries"""
+        items = []
+        # Adobe/Autodesk is a single semicolon separated list, the others are one entry per line
+        candidates = section.split(';') if block == 'adobe_autodesk' else section.split('\n')
+        for item in candidates:
+            item = item.strip()
+            if not item:
+                continue
+            if block == 'software':
+                keep = not item.startswith('-') and len(item) > 3
+            elif block == 'shared_folders':
+                keep = '->' in item
+            elif block == 'bitlocker_status':
+                keep = ':' in item
+            elif block == 'stored_credentials':
+                keep = not item.lower().startswith('no') and len(item) > 3
+            else:
+                keep = len(item) > 3
+            if keep:
+                items.append(item)
+        return items
+
+    def _parse_block(self, block: str, content: str, index: Optional[SectionIndex]) -> List[str]:
+        """Look a multi-line block up in the section index and split it into entries"""
+        index = index or SectionIndex.build(content)
+        section = index.first(*self.block_labels[block])
+        if section is None:
+            return []
+        return self._block_items(block, section)
+
+    def parse_software_list(self, content: str, index: Optional[SectionIndex] = None) -> List[str]:
         """Parse installed software list from content"""
-        software_list = []
-        
-        # Look for software/program sections
-        software_patterns = [
-            r'Installed Programs?[:\s]*\n(.*?)(?=\n\n|\Z)',
-            r'Software[:\s]*\n(.*?)(?=\n\n|\Z)',
-            r'Applications?[:\s]*\n(.*?)(?=\n\n|\Z)'
-        ]
-        
-        for pattern in software_patterns:
-            match = re.search(pattern, content, re.IGNORECASE | re.MULTILINE | re.DOTALL)
-            if match:
-                software_section = match.group(1)
-                # Split by lines and clean up
-                lines = software_section.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if line and not line.startswith('-') and len(line) > 3:
-                        software_list.append(line)
-                break
-        
-        return software_list
+        return self._parse_block('software', content, index)
 
-    def parse_shared_folders(self, content: str) -> List[str]:
+    def parse_shared_folders(self, content: str, index: Optional[SectionIndex] = None) -> List[str]:
         """Parse shared folders information"""
-        shared_folders = []
-        
-        # Look for shared folders section
-        shared_pattern = r'Shared Folders[:\s]*\n(.*?)(?=\n\n|\Z)'
-        match = re.search(shared_pattern, content, re.IGNORECASE | re.MULTILINE | re.DOTALL)
-        
-        if match:
-            shared_section = match.group(1)
-            lines = shared_section.split('\n')
-            for line in lines:
-                line = line.strip()
-                if line and '->' in line:
-                    shared_folders.append(line)
-        
-        return shared_folders
+        return self._parse_block('shared_folders', content, index)
 
-    def parse_bitlocker_status(self, content: str) -> List[str]:
+    def parse_bitlocker_status(self, content: str, index: Optional[SectionIndex] = None) -> List[str]:
         """Parse Bitlocker status information"""
-        bitlocker_status = []
-        pattern = r'Bitlocker Status[:\s]*\n(.*?)(?=\n\n|\n===|\Z)'
-        match = re.search(pattern, content, re.IGNORECASE | re.MULTILINE | re.DOTALL)
-        if match:
-             section = match.group(1)
-             for line in section.split('\n'):
-                 line = line.strip()
-                 if line and ':' in line:
-                      bitlocker_status.append(line)
-        return bitlocker_status
-
-    def parse_stored_credentials(self, content: str) -> List[str]:
+        return self._parse_block('bitlocker_status', content, index)
+
+    def parse_stored_credentials(self, content: str, index: Optional[SectionIndex] = None) -> List[str]:
         """Parse stored network credentials"""
-        credentials = []
-        
-        # Look for stored credentials section
-        cred_patterns = [
-            r'Stored Network Credentials[:\s]*\n(.*?)(?=\n\n|\Z)',
-            r'Network Credentials[:\s]*\n(.*?)(?=\n\n|\Z)'
-        ]
-        
-        for pattern in cred_patterns:
-            match = re.search(pattern, content, re.IGNORECASE | re.MULTILINE | re.DOTALL)
-            if match:
-                cred_section = match.group(1)
-                lines = cred_section.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if line and not line.lower().startswith('no') and len(line) > 3:
-                        credentials.append(line)
-                break
-        
-        return credentials
+        return self._parse_block('stored_credentials', content, index)
 
-    def parse_adobe_autodesk(self, content: str) -> List[str]:
+    def parse_adobe_autodesk(self, content: str, index: Optional[SectionIndex] = None) -> List[str]:
         """Parse Adobe/Autodesk software information"""
-        software_list = []
-        
-        # Look for Adobe/Autodesk section
-        adobe_pattern = r'Adobe/Autodesk[:\s]*\n?(.*?)(?=\n\n|\n===|\Z)'
-        match = re.search(adobe_pattern, content, re.IGNORECASE | re.MULTILINE | re.DOTALL)
-        
-        if match:
-            adobe_section = match.group(1)
-            # Split by semicolons and clean up
-            items = adobe_section.split(';')
-            for item in items:
-                item = item.strip()
-                if item and len(item) > 3:
-                    software_list.append(item)
-        
-        return software_list
+        return self._parse_block('adobe_autodesk', content, index)
 
-    def parse_network_info(self, content: str) -> Dict[str, Any]:
+    def parse_systeminfo(self, content: str, index: Optional[SectionIndex] = None) -> Dict[str, str]:
+        """Parse the '=== systeminfo (selected fields) ===' section into a key/value dict"""
+        index = index or SectionIndex.build(content)
+        section = index.find('systeminfo')
+        systeminfo = {}
+        if section:
+            for line in section.split('\n'):
+                key, sep, value = line.partition(':')
+                if sep and key.strip() and key.strip() not in systeminfo:
+                    systeminfo[key.strip()] = value.strip()
+        return systeminfo
+
+    def parse_network_info(self, content: str, fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Parse network configuration information"""
         network_info = {}
+        if fields is None:
+            fields = {
+                'ip_address': self.extract_field(content, 'ip_address'),
+                'mac_address': self.extract_field(content, 'mac_address'),
+                'network_adapter': self.field_matcher.extract_all(content, 'network_adapter')
+            }
         
         # IP Address
-        ip_address = self.extract_field(content, 'ip_address')
+        ip_address = fields.get('ip_address')
         if ip_address:
             network_info['ip_address'] = ip_address
         
         # Look for additional network information
-        mac_pattern = r'MAC Address[:\s]+([A-Fa-f0-9:-]{17})'
-        mac_match = re.search(mac_pattern, content, re.IGNORECASE)
-        if mac_match:
-            network_info['mac_address'] = mac_match.group(1)
+        if fields.get('mac_address'):
+            network_info['mac_address'] = fields['mac_address']
         
         # Network adapter information
-        adapter_pattern = r'Network Adapter[:\s]+([^\n\r]+)'
-        adapter_matches = re.finditer(adapter_pattern, content, re.IGNORECASE | re.MULTILINE)
-        adapters = [match.group(1).strip() for match in adapter_matches]
+        adapters = fields.get('network_adapter')
         if adapters:
             network_info['adapters'] = adapters
         
@@ -374,122 +585,295 @@ class AssetParser:
         
         return network_info
 
+    def _offer_token(self, best: Dict[str, tuple], found: Dict[str, List[str]], field: str, priority: int, value: str) -> None:
+        """Record a tokenized value if it beats what was already seen for the field"""
+        shape = self._value_shapes.get(field)
+        if shape:
+            match = shape.match(value)
+            if not match:
+                return
+            value = match.group(0)
+        if field in found:
+            found[field].append(value)
+            return
+        # Lower priority index wins, ties keep the earliest occurrence
+        if field not in best or priority < best[field][0]:
+            best[field] = (priority, value)
+
+    def tokenize_content(self, content: str, report_format: Optional[ReportFormat] = None) -> Dict[str, Any]:
+        """Walk the report once, splitting 'Label: value' lines and indexing its sections"""
+        content = content.lstrip('\ufeff')
+        index = SectionIndex(content)
+        token_index = self._format_token_indexes[report_format.name] if report_format else self._token_index
+        best = {}
+        found = {name: [] for name in self.field_matcher.multiple_fields}
+        pending = None
+        position = 0
+
+        for line in content.split('\n'):
+            line_end = position + len(line)
+            position = line_end + 1
+            stripped = line.strip()
+            index.feed(stripped, line_end)
+            if not stripped:
+                continue
+
+            if pending:
+                # Label with an empty value, e.g. "Office Version:" followed by the value on the next line
+                self._offer_token(best, found, pending[0], pending[1], stripped)
+                pending = None
+
+            if 'winrm_command' not in best and 'enter-pssession' in stripped.lower():
+                best['winrm_command'] = (0, stripped[stripped.lower().index('enter-pssession'):])
+
+            key, sep, value = stripped.partition(':')
+            if not sep:
+                continue
+            token = token_index.get(key.strip().lower())
+            if token:
+                value = value.strip()
+                if value:
+                    self._offer_token(best, found, token[0], token[1], value)
+                else:
+                    pending = token
+
+        fields = {field: value for field, (priority, value) in best.items()}
+        fields.update(found)
+        return {
+            'fields': fields,
+            'index': index
+        }
+
+    def _build_asset_data(self, file_path: Path, content: str, fields: Dict[str, Optional[str]],
+                          mtime: Optional[float] = None) -> Dict[str, Any]:
+        """Lay out the scalar fields in the asset dict shape used by the dashboard"""
+        if mtime is None:
+            mtime = file_path.stat().st_mtime
+        asset_data = {
+            'file_name': file_path.name,
+            'file_path': str(file_path),
+            'last_modified': datetime.fromtimestamp(mtime).isoformat(),
+            'computer_name': fields.get('computer_name') or file_path.stem,
+            'pc_domain': fields.get('pc_domain'),
+            'anydesk_id': fields.get('anydesk_id'),
+            'user_email': fields.get('user_email'),
+            'system_info': {
+                'manufacturer': fields.get('manufacturer'),
+                'model': fields.get('model'),
+                'bios_version': fields.get('bios_version'),
+                'serial_number': fields.get('serial_number'),
+                'monitor_model': fields.get('monitor_model')
+            },
+            'os_info': {
+                'version': fields.get('os_version'),
+                'activation': fields.get('os_activation'),
+                'language': fields.get('windows_language'),
+                'install_date': fields.get('os_install_date'),
+                'last_reboot': fields.get('last_reboot_time'),
+                'uptime': fields.get('system_uptime')
+            },
+            'hardware_info': {
+                'processor': {
+                    'name': fields.get('processor')
+                },
+                'gpu': fields.get('gpu'),
+                'memory': {},
+                'storage': []
+            },
+            'network_info': {
+                'mode': fields.get('network_mode'),
+                'dns_servers': fields.get('dns_servers'),
+                'default_gateway': fields.get('default_gateway')
+            },
+            'software_info': {
+                'office_version': fields.get('office_version'),
+                'antivirus': fields.get('antivirus'),
+                'adobe_autodesk': [],
+                'installed_programs': []
+            },
+            'shared_folders': [],
+            'stored_credentials': [],
+            'bitlocker_status': [],
+            'winrm_command': fields.get('winrm_command'),
+            'raw_content': content[:1000] + '...' if len(content) > 1000 else content
+        }
+        # Fields added through custom specs travel alongside the standard layout
+        extra_fields = {name: value for name, value in fields.items() if name not in DEFAULT_FIELD_NAMES}
+        if extra_fields:
+            asset_data['extra_fields'] = extra_fields
+        return asset_data
+
+    def _assemble_asset(self, file_path: Path, content: str, fields: Dict[str, Any], index: SectionIndex,
+                        mtime: Optional[float] = None, report_format: Optional[ReportFormat] = None) -> Dict[str, Any]:
+        """Build the asset dict from the matched fields, reading every block through the section index"""
+        asset_data = self._build_asset_data(file_path, content, fields, mtime)
+        asset_data['report_format'] = report_format.name if report_format else GENERIC_FORMAT
+        if self.lazy:
+            asset_data['sections_pending'] = True
+        else:
+            self._add_sections(asset_data, content, index)
+        
+        # Parse memory information
+        memory_str = fields.get('memory')
+        if memory_str:
+            memory_gb = self.parse_memory_size(memory_str)
+            asset_data['hardware_info']['memory'] = {
+                'raw': memory_str,
+                'total_gb': memory_gb
+            }
+        
+        # Parse storage information
+        storage_devices = self.parse_storage_info(content, fields, index, report_format)
+        if storage_devices:
+            asset_data['hardware_info']['storage'] = storage_devices
+        
+        # Parse network information
+        network_info = self.parse_network_info(content, fields)
+        if network_info:
+            asset_data['network_info'].update(network_info)
+        
+        # Parse the systeminfo section, used as a fallback for the OS name
+        systeminfo = self.parse_systeminfo(content, index)
+        if systeminfo:
+            asset_data['systeminfo'] = systeminfo
+            if not asset_data['os_info']['version'] and systeminfo.get('OS Name'):
+                asset_data['os_info']['version'] = systeminfo['OS Name']
+        
+        return asset_data
+
+    def _add_sections(self, asset_data, content: str, index: SectionIndex) -> None:
+        """Parse the heavy multi-line sections (LAZY_SECTIONS) into asset_data"""
+        asset_data['bitlocker_status'] = self.parse_bitlocker_status(content, index)
+
+        # Parse software lists
+        software_list = self.parse_software_list(content, index)
+        if software_list:
+            asset_data['software_info']['installed_programs'] = software_list
+        
+        # Parse Adobe/Autodesk software
+        adobe_autodesk = self.parse_adobe_autodesk(content, index)
+        if adobe_autodesk:
+            asset_data['software_info']['adobe_autodesk'] = adobe_autodesk
+        
+        # Parse shared folders
+        shared_folders = self.parse_shared_folders(content, index)
+        if shared_folders:
+            asset_data['shared_folders'] = shared_folders
+        
+        # Parse stored credentials
+        stored_credentials = self.parse_stored_credentials(content, index)
+        if stored_credentials:
+            asset_data['stored_credentials'] = stored_credentials
+
+    def load_sections(self, asset) -> bool:
+        """Fill in the sections a lazy parse left out, re-reading the asset's report once
+
+        The sections are written into asset (a dict or an AssetRecord), so later calls cost
+        nothing. Returns False if the report could not be read any more.
+        """
+        if not asset.get('sections_pending'):
+            return True
+        try:
+            content, encoding = decode_report(read_report(Path(asset['file_path'])))
+        except Exception as e:
+            logger.error(f"Cannot load sections of {asset.get('file_path')}: {str(e)}")
+            return False
+        self._add_sections(asset, content, SectionIndex.build(content))
+        del asset['sections_pending']
+        return True
+
+    def _parse_regex(self, content: str, file_path: Path, mtime: Optional[float] = None,
+                     report_format: Optional[ReportFormat] = None) -> Dict[str, Any]:
+        """Regex engine: one sweep of the compiled field spec plus one pass to index the sections"""
+        matcher = self._format_matchers[report_format.name] if report_format else self.field_matcher
+        return self._assemble_asset(file_path, content, matcher.match(content), SectionIndex.build(content), mtime,
+                                    report_format)
+
+    def _parse_tokenized(self, content: str, file_path: Path, mtime: Optional[float] = None,
+                         report_format: Optional[ReportFormat] = None) -> Dict[str, Any]:
+        """Tokenizer engine: fields and section index both come from a single pass over the lines"""
+        tokens = self.tokenize_content(content, report_format)
+        return self._assemble_asset(file_path, content, tokens['fields'], tokens['index'], mtime, report_format)
+
+    def parse_asset_content(self, content: str, file_path: Path, mtime: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Parse decoded report text; file_path names the asset and mtime (default: the file's) dates it"""
+        if not content.strip():
+            logger.warning(f"Empty file: {file_path}")
+            return None
+        
+        if self.profiler is not None:
+            self.profiler.profile_patterns(self.field_matcher, self.patterns, content)
+        
+        t0 = time.perf_counter()
+        report_format = self.detect_format(content)
+        if self.engine == 'tokenizer':
+            asset_data = self._parse_tokenized(content, file_path, mtime, report_format)
+        else:
+            asset_data = self._parse_regex(content, file_path, mtime, report_format)
+        self.format_stats.record(asset_data['report_format'], time.perf_counter() - t0)
+        
+        logger.info(f"Successfully parsed asset file: {file_path.name}")
+        return asset_data
+
+    def parse_asset_bytes(self, data: Buffer, file_path: Path, mtime: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Decode raw report bytes (BOM or heuristic encoding detection) and parse them"""
+        content, encoding = decode_report(data)
+        return self.parse_asset_content(content, file_path, mtime)
+
     def parse_asset_file(self, file_path: Path) -> Optional[Dict[str, Any]]:
         """Parse a single asset file and return structured data"""
         try:
-            if not file_path.exists():
-                logger.error(f"File not found: {file_path}")
-                return None
-            
-            # Read file content
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-            except UnicodeDecodeError:
-                # Try with different encoding
-                with open(file_path, 'r', encoding='cp1252') as f:
-                    content = f.read()
-            
-            if not content.strip():
-                logger.warning(f"Empty file: {file_path}")
-                return None
-            
-            # Parse the content
-            asset_data = {
-                'file_name': file_path.name,
-                'file_path': str(file_path),
-                'last_modified': datetime.fromtimestamp(file_path.stat().st_mtime).isoformat(),
-                'computer_name': self.extract_field(content, 'computer_name') or file_path.stem,
-                'pc_domain': self.extract_field(content, 'pc_domain'),
-                'anydesk_id': self.extract_field(content, 'anydesk_id'),
-                'user_email': self.extract_field(content, 'user_email'),
-                'system_info': {
-                    'manufacturer': self.extract_field(content, 'manufacturer'),
-                    'model': self.extract_field(content, 'model'),
-                    'bios_version': self.extract_field(content, 'bios_version'),
-                    'serial_number': self.extract_field(content, 'serial_number'),
-                    'monitor_model': self.extract_field(content, 'monitor_model')
-                },
-                'os_info': {
-                    'version': self.extract_field(content, 'os_version'),
-                    'activation': self.extract_field(content, 'os_activation'),
-                    'language': self.extract_field(content, 'windows_language'),
-                    'install_date': self.extract_field(content, 'os_install_date'),
-                    'last_reboot': self.extract_field(content, 'last_reboot_time'),
-                    'uptime': self.extract_field(content, 'system_uptime')
-                },
-                'hardware_info': {
-                    'processor': {
-                        'name': self.extract_field(content, 'processor')
-                    },
-                    'gpu': self.extract_field(content, 'gpu'),
-                    'memory': {},
-                    'storage': []
-                },
-                'network_info': {
-                    'mode': self.extract_field(content, 'network_mode'),
-                    'dns_servers': self.extract_field(content, 'dns_servers'),
-                    'default_gateway': self.extract_field(content, 'default_gateway')
-                },
-                'software_info': {
-                    'office_version': self.extract_field(content, 'office_version'),
-                    'antivirus': self.extract_field(content, 'antivirus'),
-                    'adobe_autodesk': [],
-                    'installed_programs': []
-                },
-                'shared_folders': [],
-                'stored_credentials': [],
-                'bitlocker_status': self.parse_bitlocker_status(content),
-                'winrm_command': self.extract_field(content, 'winrm_command'),
-                'raw_content': content[:1000] + '...' if len(content) > 1000 else content
-            }
-            
-            # Parse memory information
-            memory_str = self.extract_field(content, 'memory')
-            if memory_str:
-                memory_gb = self.parse_memory_size(memory_str)
-                asset_data['hardware_info']['memory'] = {
-                    'raw': memory_str,
-                    'total_gb': memory_gb
-                }
-            
-            # Parse storage information
-            storage_devices = self.parse_storage_info(content)
-            if storage_devices:
-                asset_data['hardware_info']['storage'] = storage_devices
-            
-            # Parse network information
-            network_info = self.parse_network_info(content)
-            if network_info:
-                asset_data['network_info'] = network_info
-            
-            # Parse software lists
-            software_list = self.parse_software_list(content)
-            if software_list:
-                asset_data['software_info']['installed_programs'] = software_list
-            
-            # Parse Adobe/Autodesk software
-            adobe_autodesk = self.parse_adobe_autodesk(content)
-            if adobe_autodesk:
-                asset_data['software_info']['adobe_autodesk'] = adobe_autodesk
-            
-            # Parse shared folders
-            shared_folders = self.parse_shared_folders(content)
-            if shared_folders:
-                asset_data['shared_folders'] = shared_folders
-            
-            # Parse stored credentials
-            stored_credentials = self.parse_stored_credentials(content)
-            if stored_credentials:
-                asset_data['stored_credentials'] = stored_credentials
-            
-            logger.info(f"Successfully parsed asset file: {file_path.name}")
-            return asset_data
-            
+            # One open and fstat instead of exists() + stat(), then a single decode
+            with open_report(file_path) as (data, stat_result):
+                return self.parse_asset_bytes(data, file_path, stat_result.st_mtime)
+        except FileNotFoundError:
+            logger.error(f"File not found: {file_path}")
+            return None
         except Exception as e:
             logger.error(f"Error parsing asset file {file_path}: {str(e)}")
             return None
 
+    def parse_many(self, paths: Iterable[Path], workers: Optional[int] = None):
+        """Parse many reports (and report bundles) into a pandas fleet table, one row per asset name
+
+        See fleet_table.FLEET_COLUMNS for the columns. Loose reports are parsed over
+        worker processes when there are enough of them. On a name clash the last report
+        wins, reports from bundles counting after the loose ones.
+        """
+        # Imported here: parallel_parser imports this module, and pandas is only needed for the table
+        from parallel_parser import parse_files
+        from fleet_table import build_fleet_table
+
+        paths = [Path(path) for path in paths]
+        loose = [path for path in paths if archive_kind(path) is None]
+        assets = [asset for asset in parse_files(self, loose, workers) if asset]
+        for path in paths:
+            if archive_kind(path) is not None:
+                assets.extend(self.parse_archive(path))
+        return build_fleet_table({asset['computer_name']: asset for asset in assets})
+
+    def parse_archive(self, archive_path: Path) -> List[Dict[str, Any]]:
+        """Parse every report inside a .zip, .tar.gz, .gz or .7z bundle, without extracting it
+
+        Each asset is named by member_path(archive_path, member); members without their own
+        timestamp are dated by the archive.
+        """
+        assets = []
+        try:
+            with open_report(archive_path) as (data, stat_result):
+                for name, member_data, mtime in archive_members(archive_path, bytes(data)):
+                    path = member_path(archive_path, name)
+                    try:
+                        asset = self.parse_asset_bytes(member_data, path, mtime if mtime is not None else stat_result.st_mtime)
+                    except Exception as e:
+                        logger.error(f"Error parsing {path}: {str(e)}")
+                        continue
+                    if asset:
+                        assets.append(asset)
+        except Exception as e:
+            logger.error(f"Error reading archive {archive_path}: {str(e)}")
+        return assets
+
     def validate_asset_data(self, asset_data: Dict[str, Any]) -> bool:
         """Validate that asset data contains minimum required information"""
         required_fields = ['computer_name']
@@ -0,0 +1,288 @@
+import sys
+import zlib
+from collections.abc import Mapping, MutableMapping
+from dataclasses import dataclass, fields
+from typing import Dict, Any, Tuple, FrozenSet
+
+
+class _Missing:
+    """Marks a field the parsed dict did not have, so the view can report the key as absent"""
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'MISSING'
+
+    def __reduce__(self):
+        return 'MISSING'
+
+
+MISSING = _Missing()
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def _record(cls):
+    """Make cls a dataclass and record its field names for the mapping view"""
+    cls = dataclass(eq=False, repr=False)(cls)
+    cls._keys = tuple(f.name for f in fields(cls))
+    cls._key_set = frozenset(cls._keys)
+    return cls
+
+
+class RecordView(MutableMapping):
+    """Dict interface over a __slots__ record, so code written against the asset dicts keeps working
+
+    Subclasses list their fields in __slots__ plus '_extra', which holds keys outside the
+    schema (nmap output, errors...) and is only allocated when such a key is set.
+    """
+    __slots__ = ()
+
+    _keys: Tuple[str, ...] = ()
+    _key_set: FrozenSet[str] = frozenset()
+    # Field -> record class for nested sections, and for lists of records
+    _nested: Dict[str, type] = {}
+    _nested_lists: Dict[str, type] = {}
+    # Categorical strings shared across the fleet, stored once via sys.intern
+    _interned: FrozenSet[str] = frozenset()
+    _interned_lists: FrozenSet[str] = frozenset()
+    _interned_dicts: FrozenSet[str] = frozenset()
+
+    def __post_init__(self):
+        self._extra = None
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> 'RecordView':
+        """Build a record from a parsed asset dict (or another record)"""
+        record = cls(*(cls._convert(key, data.get(key, MISSING)) for key in cls._keys))
+        for key in data:
+            if key not in cls._key_set:
+                record[key] = data[key]
+        return record
+
+    @classmethod
+    def _convert(cls, key: str, value: Any) -> Any:
+        if value is MISSING or value is None:
+            return value
+        if key in cls._nested:
+            return cls._nested[key].from_dict(value)
+        if key in cls._nested_lists:
+            record_type = cls._nested_lists[key]
+            return [record_type.from_dict(item) if isinstance(item, Mapping) else item for item in value]
+        if key in cls._interned:
+            return _intern(value)
+        if key in cls._interned_lists:
+            return [_intern(item) for item in value]
+        if key in cls._interned_dicts:
+            return {_intern(k): _intern(v) for k, v in value.items()}
+        return value
+
+    def _load(self, key: str) -> Any:
+        return getattr(self, key)
+
+    def _store(self, key: str, value: Any) -> None:
+        setattr(self, key, self._convert(key, value))
+
+    def __getitem__(self, key):
+        if key in self._key_set:
+            value = self._load(key)
+            if value is MISSING:
+                raise KeyError(key)
+            return value
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self._key_set:
+            self._store(key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._key_set:
+            if getattr(self, key) is MISSING:
+                raise KeyError(key)
+            setattr(self, key, MISSING)
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __iter__(self):
+        for key in self._keys:
+            if getattr(self, key) is not MISSING:
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        if key in self._key_set:
+            return getattr(self, key) is not MISSING
+        return self._extra is not None and key in self._extra
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain nested dict, as the parser produced it"""
+        return {key: to_plain(value) for key, value in self.items()}
+
+
+def to_plain(value: Any) -> Any:
+    """Turn records (and lists of them) back into plain dicts; also usable as json.dumps(default=...)"""
+    if isinstance(value, RecordView):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    return value
+
+
+@_record
+class Processor(RecordView):
+    __slots__ = ('name', '_extra')
+    name: Any
+    _interned = frozenset({'name'})
+
+
+@_record
+class Memory(RecordView):
+    __slots__ = ('raw', 'total_gb', '_extra')
+    raw: Any
+    total_gb: Any
+    _interned = frozenset({'raw'})
+
+
+@_record
+class StorageDevice(RecordView):
+    __slots__ = ('name', 'size_gb', 'free_space_gb', 'drive_letter', 'type', '_extra')
+    name: Any
+    size_gb: Any
+    free_space_gb: Any
+    drive_letter: Any
+    type: Any
+    _interned = frozenset({'drive_letter', 'type'})
+
+
+@_record
+class SystemInfo(RecordView):
+    __slots__ = ('manufacturer', 'model', 'bios_version', 'serial_number', 'monitor_model', '_extra')
+    manufacturer: Any
+    model: Any
+    bios_version: Any
+    serial_number: Any
+    monitor_model: Any
+    _interned = frozenset({'manufacturer', 'model', 'bios_version', 'monitor_model'})
+
+
+@_record
+class OsInfo(RecordView):
+    __slots__ = ('version', 'activation', 'language', 'install_date', 'last_reboot', 'uptime', '_extra')
+    version: Any
+    activation: Any
+    language: Any
+    install_date: Any
+    last_reboot: Any
+    uptime: Any
+    _interned = frozenset({'version', 'activation', 'language'})
+
+
+@_record
+class HardwareInfo(RecordView):
+    __slots__ = ('processor', 'gpu', 'memory', 'storage', '_extra')
+    processor: Any
+    gpu: Any
+    memory: Any
+    storage: Any
+    _nested = {'processor': Processor, 'memory': Memory}
+    _nested_lists = {'storage': StorageDevice}
+    _interned = frozenset({'gpu'})
+
+
+@_record
+class NetworkInfo(RecordView):
+    __slots__ = ('mode', 'dns_servers', 'default_gateway', 'ip_address', 'mac_address', 'adapters',
+                 'status', 'nmap_scan_status', '_extra')
+    mode: Any
+    dns_servers: Any
+    default_gateway: Any
+    ip_address: Any
+    mac_address: Any
+    adapters: Any
+    status: Any
+    nmap_scan_status: Any
+    _interned = frozenset({'mode', 'dns_servers', 'default_gateway', 'status', 'nmap_scan_status'})
+    _interned_lists = frozenset({'adapters'})
+
+
+@_record
+class SoftwareInfo(RecordView):
+    __slots__ = ('office_version', 'antivirus', 'adobe_autodesk', 'installed_programs', '_extra')
+    office_version: Any
+    antivirus: Any
+    adobe_autodesk: Any
+    installed_programs: Any
+    _interned = frozenset({'office_version', 'antivirus'})
+    _interned_lists = frozenset({'adobe_autodesk', 'installed_programs'})
+
+
+@_record
+class AssetRecord(RecordView):
+    """Compact form of a parsed asset, readable and writable like the asset dict
+
+    raw_content is kept zlib-compressed and decompressed when read.
+    """
+    __slots__ = ('file_name', 'file_path', 'last_modified', 'computer_name', 'pc_domain', 'anydesk_id',
+                 'user_email', 'system_info', 'os_info', 'hardware_info', 'network_info', 'software_info',
+                 'shared_folders', 'stored_credentials', 'bitlocker_status', 'winrm_command', 'raw_content',
+                 'systeminfo', 'extra_fields', 'sections_pending', 'report_format', '_extra')
+    file_name: Any
+    file_path: Any
+    last_modified: Any
+    computer_name: Any
+    pc_domain: Any
+    anydesk_id: Any
+    user_email: Any
+    system_info: Any
+    os_info: Any
+    hardware_info: Any
+    network_info: Any
+    software_info: Any
+    shared_folders: Any
+    stored_credentials: Any
+    bitlocker_status: Any
+    winrm_command: Any
+    raw_content: Any
+    systeminfo: Any
+    extra_fields: Any
+    sections_pending: Any
+    report_format: Any
+    _nested = {'system_info': SystemInfo, 'os_info': OsInfo, 'hardware_info': HardwareInfo,
+               'network_info': NetworkInfo, 'software_info': SoftwareInfo}
+    _interned = frozenset({'pc_domain', 'user_email', 'report_format'})
+    _interned_lists = frozenset({'bitlocker_status'})
+    _interned_dicts = frozenset({'systeminfo'})
+
+    @classmethod
+    def _convert(cls, key: str, value: Any) -> Any:
+        if key == 'raw_content' and type(value) is str:
+            return zlib.compress(value.encode('utf-8', 'surrogatepass'))
+        return super()._convert(key, value)
+
+    def _load(self, key: str) -> Any:
+        value = getattr(self, key)
+        if key == 'raw_content' and type(value) is bytes:
+            return zlib.decompress(value).decode('utf-8', 'surrogatepass')
+        return value
+
+
+def compact_assets(assets: Dict[str, Any]) -> Dict[str, AssetRecord]:
+    """Convert a name -> asset dict mapping into AssetRecords"""
+    return {name: asset if isinstance(asset, AssetRecord) else AssetRecord.from_dict(asset)
+            for name, asset in assets.items()}
@@ -0,0 +1,202 @@
+import json
+import logging
+import sqlite3
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+from asset_record import to_plain
+from fleet_table import fleet_row
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_FILE = Path('.asset_cache') / 'assets.sqlite'
+# Bump when the schema changes; an older store is rebuilt from the inventory
+STORE_SCHEMA_VERSION = 2
+# Seconds a reader or writer waits for another process's write to finish
+BUSY_TIMEOUT = 5.0
+
+# Fleet table columns kept as indexed SQL columns, under their SQL name
+INDEXED_COLUMNS = {
+    'hostname': 'computer_name',
+    'ip_address': 'ip_address',
+    'os_family': 'os_family',
+    'manufacturer': 'manufacturer',
+    'model': 'model',
+    'serial_number': 'serial_number',
+    'mac_address': 'mac_address',
+    'ram_gb': 'ram_gb',
+    'c_free_gb': 'c_free_gb',
+}
+# Asset keys left out of the full-text details: the report text has a column of its own, and
+# network_info changes with every scan, so it is kept in assets.network_text and updated in place
+UNINDEXED_KEYS = ('raw_content', 'network_info')
+# Shorter terms have no trigram to look up, so they are found by scanning the text
+MIN_TRIGRAM_TERM = 3
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS assets (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        signature TEXT NOT NULL,
+        hostname TEXT, ip_address TEXT, os_family TEXT, manufacturer TEXT, model TEXT,
+        serial_number TEXT, mac_address TEXT, ram_gb REAL, c_free_gb REAL, anydesk_id TEXT,
+        network_text TEXT
+    )""",
+    # assets.id is the rowid of the asset's text row; trigrams let any substring of 3+ characters use the index
+    "CREATE VIRTUAL TABLE IF NOT EXISTS asset_text USING fts5(details, raw_content, tokenize='trigram')",
+] + [f"CREATE INDEX IF NOT EXISTS assets_{column} ON assets ({column})" for column in INDEXED_COLUMNS]
+
+
+def _signature(asset: Mapping) -> str:
+    # A report rewritten or renamed gets a new signature; scan statuses are updated in place
+    return f"{asset.get('file_path')}|{asset.get('last_modified')}"
+
+
+def _network_values(asset: Mapping) -> List[Any]:
+    """assets.mac_address and assets.network_text, the columns a scan changes"""
+    network_info = asset.get('network_info')
+    network_info = network_info if isinstance(network_info, Mapping) else {}
+    return [network_info.get('mac_address'), json.dumps(network_info, default=to_plain).lower()]
+
+
+def _details_text(asset: Mapping) -> str:
+    # The JSON the in-memory search looks through, so field names and values match the same way
+    return json.dumps({key: value for key, value in asset.items() if key not in UNINDEXED_KEYS}, default=to_plain)
+
+
+def search_clause(term: str) -> Tuple[str, List[Any]]:
+    """SQL condition on assets for a search box term: a case-insensitive substring of the asset, as in memory"""
+    term = term.lower()
+    if len(term) >= MIN_TRIGRAM_TERM:
+        # A quoted trigram phrase matches the term anywhere, as a substring
+        text = 'SELECT rowid FROM asset_text WHERE asset_text MATCH ?'
+        text_params = ['"' + term.replace('"', '""') + '"']
+    else:
+        text = 'SELECT rowid FROM asset_text WHERE instr(lower(details), ?) > 0 OR instr(lower(raw_content), ?) > 0'
+        text_params = [term, term]
+    return f"instr(lower(name), ?) > 0 OR instr(network_text, ?) > 0 OR id IN ({text})", [term, term] + text_params
+
+
+class AssetStore:
+    """SQLite index of the inventory: the filter columns, indexed, plus full-text search
+
+    The sidebar filters and the global search become one indexed query instead of a
+    pass over every asset. Search matches substrings of the asset's JSON, like the
+    in-memory search, through an FTS5 trigram index. The database runs in WAL mode, so an ingest can write while
+    any number of dashboard sessions read. Each process (each session) opens its own
+    connection; writes are skipped for assets whose report did not change.
+    """
+
+    def __init__(self, store_file: Path = DEFAULT_STORE_FILE):
+        self.store_file = Path(store_file)
+        self.store_file.parent.mkdir(parents=True, exist_ok=True)
+        # Streamlit reruns a session's script on different threads; the lock serialises them
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.store_file), timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        with self._lock, self._connection:
+            version = self._connection.execute('PRAGMA user_version').fetchone()[0]
+            if version != STORE_SCHEMA_VERSION:
+                self._connection.execute('DROP TABLE IF EXISTS asset_text')
+                self._connection.execute('DROP TABLE IF EXISTS assets')
+            for statement in _SCHEMA:
+                self._connection.execute(statement)
+            self._connection.execute(f'PRAGMA user_version={STORE_SCHEMA_VERSION}')
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT count(*) FROM assets').fetchone()[0]
+
+    def update(self, assets: Mapping, names: Optional[Iterable[str]] = None) -> int:
+        """Write assets whose report changed; names limits it to those (names no longer in assets are deleted)
+
+        With names=None the whole inventory is synced and rows of assets that are gone are deleted.
+        Assets whose report is unchanged only get their network columns updated, after a scan.
+        Returns the number of rows written.
+        """
+        with self._lock, self._connection:
+            stored: Dict[str, Tuple[int, str, List[Any]]] = {
+                row[1]: (row[0], row[2], list(row[3:])) for row in self._connection.execute(
+                    'SELECT id, name, signature, mac_address, network_text FROM assets')}
+            complete = names is None
+            names = list(assets) if complete else list(names)
+            gone = [name for name in names if name not in assets]
+            if complete:
+                gone += [name for name in stored if name not in assets]
+            for name in gone:
+                if name in stored:
+                    self._delete(stored[name][0])
+            written = rescanned = 0
+            for name in names:
+                if name not in assets:
+                    continue
+                asset = assets[name]
+                signature = _signature(asset)
+                previous = stored.get(name)
+                if previous is not None and previous[1] == signature:
+                    network = _network_values(asset)
+                    if network != previous[2]:
+                        self._connection.execute('UPDATE assets SET mac_address = ?, network_text = ? WHERE id = ?',
+                                                 network + [previous[0]])
+                        rescanned += 1
+                    continue
+                if previous is not None:
+                    self._delete(previous[0])
+                self._insert(name, signature, asset)
+                written += 1
+        if written or rescanned or gone:
+            logger.info(f"Asset store: {written} written, {rescanned} rescanned, {len(gone)} removed")
+        return written
+
+    def _delete(self, row_id: int) -> None:
+        self._connection.execute('DELETE FROM assets WHERE id = ?', (row_id,))
+        self._connection.execute('DELETE FROM asset_text WHERE rowid = ?', (row_id,))
+
+    def _insert(self, name: str, signature: str, asset: Mapping) -> None:
+        row = fleet_row(asset)
+        values = [row[column] for column in INDEXED_COLUMNS.values()]
+        cursor = self._connection.execute(
+            f"INSERT INTO assets (name, signature, {', '.join(INDEXED_COLUMNS)}, anydesk_id, network_text) "
+            f"VALUES ({', '.join('?' * (len(values) + 4))})",
+            [name, signature] + values + [row['anydesk_id'], _network_values(asset)[1]])
+        self._connection.execute('INSERT INTO asset_text (rowid, details, raw_content) VALUES (?, ?, ?)',
+                                 (cursor.lastrowid, _details_text(asset), asset.get('raw_content') or ''))
+
+    def filter_names(self, filters: Dict[str, Any]) -> List[str]:
+        """Names of the assets matching the sidebar filters and the global search"""
+        clauses, params = [], []
+        for key, column in (('selected_os', 'os_family'), ('selected_manufacturers', 'manufacturer')):
+            if filters[key]:
+                clauses.append(f"{column} IN ({', '.join('?' * len(filters[key]))})")
+                params += list(filters[key])
+        # Same rules as fleet_table.filter_mask: unknown RAM and free space never filter an asset out
+        clauses.append('NOT (ram_gb IS NOT NULL AND ram_gb != 0 AND (ram_gb < ? OR ram_gb > ?))')
+        params += [filters['min_ram'], filters['max_ram']]
+        clauses.append('NOT (c_free_gb IS NOT NULL AND (c_free_gb < ? OR c_free_gb > ?))')
+        params += [filters['min_storage'], filters['max_storage']]
+        if filters['show_low_storage']:
+            clauses.append('c_free_gb IS NOT NULL AND c_free_gb < 10')
+        if filters['anydesk_search']:
+            clauses.append('instr(lower(anydesk_id), ?) > 0')
+            params.append(filters['anydesk_search'].lower())
+        if filters.get('search_term'):
+            clause, search_params = search_clause(filters['search_term'])
+            clauses.append(clause)
+            params += search_params
+        sql = 'SELECT name FROM assets WHERE ' + ' AND '.join(f'({clause})' for clause in clauses)
+        with self._lock:
+            return [name for (name,) in self._connection.execute(sql, params)]
+
+    def search(self, term: str) -> List[str]:
+        """Names of the assets whose fields or report text contain term"""
+        if not term:
+            return []
+        clause, params = search_clause(term)
+        with self._lock:
+            return [name for (name,) in self._connection.execute(f'SELECT name FROM assets WHERE {clause}', params)]
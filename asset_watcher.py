@@ -0,0 +1,256 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, List, Iterable, Tuple
+
+from asset_ingest import ScannedFile, REPORT_SUFFIXES
+
+try:
+    from watchdog.observers import Observer
+except ImportError:  # optional: without watchdog the folder is polled
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+WATCH_MODES = ['auto', 'native', 'poll']
+# Seconds between listings when polling, and between safety rescans when native events are used
+DEFAULT_POLL_INTERVAL = 5.0
+DEFAULT_RESYNC_INTERVAL = 60.0
+# A changed report is parsed once its size and mtime have not moved for this long
+DEFAULT_SETTLE_SECONDS = 2.0
+# The watcher stops itself when drain() has not been called for this long (its session went away)
+DEFAULT_IDLE_TIMEOUT = 300.0
+
+Signature = Tuple[int, int]
+
+
+@dataclass
+class FolderChanges:
+    """Reports to (re)parse and reports that disappeared, since the last drain"""
+    upserts: List[ScannedFile] = field(default_factory=list)
+    removals: List[Path] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.upserts or self.removals)
+
+    def summary(self) -> str:
+        return f"{len(self.upserts)} updated, {len(self.removals)} removed"
+
+
+def is_network_path(folder: Path) -> bool:
+    """UNC paths and mapped network drives, where change notifications are not reliable"""
+    text = str(folder.resolve() if folder.exists() else folder)
+    if text.startswith(('\\\\', '//')):
+        return True
+    if os.name == 'nt' and len(text) > 1 and text[1] == ':':
+        try:
+            import ctypes
+            # DRIVE_REMOTE
+            return ctypes.windll.kernel32.GetDriveTypeW(text[:2] + '\\') == 4
+        except (AttributeError, OSError):
+            return False
+    return False
+
+
+class _EventHandler:
+    """Feeds watchdog (inotify / ReadDirectoryChangesW) events into the watcher"""
+
+    def __init__(self, watcher: 'FolderWatcher'):
+        self.watcher = watcher
+
+    def dispatch(self, event):
+        if event.is_directory:
+            return
+        self.watcher.mark(event.src_path)
+        dest_path = getattr(event, 'dest_path', None)
+        if dest_path:
+            self.watcher.mark(dest_path)
+
+
+class FolderWatcher:
+    """Follows report creations, changes and deletions in a folder
+
+    Native change notifications are used when watchdog is installed and the folder is
+    local; network shares are polled with a scandir listing instead. Native mode still
+    rescans every resync_interval seconds, in case notifications were dropped.
+
+    Events only mark a path; drain() decides. A report is handed out once its size and
+    mtime are unchanged across two drains at least settle_seconds apart, so reports that
+    PowerShell is still writing are not parsed half-way through.
+
+    Each dashboard session has its own watcher, and nothing tells it when the session
+    ends. When drain() has not been called for idle_timeout seconds the threads stop and
+    the watcher is suspended; resume() picks up from the listing it had.
+    """
+
+    def __init__(self, folder: Path, suffixes: Tuple[str, ...] = REPORT_SUFFIXES, mode: str = 'auto',
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+                 resync_interval: float = DEFAULT_RESYNC_INTERVAL, idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT):
+        if mode not in WATCH_MODES:
+            raise ValueError(f"Unknown watch mode '{mode}', expected one of {WATCH_MODES}")
+        self.folder = Path(folder)
+        self.suffixes = tuple(suffix.lower() for suffix in suffixes)
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.resync_interval = resync_interval
+        self.idle_timeout = idle_timeout
+        self.backend: Optional[str] = None
+        self.last_change: Optional[float] = None
+        # Stopped for lack of drain() calls rather than by stop()
+        self.suspended = False
+        self._drained_at = time.monotonic()
+        self._known: Dict[str, Signature] = {}
+        # path -> (signature, monotonic time it was first seen) from the last drain, None until then
+        self._dirty: Dict[str, Optional[Tuple[Optional[Signature], float]]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._poller: Optional[threading.Thread] = None
+        self._observer = None
+
+    @property
+    def running(self) -> bool:
+        return self._poller is not None and self._poller.is_alive()
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._dirty)
+
+    def start(self, known: Optional[Iterable[ScannedFile]] = None) -> None:
+        """Start watching; known is the listing the inventory was loaded from (default: list the folder now)"""
+        self.reset(known)
+        if not self.running:
+            self._start_threads()
+
+    def resume(self) -> None:
+        """Start again after an idle stop, keeping the known listing so changes made meanwhile are found"""
+        if self.running:
+            return
+        self._start_threads()
+        self._rescan()
+
+    def _start_threads(self) -> None:
+        self.suspended = False
+        self._drained_at = time.monotonic()
+        self.backend = 'poll'
+        if self.mode != 'poll' and Observer is not None and not is_network_path(self.folder):
+            try:
+                self._observer = Observer()
+                self._observer.schedule(_EventHandler(self), str(self.folder), recursive=False)
+                self._observer.daemon = True
+                self._observer.start()
+                self.backend = 'native'
+            except Exception as e:
+                logger.warning(f"Native file watching unavailable for {self.folder}, polling instead: {e}")
+                self._observer = None
+        elif self.mode == 'native':
+            logger.warning(f"Native file watching unavailable for {self.folder} (watchdog missing or network share), polling instead")
+        self._stop.clear()
+        self._poller = threading.Thread(target=self._poll_loop, name='asset-watcher', daemon=True)
+        self._poller.start()
+        logger.info(f"Watching {self.folder} ({self.backend})")
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._stop_observer()
+        if self._poller is not None:
+            self._poller.join(timeout=1)
+            self._poller = None
+        self.backend = None
+        self.suspended = False
+
+    def _stop_observer(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+    def reset(self, known: Optional[Iterable[ScannedFile]] = None) -> None:
+        """Take known (or a fresh listing) as the state the inventory reflects and forget pending events"""
+        listing = self._listing() if known is None else {str(f.path): (f.st_size, f.st_mtime_ns) for f in known}
+        with self._lock:
+            self._known = listing
+            self._dirty.clear()
+
+    def mark(self, path) -> None:
+        """Note that path may have changed"""
+        path = str(path)
+        if not path.lower().endswith(self.suffixes):
+            return
+        with self._lock:
+            self._dirty.setdefault(path, None)
+
+    def _listing(self) -> Dict[str, Signature]:
+        listing = {}
+        try:
+            with os.scandir(self.folder) as it:
+                for entry in it:
+                    if not entry.name.lower().endswith(self.suffixes):
+                        continue
+                    try:
+                        if entry.is_file():
+                            stat_result = entry.stat()
+                            listing[entry.path] = (stat_result.st_size, stat_result.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.error(f"Cannot list {self.folder}: {e}")
+            return dict(self._known)
+        return listing
+
+    def _poll_loop(self) -> None:
+        interval = self.resync_interval if self.backend == 'native' else self.poll_interval
+        while not self._stop.wait(interval):
+            if self.idle_timeout and time.monotonic() - self._drained_at > self.idle_timeout:
+                logger.info(f"No changes collected from {self.folder} for {self.idle_timeout:.0f}s, watcher suspended")
+                self._stop_observer()
+                self.suspended = True
+                return
+            self._rescan()
+
+    def _rescan(self) -> None:
+        """Mark the reports whose listing differs from the known one"""
+        listing = self._listing()
+        with self._lock:
+            known = self._known
+            changed = [path for path, signature in listing.items() if known.get(path) != signature]
+            changed += [path for path in known if path not in listing]
+        for path in changed:
+            self.mark(path)
+
+    def drain(self) -> FolderChanges:
+        """Changes that have settled since the last call; unsettled ones stay pending"""
+        changes = FolderChanges()
+        now = self._drained_at = time.monotonic()
+        with self._lock:
+            candidates = list(self._dirty.items())
+        for path, seen in candidates:
+            try:
+                stat_result = os.stat(path)
+                signature = (stat_result.st_size, stat_result.st_mtime_ns)
+            except FileNotFoundError:
+                signature = None
+            except OSError as e:
+                logger.warning(f"Cannot stat {path}, retrying later: {e}")
+                continue
+            if seen is None or seen[0] != signature:
+                with self._lock:
+                    self._dirty[path] = (signature, now)
+                continue
+            if now - seen[1] < self.settle_seconds:
+                continue
+            with self._lock:
+                del self._dirty[path]
+                if signature is None:
+                    if self._known.pop(path, None) is not None:
+                        changes.removals.append(Path(path))
+                elif self._known.get(path) != signature:
+                    self._known[path] = signature
+                    changes.upserts.append(ScannedFile(Path(path), *signature))
+        if changes:
+            self.last_change = time.time()
+            logger.info(f"Watcher: {changes.summary()}")
+        return changes
@@ -0,0 +1,544 @@
+"""
+Parser benchmarks.
+
+Run:
+    python benchmark_parser.py fields [--repeat N]
+    python benchmark_parser.py parallel [--files N] [--workers 1,2,4,8] [--chunk-size N]
+    python benchmark_parser.py memory [--files N]
+    python benchmark_parser.py suite [--sizes 1000,10000,100000] [--output FILE] [--baseline FILE]
+    python benchmark_parser.py ingest [--files N] [--threads 1,8] [--latency-ms N]
+    python benchmark_parser.py formats [--files N]
+    python benchmark_parser.py http [--files N] [--clients N] [--queue-size N] [--batch-size N]
+    python benchmark_parser.py snapshot [--files N]
+    python benchmark_parser.py store [--sizes 10000,100000] [--repeat N]
+    python benchmark_parser.py probe [--hosts N] [--down N] [--timeout S] [--concurrency N]
+
+parallel, memory and suite run on synthetic fleets from fleet_generator.py.
+"""
+import argparse
+import gc
+import json
+import random
+import socket
+import threading
+import urllib.error
+import urllib.request
+import logging
+import platform
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from asset_parser import AssetParser, SectionIndex, open_report, decode_report, PARSER_VERSION, PARSER_ENGINES
+from parallel_parser import parse_files, default_workers, DEFAULT_CHUNK_SIZE
+from asset_record import AssetRecord, to_plain
+from fleet_generator import write_fleet, generate_report
+from parse_cache import ParseCache
+from ingest_service import IngestService, make_server
+from fleet_snapshot import build_snapshot, read_snapshot, inventory_record
+from fleet_table import build_fleet_table, filter_mask
+from asset_store import AssetStore
+from network_probe import probe_hosts
+import asset_ingest
+
+ASSETS_FOLDER = Path('assets')
+
+
+def _time_per_call(func, contents, repeat):
+    """Average seconds per file for func over every content, best of 3 rounds"""
+    best = None
+    for _ in range(3):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            for content in contents:
+                func(content)
+        elapsed = (time.perf_counter() - t0) / (repeat * len(contents))
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_fields(args):
+    """Compare the ways of extracting the scalar fields from the sample reports"""
+    parser = AssetParser()
+    files = sorted(ASSETS_FOLDER.glob('*.txt'))
+    if not files:
+        print(f"No sample files in {ASSETS_FOLDER}.")
+        return
+    contents = [f.read_text(encoding='utf-8-sig', errors='replace') for f in files]
+    print(f"Extracting {len(parser.patterns)} fields from {len(files)} files, {args.repeat} rounds.")
+
+    def per_field_strings(content):
+        # What extract_field used to do: string patterns looked up in the re cache, one search each
+        for patterns in parser.patterns.values():
+            for pattern in patterns:
+                if re.search(pattern, content, re.IGNORECASE | re.MULTILINE):
+                    break
+
+    def per_field_compiled(content):
+        for field_name in parser.patterns:
+            parser.extract_field(content, field_name)
+
+    cases = [
+        ('per-field re.search (old)', per_field_strings),
+        ('per-field precompiled', per_field_compiled),
+        ('field spec sweep', parser.field_matcher.match),
+        ('tokenizer', parser.tokenize_content),
+    ]
+    baseline = None
+    for name, func in cases:
+        seconds = _time_per_call(func, contents, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:<28} {seconds * 1e6:9.1f} us/file   {baseline / seconds:5.2f}x")
+
+
+def bench_parallel(args):
+    """Parse a synthetic fleet with 1..N worker processes"""
+    if args.workers:
+        worker_counts = [int(w) for w in args.workers.split(',')]
+    else:
+        worker_counts = sorted({1, 2, 4, 8, 16, default_workers()} & set(range(1, default_workers() + 1)))
+    with tempfile.TemporaryDirectory() as folder:
+        paths = write_fleet(folder, args.files)
+        print(f"{len(paths)} files, {default_workers()} cores, chunk size {args.chunk_size}, engine {args.engine}.")
+        parser = AssetParser(engine=args.engine)
+        baseline = None
+        reference = None
+        for workers in worker_counts:
+            t0 = time.perf_counter()
+            assets = parse_files(parser, paths, workers=workers, chunk_size=args.chunk_size, min_files=0)
+            seconds = time.perf_counter() - t0
+            baseline = baseline or seconds
+            reference = reference or assets
+            same = 'ok' if assets == reference else 'MISMATCH'
+            print(f"{workers:>3} workers {seconds:8.2f} s {len(paths) / seconds:9.0f} files/s   {baseline / seconds:5.2f}x  {same}")
+
+
+def bench_memory(args):
+    """Retained memory of the parsed fleet as nested dicts, as AssetRecords and as lazily parsed AssetRecords"""
+    with tempfile.TemporaryDirectory() as folder:
+        paths = write_fleet(folder, args.files)
+        parser = AssetParser()
+        tracemalloc.start()
+        start = tracemalloc.get_traced_memory()[0]
+        assets = parse_files(parser, paths, workers=1)
+        gc.collect()
+        dict_bytes = tracemalloc.get_traced_memory()[0] - start
+
+        records = [AssetRecord.from_dict(asset) for asset in assets]
+        del assets
+        gc.collect()
+        record_bytes = tracemalloc.get_traced_memory()[0] - start
+
+        # Lazy parse: the heavy sections stay in the file until a card asks for them
+        del records
+        gc.collect()
+        start = tracemalloc.get_traced_memory()[0]
+        records = [AssetRecord.from_dict(asset) for asset in parse_files(AssetParser(lazy=True), paths, workers=1)]
+        gc.collect()
+        lazy_bytes = tracemalloc.get_traced_memory()[0] - start
+        tracemalloc.stop()
+
+    count = len(records)
+    print(f"{count} assets")
+    print(f"nested dicts  {dict_bytes / 2 ** 20:8.1f} MB  {dict_bytes / count:8.0f} bytes/asset")
+    print(f"AssetRecord   {record_bytes / 2 ** 20:8.1f} MB  {record_bytes / count:8.0f} bytes/asset   {dict_bytes / record_bytes:4.1f}x smaller")
+    print(f"lazy sections {lazy_bytes / 2 ** 20:8.1f} MB  {lazy_bytes / count:8.0f} bytes/asset   {dict_bytes / lazy_bytes:4.1f}x smaller")
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process, None where the resource module is missing"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+
+def _sub_parsers(parser):
+    """Stages timed separately, each taking (data, content, fields, index) of one file"""
+    return {
+        'decode': lambda data, content, fields, index: decode_report(data),
+        'field_sweep': lambda data, content, fields, index: parser.field_matcher.match(content),
+        'section_index': lambda data, content, fields, index: SectionIndex.build(content),
+        'tokenizer': lambda data, content, fields, index: parser.tokenize_content(content),
+        'storage': lambda data, content, fields, index: parser.parse_storage_info(content, fields, index),
+        'network': lambda data, content, fields, index: parser.parse_network_info(content, fields),
+        'software': lambda data, content, fields, index: parser.parse_software_list(content, index),
+        'adobe_autodesk': lambda data, content, fields, index: parser.parse_adobe_autodesk(content, index),
+        'shared_folders': lambda data, content, fields, index: parser.parse_shared_folders(content, index),
+        'stored_credentials': lambda data, content, fields, index: parser.parse_stored_credentials(content, index),
+        'bitlocker': lambda data, content, fields, index: parser.parse_bitlocker_status(content, index),
+        'systeminfo': lambda data, content, fields, index: parser.parse_systeminfo(content, index),
+    }
+
+
+def _latency_stats(latencies):
+    latencies = sorted(latencies)
+    total = sum(latencies)
+    return {
+        'total_s': total,
+        'files_per_sec': len(latencies) / total if total else 0.0,
+        'p50_us': _percentile(latencies, 0.50) * 1e6,
+        'p99_us': _percentile(latencies, 0.99) * 1e6,
+    }
+
+
+def _run_suite_size(folder, engine):
+    """Benchmark one fleet; runs in a fresh process so peak RSS belongs to this fleet only"""
+    logging.disable(logging.INFO)
+    paths = sorted(Path(folder).glob('*.txt'))
+    parser = AssetParser(engine=engine)
+
+    latencies = []
+    wall = time.perf_counter()
+    for path in paths:
+        t0 = time.perf_counter()
+        parser.parse_asset_file(path)
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - wall
+    result = {'files': len(paths), 'end_to_end': _latency_stats(latencies), 'wall_s': wall,
+              'peak_rss_mb': _peak_rss_mb()}
+
+    stages = _sub_parsers(parser)
+    stage_latencies = {name: [] for name in stages}
+    for path in paths:
+        with open_report(path) as (data, _):
+            data = bytes(data)
+        content, _ = decode_report(data)
+        fields = parser.field_matcher.match(content)
+        index = SectionIndex.build(content)
+        for name, stage in stages.items():
+            t0 = time.perf_counter()
+            stage(data, content, fields, index)
+            stage_latencies[name].append(time.perf_counter() - t0)
+    result['sub_parsers'] = {name: _latency_stats(values) for name, values in stage_latencies.items()}
+    return result
+
+
+def _print_suite_result(size, result, baseline=None):
+    e2e = result['end_to_end']
+    rss = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else 'n/a'
+    print(f"\n{size} files: {e2e['files_per_sec']:.0f} files/s, p50 {e2e['p50_us']:.0f} us, "
+          f"p99 {e2e['p99_us']:.0f} us, peak RSS {rss}")
+    base_stages = (baseline or {}).get('sub_parsers', {})
+    for name, stats in result['sub_parsers'].items():
+        line = f"  {name:<20} {stats['total_s'] * 1e3:9.1f} ms  p50 {stats['p50_us']:8.1f} us  p99 {stats['p99_us']:8.1f} us"
+        if name in base_stages and stats['total_s']:
+            line += f"  {base_stages[name]['total_s'] / stats['total_s']:5.2f}x vs baseline"
+        print(line)
+    if baseline:
+        print(f"  end to end {baseline['end_to_end']['files_per_sec']:.0f} -> {e2e['files_per_sec']:.0f} files/s")
+
+
+def bench_suite(args):
+    """End-to-end and per sub-parser benchmark over generated fleets, saved as JSON"""
+    sizes = [int(size) for size in args.sizes.split(',')]
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = {run['size']: run for run in json.load(f)['runs']}
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'engine': args.engine,
+        'parser_version': PARSER_VERSION,
+        'seed': args.seed,
+        'runs': [],
+    }
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            print(f"Generating {size} reports...")
+            write_fleet(folder, size, args.seed)
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                result = executor.submit(_run_suite_size, folder, args.engine).result()
+        result['size'] = size
+        report['runs'].append(result)
+        _print_suite_result(size, result, baseline.get(size))
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+
+def bench_ingest(args):
+    """Cold load of a folder with different prefetch thread counts, I/O wait vs parse CPU"""
+    if args.latency_ms:
+        # Emulate a share: every read pays a fixed round trip on top of the local read
+        read = asset_ingest._read
+
+        def slow_read(file):
+            time.sleep(args.latency_ms / 1000)
+            data, seconds = read(file)
+            return data, seconds + args.latency_ms / 1000
+        asset_ingest._read = slow_read
+    parser = AssetParser()
+    with tempfile.TemporaryDirectory() as folder:
+        write_fleet(Path(folder) / 'assets', args.files)
+        print(f"{args.files} files, {args.latency_ms} ms simulated read latency, {args.workers} parse workers.")
+        for threads in [int(t) for t in args.threads.split(',')]:
+            cache = ParseCache(parser.cache_key, Path(folder) / f"cache-{threads}.sqlite")
+            scanner = asset_ingest.FolderScanner(Path(folder) / 'assets')
+            _, _, stats = asset_ingest.load_folder(scanner, cache, parser, workers=args.workers, prefetch_threads=threads)
+            print(f"{threads:>3} prefetch threads  wall {stats.wall_seconds:6.2f}s  {stats.summary()}")
+
+
+def bench_formats(args):
+    """Generic field specs vs the fingerprinted per-format parsers, per engine and per report format"""
+    with tempfile.TemporaryDirectory() as folder:
+        paths = write_fleet(folder, args.files) + sorted(ASSETS_FOLDER.glob('*.txt'))
+        contents = [(path, decode_report(path.read_bytes())[0]) for path in paths]
+    print(f"{len(contents)} reports.")
+    for engine in PARSER_ENGINES:
+        results = {}
+        for formats in (False, True):
+            parser = AssetParser(engine=engine, formats=formats)
+            assets = [parser.parse_asset_content(content, path, 0) for path, content in contents]
+            seconds = sum(parser.format_stats.seconds.values())
+            results[formats] = [{k: v for k, v in asset.items() if k != 'report_format'} for asset in assets]
+            label = 'per-format' if formats else 'generic'
+            print(f"{engine:<10} {label:<11} {seconds / len(contents) * 1e6:8.1f} us/file   {parser.format_stats.summary()}")
+        print(f"{engine:<10} same output: {'ok' if results[False] == results[True] else 'MISMATCH'}")
+
+
+def bench_http(args):
+    """Many concurrent clients pushing a synthetic fleet to a local ingest service"""
+    with tempfile.TemporaryDirectory() as folder:
+        reports = write_fleet(Path(folder) / 'outbox', args.files)
+        parser = AssetParser()
+        service = IngestService(Path(folder) / 'assets', parser, ParseCache(parser.cache_key, Path(folder) / 'cache.sqlite'),
+                                queue_size=args.queue_size, batch_size=args.batch_size)
+        server = make_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        service.start()
+        url = f"http://127.0.0.1:{server.server_port}/reports"
+
+        def upload(path):
+            # Like a well-behaved script: on 503, wait about Retry-After seconds (with jitter) and try again
+            data = path.read_bytes()
+            retries = 0
+            while True:
+                request = urllib.request.Request(f"{url}?name={path.name}", data=data, method='POST')
+                try:
+                    with urllib.request.urlopen(request, timeout=60):
+                        return retries
+                except urllib.error.HTTPError as e:
+                    if e.code != 503:
+                        raise
+                    retries += 1
+                    time.sleep(float(e.headers.get('Retry-After', 1)) * random.uniform(0.1, 1.0))
+
+        print(f"{len(reports)} reports, {args.clients} concurrent clients, queue {args.queue_size}, batches of {args.batch_size}.")
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(args.clients) as executor:
+            retries = sum(executor.map(upload, reports))
+        accepted_seconds = time.perf_counter() - t0
+        service.stop()
+        total_seconds = time.perf_counter() - t0
+        server.shutdown()
+        server.server_close()
+        stats = service.snapshot()
+        print(f"accepted in {accepted_seconds:6.2f}s  {len(reports) / accepted_seconds:7.0f} uploads/s  {retries} retries after 503")
+        print(f"written in  {total_seconds:6.2f}s  {stats['written'] / total_seconds:7.0f} reports/s  {stats['batches']} batches, "
+              f"max queue depth {stats['max_queue_depth']}, {stats['failed']} failed")
+
+
+def bench_snapshot(args):
+    """Building a fleet snapshot headlessly vs opening it, as the dashboard does on startup"""
+    with tempfile.TemporaryDirectory() as folder:
+        write_fleet(Path(folder) / 'assets', args.files)
+        parser = AssetParser()
+        t0 = time.perf_counter()
+        path = build_snapshot(Path(folder) / 'assets', Path(folder) / 'snapshots', parser, Path(folder) / 'cache.sqlite',
+                              scan=False, workers=1)
+        build_seconds = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        snapshot = read_snapshot(path)
+        open_seconds = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for name in snapshot.assets:
+            snapshot.assets[name]
+        decode_seconds = time.perf_counter() - t0
+        print(f"{args.files} assets, snapshot {path.stat().st_size / 2 ** 20:.1f} MB")
+        print(f"build (parse, no scans)  {build_seconds:7.2f}s")
+        print(f"open (header + table)    {open_seconds * 1000:7.1f} ms")
+        print(f"decode every asset       {decode_seconds:7.2f}s  ({decode_seconds / args.files * 1e6:.0f} us/asset, on first read)")
+
+
+STORE_QUERIES = [
+    ('one OS family', {'selected_os': ['Windows 11']}),
+    ('OS + manufacturer', {'selected_os': ['Windows 10'], 'selected_manufacturers': ['HP', 'LENOVO']}),
+    ('RAM 16-32 GB', {'min_ram': 16, 'max_ram': 32}),
+    ('low storage', {'show_low_storage': True}),
+    ('search program', {'search_term': 'acrobat'}),
+    ('search partial IP', {'search_term': '10.0.1'}),
+    ('search substring', {'search_term': 'dobe'}),
+    ('search short term', {'search_term': 'hp'}),
+    ('search + filter', {'selected_manufacturers': ['Dell Inc.'], 'search_term': 'teams'}),
+]
+
+
+def bench_store(args):
+    """Sidebar filter and global search latency: SQLite store vs the fleet table and the JSON search loop"""
+    parser = AssetParser()
+    for size in [int(s) for s in args.sizes.split(',')]:
+        rng = random.Random(0)
+        assets = {}
+        for index in range(size):
+            asset = parser.parse_asset_content(generate_report(rng, index), Path(f"{index}.txt"), 0)
+            name, assets[name] = inventory_record(Path(f"{index}.txt"), asset)
+        table = build_fleet_table(assets)
+        with tempfile.TemporaryDirectory() as folder:
+            store = AssetStore(Path(folder) / 'assets.sqlite')
+            t0 = time.perf_counter()
+            store.update(assets)
+            print(f"\n{size} assets, store built in {time.perf_counter() - t0:.1f}s "
+                  f"({(Path(folder) / 'assets.sqlite').stat().st_size / 2 ** 20:.0f} MB)")
+            print(f"{'query':<20} {'rows':>7} {'store p50':>10} {'store p95':>10} {'in memory':>10} {'rows':>7}")
+            for label, query in STORE_QUERIES:
+                filters = {'selected_os': [], 'selected_manufacturers': [], 'min_ram': 0, 'max_ram': 1024,
+                           'min_storage': 0.0, 'max_storage': 1e9, 'show_low_storage': False,
+                           'anydesk_search': '', 'search_term': '', **query}
+                latencies = []
+                for _ in range(args.repeat):
+                    t0 = time.perf_counter()
+                    rows = store.filter_names(filters)
+                    latencies.append(time.perf_counter() - t0)
+                latencies.sort()
+                # What filter_assets does without a store: column mask, then the JSON search over what is left
+                t0 = time.perf_counter()
+                names = table.index[filter_mask(table, filters).to_numpy()]
+                if filters['search_term']:
+                    term = filters['search_term'].lower()
+                    names = [name for name in names if term in json.dumps(assets[name], default=to_plain).lower()]
+                memory_seconds = time.perf_counter() - t0
+                print(f"{label:<20} {len(rows):>7} {_percentile(latencies, 0.5) * 1000:>8.1f}ms "
+                      f"{_percentile(latencies, 0.95) * 1000:>8.1f}ms {memory_seconds * 1000:>8.1f}ms {len(names):>7}")
+            store.close()
+
+
+def bench_probe(args):
+    """network_probe.py against local listeners on 127.0.0.0/8 (Linux): up, refusing and unresponsive hosts"""
+    port = 15985
+    hosts = [f"127.1.{i // 250}.{i % 250 + 1}" for i in range(args.hosts)]
+    down = set(hosts[-args.down:]) if args.down else set()
+    sockets = []
+    for index, host in enumerate(hosts):
+        if host in down:
+            # A listener whose backlog is full drops further SYNs: to the prober, a host that never answers
+            listener = socket.socket()
+            listener.bind((host, port))
+            listener.listen(0)
+            sockets.append(listener)
+            for _ in range(3):
+                filler = socket.socket()
+                filler.setblocking(False)
+                try:
+                    filler.connect((host, port))
+                except BlockingIOError:
+                    pass
+                sockets.append(filler)
+        elif index % 10 == 0:
+            listener = socket.socket()
+            listener.bind((host, port))
+            listener.listen(128)
+            sockets.append(listener)
+        # The rest refuse the connection, which also proves the host is up
+    time.sleep(0.5)
+    print(f"{len(hosts)} hosts ({len(down)} unresponsive), port {port}, timeout {args.timeout}s, "
+          f"concurrency {args.concurrency}")
+    t0 = time.perf_counter()
+    results = probe_hosts(hosts, ports=(port,), timeout=args.timeout, concurrency=args.concurrency, icmp=False)
+    seconds = time.perf_counter() - t0
+    wrong = sum(1 for host, result in results.items() if (result['status'] == 'offline') != (host in down))
+    print(f"probed in {seconds:.2f}s  {len(hosts) / seconds:.0f} hosts/s  {wrong} wrong")
+    for sock in sockets:
+        sock.close()
+
+
+def main():
+    logging.disable(logging.INFO)
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    fields = commands.add_parser('fields', help='micro-benchmark of scalar field extraction on the assets/ samples')
+    fields.add_argument('--repeat', type=int, default=200)
+    fields.set_defaults(func=bench_fields)
+
+    parallel = commands.add_parser('parallel', help='scaling of process-pool parsing over a synthetic fleet')
+    parallel.add_argument('--files', type=int, default=10000)
+    parallel.add_argument('--workers', help='comma separated worker counts (default 1, 2, 4 ... cores)')
+    parallel.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parallel.add_argument('--engine', default='regex')
+    parallel.set_defaults(func=bench_parallel)
+
+    memory = commands.add_parser('memory', help='per-asset memory of dict assets vs AssetRecord')
+    memory.add_argument('--files', type=int, default=10000)
+    memory.set_defaults(func=bench_memory)
+
+    suite = commands.add_parser('suite', help='files/s, latency percentiles, peak RSS and per sub-parser timings')
+    suite.add_argument('--sizes', default='1000,10000,100000', help='comma separated fleet sizes')
+    suite.add_argument('--engine', default='regex')
+    suite.add_argument('--seed', type=int, default=0)
+    suite.add_argument('--output', default='parser_benchmark.json')
+    suite.add_argument('--baseline', help='earlier --output file to compare against')
+    suite.set_defaults(func=bench_suite)
+
+    ingest = commands.add_parser('ingest', help='folder scan + prefetch + parse, I/O wait vs parse CPU')
+    ingest.add_argument('--files', type=int, default=2000)
+    ingest.add_argument('--threads', default='1,8', help='comma separated prefetch thread counts')
+    ingest.add_argument('--latency-ms', type=float, default=0.0, help='simulated per-read latency')
+    ingest.add_argument('--workers', type=int, default=1)
+    ingest.set_defaults(func=bench_ingest)
+
+    formats = commands.add_parser('formats', help='generic vs fingerprinted per-format parsing, with per-format timings')
+    formats.add_argument('--files', type=int, default=2000)
+    formats.set_defaults(func=bench_formats)
+
+    http = commands.add_parser('http', help='concurrent uploads to a local ingest_service.py, throughput and queue depth')
+    http.add_argument('--files', type=int, default=2000)
+    http.add_argument('--clients', type=int, default=200)
+    http.add_argument('--queue-size', type=int, default=500)
+    http.add_argument('--batch-size', type=int, default=200)
+    http.set_defaults(func=bench_http)
+
+    snapshot = commands.add_parser('snapshot', help='fleet_snapshot.py build time vs dashboard open time')
+    snapshot.add_argument('--files', type=int, default=10000)
+    snapshot.set_defaults(func=bench_snapshot)
+
+    store = commands.add_parser('store', help='asset_store.py filter and search latency vs in-memory filtering')
+    store.add_argument('--sizes', default='10000,100000', help='comma separated fleet sizes')
+    store.add_argument('--repeat', type=int, default=20)
+    store.set_defaults(func=bench_store)
+
+    probe = commands.add_parser('probe', help='built-in liveness prober against local listeners on 127.0.0.0/8')
+    probe.add_argument('--hosts', type=int, default=5000)
+    probe.add_argument('--down', type=int, default=500, help='hosts that never answer')
+    probe.add_argument('--timeout', type=float, default=1.0)
+    probe.add_argument('--concurrency', type=int, default=1000)
+    probe.set_defaults(func=bench_probe)
+
+    args = arg_parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,9 +7,19 @@ import json
 
 class DashboardComponents:
     """Reusable components for the IT Asset Management Dashboard"""
+
+    def __init__(self, asset_parser=None):
+        # Parser used to fill in sections a lazy parse left out, when a component needs them
+        self.asset_parser = asset_parser
+
+    def load_sections(self, asset: Dict[str, Any]) -> None:
+        """Make sure the lazily parsed sections of asset are there"""
+        if self.asset_parser is not None:
+            self.asset_parser.load_sections(asset)
     
     def render_system_info(self, asset: Dict[str, Any]):
         """Render system information for an asset"""
+        self.load_sections(asset)
         st.subheader("System Information")
         
         col1, col2 = st.columns(2)
@@ -119,6 +129,7 @@ class DashboardComponents:
 
     def render_software_info(self, asset: Dict[str, Any]):
         """Render software information for an asset"""
+        self.load_sections(asset)
         st.subheader("Software Information")
         
         # Office and Antivirus information
@@ -1,6 +1,7 @@
 import time
 import sys
-from asset_parser import AssetParser
+import random
+from asset_parser import AssetParser, FIELD_SPECS
 from pathlib import Path
 
 def test():
@@ -41,5 +42,126 @@ def test():
         print("Done file.")
         sys.stdout.flush()
 
+def _diff(old, new, path=''):
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in list(old) + [k for k in new if k not in old]:
+            yield from _diff(old.get(key), new.get(key), f"{path}.{key}" if path else key)
+    elif old != new:
+        yield path, old, new
+
+# Inline reports with the fields both engines must find, as the original per-field regexes did
+EDGE_CASES = {
+    # A label with an empty value must not swallow the label on the next line
+    'empty value before a label': ("Computer Name: PC1\nAntivirus:\nOffice Version: Microsoft Office 2019\n",
+                                   {'office_version': 'Microsoft Office 2019'}),
+}
+
+def compare_edge_cases():
+    failed = []
+    for engine in ('regex', 'tokenizer'):
+        p = AssetParser(engine=engine)
+        for name, (content, expected) in EDGE_CASES.items():
+            asset = p.parse_asset_content(content, Path(f"{name}.txt"), 0)
+            values = {field: asset['software_info'].get(field, asset.get(field)) for field in expected}
+            ok = values == expected
+            if not ok:
+                failed.append((engine, name))
+            print(f"{engine:<10} {name:<28} {'ok' if ok else f'MISMATCH {values!r}'}")
+    return failed
+
+def compare():
+    regex_parser = AssetParser(engine='regex')
+    token_parser = AssetParser(engine='tokenizer')
+    failed = compare_edge_cases()
+    files = list(Path('assets').glob('*.txt'))
+    print(f"Comparing engines on {len(files)} files.")
+    
+    regex_total = token_total = 0.0
+    for f in files:
+        t0 = time.perf_counter()
+        old = regex_parser.parse_asset_file(f)
+        regex_total += time.perf_counter() - t0
+        
+        t0 = time.perf_counter()
+        new = token_parser.parse_asset_file(f)
+        token_total += time.perf_counter() - t0
+        
+        print(f"--- {f.name} ---")
+        if old is None or new is None:
+            print(f"regex: {'ok' if old else 'FAILED'}, tokenizer: {'ok' if new else 'FAILED'}")
+            continue
+        for path, old_value, new_value in _diff(old, new):
+            print(f"{path}: regex={old_value!r} tokenizer={new_value!r}")
+    
+    print(f"regex: {regex_total * 1000:.1f} ms, tokenizer: {token_total * 1000:.1f} ms")
+    if failed:
+        print(f"Edge cases failed: {failed}")
+        sys.exit(1)
+
+def profile(folder='assets'):
+    p = AssetParser(profile=True)
+    files = list(Path(folder).glob('*.txt'))
+    for f in files:
+        p.parse_asset_file(f)
+    print(p.profiler.format_report())
+
+def _adversarial_inputs(size, rng):
+    """Inputs aimed at the regex worst cases: long runs after labels, label spam, unterminated blocks"""
+    labels = [label for spec in FIELD_SPECS for label in spec.labels]
+    label_lines = '\n'.join(f"{label}:" for label in labels) + '\n'
+    yield 'long line after label', 'CPU: ' + 'x' * size
+    yield 'whitespace after label', 'Memory' + ' \t' * (size // 2)
+    yield 'newlines after label', 'Hostname:' + '\n' * size
+    yield 'blank lines after labels', ('Hostname:\n' + '\n' * 50) * (size // 60)
+    yield 'colons', ':' * size
+    yield 'repeated labels on one line', 'CPU: ' * (size // 5)
+    yield 'empty label lines', label_lines * (size // len(label_lines))
+    yield 'licensed colons', 'Licensed' + ':' * size
+    yield 'unterminated ps session', 'Enter-PSSession' + ' ' * size
+    yield 'open header', '=== ' * (size // 4)
+    yield 'many headers', '=== Local Disks ===\n' * (size // 20)
+    yield 'long disk line', '=== Local Disks ===\n  C: Total: ' + '1' * size
+    yield 'unterminated block', 'Installed Programs:\n' + '  - x\n' * (size // 6)
+    yield 'nul bytes', '\x00' * size
+    alphabet = ' \t\n:=-.,0123456789abcXYZ\x00'
+    noise = ''.join(rng.choice(alphabet) for _ in range(size))
+    yield 'noise with labels', ''.join(rng.choice(labels) + ':' + noise[i:i + 40] for i in range(0, size, 40))
+
+def fuzz(size=20000, growth=8):
+    """Check that parse time grows linearly with the size of adversarial inputs, for both engines"""
+    worst = 0.0
+    failed = []
+    for engine in ('regex', 'tokenizer'):
+        p = AssetParser(engine=engine)
+        small_inputs = dict(_adversarial_inputs(size, random.Random(0)))
+        large_inputs = dict(_adversarial_inputs(size * growth, random.Random(0)))
+        for name, small in small_inputs.items():
+            large = large_inputs[name]
+            t0 = time.perf_counter()
+            p.parse_asset_content(small, Path('fuzz.txt'), mtime=0)
+            t_small = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            p.parse_asset_content(large, Path('fuzz.txt'), mtime=0)
+            t_large = time.perf_counter() - t0
+            worst = max(worst, t_large)
+            # Linear growth gives a ratio close to growth; allow 2x slack for timer noise on tiny inputs
+            ratio = t_large / max(t_small, 1e-4)
+            ok = ratio < growth * 2
+            if not ok:
+                failed.append((engine, name))
+            print(f"{engine:<10} {name:<28} {len(large):>8} chars {t_large * 1000:8.1f} ms  x{ratio:5.1f} {'ok' if ok else 'SUPERLINEAR'}")
+    print(f"Slowest parse: {worst * 1000:.1f} ms")
+    if failed:
+        print(f"Superlinear inputs: {failed}")
+        sys.exit(1)
+
 if __name__ == '__main__':
-    test()
+    if 'compare' in sys.argv[1:]:
+        compare()
+    elif 'fuzz' in sys.argv[1:]:
+        fuzz()
+    elif 'profile' in sys.argv[1:]:
+        args = [a for a in sys.argv[1:] if a != 'profile']
+        profile(*args[:1])
+    else:
+        test()
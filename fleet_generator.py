@@ -0,0 +1,170 @@
+"""
+Synthetic fleet generator for parser benchmarks.
+
+Writes infopc-style reports with the variations seen in the field: Italian
+decimal RAM ("7,9 GB"), several disks in the Local Disks block, long installed
+program lists, UTF-8 (with and without BOM), UTF-16LE and cp1252 encodings,
+and sections that are missing altogether.
+
+Run:
+    python fleet_generator.py OUTPUT_FOLDER [--count N] [--seed N]
+"""
+import argparse
+import codecs
+import random
+from pathlib import Path
+from typing import List
+
+MANUFACTURERS = {
+    'HP': ['HP ProDesk 400 G1 SFF', 'HP Pro SFF 400 G9 Desktop PC', 'HP EliteBook 840 G8'],
+    'Dell Inc.': ['OptiPlex 7090', 'Latitude 5520', 'Precision 3650 Tower'],
+    'LENOVO': ['20TDS0B100', 'ThinkCentre M720q', 'ThinkPad T14 Gen 2'],
+    'Supermicro': ['Super Server'],
+    'Default string': ['Default string'],
+}
+OS_VERSIONS = [
+    'Microsoft Windows 10 Pro (10.0.19045 Build 19045)',
+    'Microsoft Windows 11 Pro (10.0.22631 Build 22631)',
+    'Microsoft Windows 11 Pro (10.0.22621 Build 22621)',
+    'Microsoft Windows 10 专业版 (10.0.19045 Build 19045)',
+]
+LANGUAGES = ['Italiano (Italia)', 'English (United Kingdom)', 'English (United States)', 'Chinese (Simplified, PRC)']
+CPUS = [
+    'Intel(R) Core(TM) i5-4570 CPU @ 3.20GHz (Socket: SOCKET 0)',
+    '12th Gen Intel(R) Core(TM) i3-12100 (Socket: U3E1)',
+    'Intel(R) Xeon(R) CPU E5-1650 v4 @ 3.60GHz (Socket: CPU1)',
+    'AMD Ryzen 5 5600G with Radeon Graphics (Socket: AM4)',
+]
+GPUS = ['Intel(R) UHD Graphics 730', 'NVIDIA Quadro P4000', 'NVIDIA GeForce 210', 'AMD Radeon(TM) Graphics']
+MONITORS = ['Philips 220SW', 'HP227DCB', 'PHL 241V8LAB', 'DELL P2419H']
+ANTIVIRUS = ['Windows Defender', 'Avast Antivirus; Windows Defender', 'McAfee; Windows Defender']
+DNS_SERVERS = ['8.8.8.8, 1.1.1.1', '8.8.8.8, 8.8.4.4', '10.0.0.1']
+PROGRAM_VENDORS = ['Microsoft', 'Adobe', 'Autodesk', 'Google', 'Mozilla', 'NVIDIA', 'Intel', 'Realtek', '7-Zip', 'VideoLAN']
+PROGRAM_NAMES = ['Runtime', 'Update Helper', 'Driver Package', 'Visual C++ 2015-2022 Redistributable (x64)',
+                 'Chrome', 'Firefox (x64 it)', 'Acrobat Reader DC', 'Teams Machine-Wide Installer',
+                 'Graphics Driver', 'Audio Driver', 'Media Player', 'Edge WebView2 Runtime']
+ADOBE_AUTODESK = ['Adobe Acrobat (64-bit) v25.001.20844', 'Adobe Creative Cloud v3.9.0.327',
+                  'AutoCAD LT 2023 - Italiano (Italian) v24.2.53.0', 'Autodesk Access v2.4.0.119',
+                  'Autodesk DWG TrueView 2026 - English v25.1.60.0']
+ENCODINGS = [('utf-8-sig', 55), ('utf-8', 15), ('utf-16', 20), ('cp1252', 10)]
+OPTIONAL_SECTIONS = ['network', 'credentials', 'shared', 'office', 'adobe', 'programs', 'bitlocker', 'disks',
+                     'systeminfo', 'winrm']
+
+
+def _ram(rng: random.Random) -> str:
+    gb = rng.choice([3.9, 7.7, 7.9, 15.8, 15.9, 31.9, 63.9])
+    # Italian and other locales write the decimal with a comma
+    return f"{gb:.1f} GB".replace('.', ',') if rng.random() < 0.4 else f"{gb:.1f} GB"
+
+
+def _programs(rng: random.Random, count: int) -> List[str]:
+    return sorted({f"{rng.choice(PROGRAM_VENDORS)} {rng.choice(PROGRAM_NAMES)} {rng.randint(1, 30)}.{rng.randint(0, 9)}"
+                   for _ in range(count)})
+
+
+def generate_report(rng: random.Random, index: int) -> str:
+    """One report, as the infopc script writes it"""
+    host = f"PC-{index:06d}"
+    ip = f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}"
+    manufacturer = rng.choice(list(MANUFACTURERS))
+    missing = {section for section in OPTIONAL_SECTIONS if rng.random() < 0.1}
+
+    lines = [
+        f"IP Address:          {ip}",
+        f"Hostname:            {host}",
+        f"PC Domain:           {host}",
+        f"AnyDesk ID:          {rng.randint(100000000, 1999999999)}",
+        f"Windows account:     {host}\\Administrator",
+        f"OS Version:          {rng.choice(OS_VERSIONS)}",
+        f"OS Install Date:     202{rng.randint(0, 5)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)} 08:40:46",
+        f"Last Reboot Time:    2026-03-0{rng.randint(1, 9)} 10:42:31",
+        f"System Uptime:       {rng.randint(0, 40)}d {rng.randint(0, 23)}h {rng.randint(0, 59)}m",
+        "User Email(s):       No Email Found",
+        f"CPU:                 {rng.choice(CPUS)}",
+        f"RAM:                 {_ram(rng)}",
+        f"GPU:                 {rng.choice(GPUS)}",
+        f"Monitor Model:       {rng.choice(MONITORS)}",
+        "",
+        f"System Manufacturer: {manufacturer}",
+        f"System Model:        {rng.choice(MANUFACTURERS[manufacturer])}",
+        f"Serial Number:       CZC{rng.randint(1000000, 9999999)}",
+        f"BIOS Version:        L02 v02.{rng.randint(10, 99)}",
+        f"Windows Language:    {rng.choice(LANGUAGES)}",
+        "",
+    ]
+    if 'network' not in missing:
+        lines += ["Network Configuration:",
+                  f"    Network Mode:    {rng.choice(['Static (0)', 'DHCP (1)'])}",
+                  f"    DNS Servers:     {rng.choice(DNS_SERVERS)}",
+                  "    Default Gateway: 10.0.0.1", ""]
+    if 'credentials' not in missing:
+        lines += ["Stored Network Credentials:"]
+        lines += [f"  cmdkey: Target=Domain:target=192.168.100.{rng.randint(1, 254)}, User=user{rng.randint(1, 999)}"
+                  for _ in range(rng.randint(0, 6))] or ["  No stored credentials"]
+        lines += [""]
+    if 'shared' not in missing:
+        lines += ["Shared Folders:"]
+        lines += [f"  Share{n} -> D:\\Share{n}" for n in range(rng.randint(0, 3))] or ["  None"]
+        lines += [""]
+    if 'office' not in missing:
+        lines += ["Office Version:", f"  Microsoft Office (16.0.{rng.randint(10000, 19999)}.20152) (via path)", ""]
+    lines += ["OS Activation:", "  Licensed", "", "Antivirus:", f"  {rng.choice(ANTIVIRUS)}", ""]
+    if 'adobe' not in missing:
+        lines += ["Adobe/Autodesk:", "  " + "; ".join(rng.sample(ADOBE_AUTODESK, rng.randint(1, len(ADOBE_AUTODESK)))), ""]
+    if 'programs' not in missing:
+        # Long tail: most machines have a few dozen programs, some several hundred
+        count = int(rng.paretovariate(1.5) * 40)
+        lines += ["Installed Programs:"] + [f"  {name}" for name in _programs(rng, min(count, 600))] + [""]
+    if 'bitlocker' not in missing:
+        lines += ["Bitlocker Status:", "  C: Protection: Off, Encryption: FullyDecrypted", ""]
+    if 'disks' not in missing:
+        lines += ["=== Local Disks (Space & Type) ==="]
+        for letter in 'CDEFGH'[:rng.randint(1, 4)]:
+            total = rng.choice([243125, 476940, 953869, 1907729])
+            lines.append(f"  {letter}: Total: {total} MB, Free: {total * rng.random():.2f} MB, "
+                         f"Type: {rng.choice(['SSD', 'HDD'])}")
+        lines += [""]
+    if 'systeminfo' not in missing:
+        lines += ["=== systeminfo (selected fields) ===",
+                  f"  System Manufacturer: {manufacturer}",
+                  f"  OS Name: {rng.choice(OS_VERSIONS).split(' (')[0]}",
+                  "  OS Configuration: Standalone Workstation",
+                  f"  Logon Server: \\\\{host}", ""]
+    if 'winrm' not in missing:
+        lines += ["=== Quick WinRM Access ===", f"Enter-PSSession -ComputerName {ip} -Credential {host}\\ced"]
+    return "\r\n".join(lines) + "\r\n"
+
+
+def encode_report(text: str, encoding: str) -> bytes:
+    """Encode a report the way the script's Out-File / redirection would have written it"""
+    if encoding == 'utf-16':
+        return codecs.BOM_UTF16_LE + text.encode('utf-16-le')
+    return text.encode(encoding, errors='replace')
+
+
+def write_fleet(folder: Path, count: int, seed: int = 0) -> List[Path]:
+    """Write count reports to folder and return their paths"""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    encodings, weights = zip(*ENCODINGS)
+    paths = []
+    for i in range(count):
+        path = folder / f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}_PC-{i:06d}.txt"
+        path.write_bytes(encode_report(generate_report(rng, i), rng.choices(encodings, weights)[0]))
+        paths.append(path)
+    return paths
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('output', type=Path)
+    arg_parser.add_argument('--count', type=int, default=1000)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    paths = write_fleet(args.output, args.count, args.seed)
+    print(f"Wrote {len(paths)} reports to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+"""
+Headless ingest that prebuilds a fleet snapshot for the dashboard.
+
+Parses the assets folder with the dashboard's parser settings, runs the nmap quick
+scans and writes everything the dashboard needs into one snapshot file. On startup
+the dashboard memory-maps the newest snapshot instead of parsing: it reads the small
+header and the fleet table, and decodes each asset only when something reads it.
+Reports changed since the snapshot was written are parsed on top of it.
+
+Schedule it from the dashboard's directory (cron, Windows Task Scheduler):
+
+    python fleet_snapshot.py [--folder assets] [--output .asset_snapshot] [--engine regex] [--lazy]
+                             [--workers N] [--no-scan] [--nmap nmap] [--scan-mode batch]
+                             [--history .asset_history] [--store .asset_cache/assets.sqlite]
+                             [--scan-cache .asset_cache/scan_cache.json]
+
+The parse cache is shared with the dashboard and the ingest service, so a run only
+parses the reports that changed since the last one. Each run writes a new
+fleet-YYYYmmdd-HHMMSS.snap and deletes older snapshots no dashboard has open. The
+quick scan results also go into the dashboard's scan cache, so a session opening the
+snapshot shows them with their age and rescans the stale ones in the background.
+"""
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import MutableMapping
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Tuple
+
+import pandas as pd
+
+from asset_history import AssetHistory, DEFAULT_HISTORY_FOLDER
+from asset_ingest import FolderScanner, ScannedFile, load_folder
+from asset_parser import AssetParser, PARSER_ENGINES
+from asset_record import AssetRecord, to_plain
+from asset_store import AssetStore
+from asset_watcher import FolderChanges
+from fleet_table import build_fleet_table, table_from_columns, table_columns
+from network_scan import quick_scan_assets, QUICK_SCAN_MODES
+from parse_cache import ParseCache, DEFAULT_CACHE_FILE
+from scan_cache import ScanCache, DEFAULT_SCAN_CACHE_FILE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_FOLDER = Path('.asset_snapshot')
+SNAPSHOT_GLOB = 'fleet-*.snap'
+# Snapshots kept after a run; the newest ones may still be mapped by a dashboard session
+KEEP_SNAPSHOTS = 2
+
+# File layout: magic, format version and header length, the JSON header, then the body.
+# The header holds the listing and, per asset, where its blob sits in the body; the body
+# starts with the fleet table (zlib-compressed JSON columns) followed by the asset blobs.
+SNAPSHOT_MAGIC = b'ASSETSNP'
+SNAPSHOT_FORMAT_VERSION = 2
+_PREAMBLE = struct.Struct('<8sIQ')
+# An asset blob: length of the compressed JSON, the JSON, then raw_content as AssetRecord keeps it
+_BLOB_HEADER = struct.Struct('<I')
+
+
+def inventory_record(file_path: Path, asset: Dict[str, Any]) -> Tuple[str, AssetRecord]:
+    """(asset name, compact record) for a freshly parsed report, marked for a quick scan"""
+    asset_name = asset.get('computer_name', Path(file_path).stem)
+    if 'network_info' not in asset: asset['network_info'] = {}
+    asset['network_info']['nmap_scan_status'] = 'pending_quick_scan'
+    asset['network_info']['status'] = asset['network_info'].get('status', 'unknown')
+    # Compact record: interned categorical strings, dict-compatible for the rendering code
+    return asset_name, AssetRecord.from_dict(asset)
+
+
+def _encode_asset(record: AssetRecord) -> bytes:
+    raw = getattr(record, 'raw_content', None)
+    if isinstance(raw, bytes):
+        # Already zlib-compressed in the record: stored as is, so loading it costs nothing
+        data = {key: to_plain(value) for key, value in record.items() if key != 'raw_content'}
+    else:
+        data, raw = to_plain(record), b''
+    document = zlib.compress(json.dumps(data).encode('utf-8'))
+    return _BLOB_HEADER.pack(len(document)) + document + raw
+
+
+def _decode_asset(blob: bytes) -> AssetRecord:
+    (length,) = _BLOB_HEADER.unpack_from(blob)
+    start = _BLOB_HEADER.size
+    data = json.loads(zlib.decompress(blob[start:start + length]))
+    if len(blob) > start + length:
+        data['raw_content'] = blob[start + length:]
+    return AssetRecord.from_dict(data)
+
+
+class SnapshotAssets(MutableMapping):
+    """assets_data backed by a mapped snapshot: each asset is decoded the first time it is read
+
+    Assets set or deleted afterwards (watcher updates, scans) live in memory like in a dict;
+    iteration keeps the snapshot's order with new assets at the end.
+    """
+
+    def __init__(self, view: mmap.mmap, spans: Iterable[Tuple[str, int, int]]):
+        self._view = view
+        # Name -> decoded record, or (offset, length) of its blob while not decoded yet
+        self._items: Dict[str, Any] = {name: (offset, length) for name, offset, length in spans}
+
+    def __getitem__(self, name):
+        value = self._items[name]
+        if type(value) is tuple:
+            offset, length = value
+            value = self._items[name] = _decode_asset(self._view[offset:offset + length])
+        return value
+
+    def __setitem__(self, name, value):
+        self._items[name] = value
+
+    def __delitem__(self, name):
+        del self._items[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, name):
+        return name in self._items
+
+    @property
+    def decoded(self) -> int:
+        return sum(1 for value in self._items.values() if type(value) is not tuple)
+
+
+@dataclass
+class FleetSnapshot:
+    """A snapshot opened for the dashboard"""
+    path: Path
+    created: datetime
+    folder: str
+    parser_key: str
+    scanned: bool
+    assets: SnapshotAssets
+    table: pd.DataFrame
+    # The folder listing the snapshot was built from, and report path -> asset name
+    files: List[ScannedFile] = field(default_factory=list)
+    asset_files: Dict[str, str] = field(default_factory=dict)
+    quarantine: Dict[str, str] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        scans = 'with quick scans' if self.scanned else 'without scans'
+        return f"{self.path.name}, {len(self.assets)} assets {scans}, built {self.created:%Y-%m-%d %H:%M:%S}"
+
+
+def write_snapshot(output_folder: Path, folder: Path, parser_key: str, assets: Dict[str, AssetRecord],
+                   table: pd.DataFrame, files: List[ScannedFile], asset_files: Dict[str, str],
+                   quarantine: Dict[str, str], scanned: bool, now: Optional[datetime] = None) -> Path:
+    """Write a snapshot file into output_folder and return its path"""
+    now = now or datetime.now()
+    blobs = [zlib.compress(json.dumps({'names': list(table.index), 'columns': table_columns(table)},
+                                      default=to_plain).encode('utf-8'))]
+    spans = []
+    offset = len(blobs[0])
+    for name, record in assets.items():
+        blob = _encode_asset(record)
+        spans.append([name, offset, len(blob)])
+        blobs.append(blob)
+        offset += len(blob)
+    header = json.dumps({
+        'created': now.isoformat(), 'folder': str(folder), 'parser': parser_key, 'scanned': scanned,
+        'table': [0, len(blobs[0])], 'assets': spans,
+        'files': [[str(f.path), f.st_size, f.st_mtime_ns] for f in files],
+        'asset_files': asset_files, 'quarantine': quarantine,
+    }).encode('utf-8')
+
+    output_folder = Path(output_folder)
+    output_folder.mkdir(parents=True, exist_ok=True)
+    path = output_folder / f"fleet-{now:%Y%m%d-%H%M%S}.snap"
+    # Written under another name and moved into place, so a dashboard never maps half a snapshot
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.part")
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_snapshot(path: Path) -> FleetSnapshot:
+    """Map a snapshot file; raises ValueError if it is not a snapshot of this format"""
+    path = Path(path)
+    with open(path, 'rb') as f:
+        view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, header_length = _PREAMBLE.unpack_from(view) if len(view) >= _PREAMBLE.size else (b'', 0, 0)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_FORMAT_VERSION:
+        view.close()
+        raise ValueError(f"not a version {SNAPSHOT_FORMAT_VERSION} fleet snapshot")
+    header = json.loads(view[_PREAMBLE.size:_PREAMBLE.size + header_length])
+    body = _PREAMBLE.size + header_length
+    table_offset, table_length = header['table']
+    table_data = json.loads(zlib.decompress(view[body + table_offset:body + table_offset + table_length]))
+    return FleetSnapshot(
+        path=path,
+        created=datetime.fromisoformat(header['created']),
+        folder=header['folder'],
+        parser_key=header['parser'],
+        scanned=header['scanned'],
+        assets=SnapshotAssets(view, ((name, body + offset, length) for name, offset, length in header['assets'])),
+        table=table_from_columns(table_data['names'], table_data['columns']),
+        files=[ScannedFile(Path(file_path), size, mtime_ns) for file_path, size, mtime_ns in header['files']],
+        asset_files=header['asset_files'],
+        quarantine=header['quarantine'],
+    )
+
+
+def latest_snapshot(folder: Path = DEFAULT_SNAPSHOT_FOLDER) -> Optional[Path]:
+    """The newest snapshot in folder, or None"""
+    snapshots = sorted(Path(folder).glob(SNAPSHOT_GLOB))
+    return snapshots[-1] if snapshots else None
+
+
+def prune_snapshots(folder: Path = DEFAULT_SNAPSHOT_FOLDER, keep: int = KEEP_SNAPSHOTS) -> None:
+    """Delete all but the keep newest snapshots; ones still mapped (on Windows) are left for the next run"""
+    for path in sorted(Path(folder).glob(SNAPSHOT_GLOB))[:-keep or None]:
+        try:
+            path.unlink()
+        except OSError as e:
+            logger.info(f"Keeping {path.name} for now: {e}")
+
+
+def changes_since(known: Iterable[ScannedFile], scanned: Iterable[ScannedFile]) -> FolderChanges:
+    """Reports added, changed or removed between two listings of the folder"""
+    before = {str(f.path): (f.st_size, f.st_mtime_ns) for f in known}
+    changes = FolderChanges()
+    for f in scanned:
+        if before.pop(str(f.path), None) != (f.st_size, f.st_mtime_ns):
+            changes.upserts.append(f)
+    changes.removals.extend(Path(file_path) for file_path in before)
+    return changes
+
+
+def build_snapshot(folder: Path, output_folder: Path, parser: AssetParser, cache_file: Path = DEFAULT_CACHE_FILE,
+                   scan: bool = True, nmap_path: str = 'nmap', scan_mode: str = 'batch',
+                   history_folder: Optional[Path] = None, store_file: Optional[Path] = None,
+                   scan_cache_file: Optional[Path] = None, **options) -> Path:
+    """Ingest folder like the dashboard's full load and write a snapshot; options go to load_folder"""
+    cache = ParseCache(parser.cache_key, cache_file)
+    files, parsed_items, stats = load_folder(FolderScanner(folder), cache, parser, force_scan=True, **options)
+    assets: Dict[str, AssetRecord] = {}
+    asset_files: Dict[str, str] = {}
+    for file_path, asset in parsed_items:
+        if not asset:
+            continue
+        try:
+            name, assets[name] = inventory_record(file_path, asset)
+            asset_files[str(file_path)] = name
+        except Exception as e:
+            logger.error(f"Error processing text for file {file_path}: {e}", exc_info=True)
+    cache.prune()
+    cache.save()
+    logger.info(f"Parse cache: {cache.summary()}, {cache.stats['removed']} removed")
+
+    if scan:
+        logger.info(f"Running nmap quick scans for {len(assets)} assets...")
+        scan_cache = ScanCache(scan_cache_file) if scan_cache_file else None
+        quick_scan_assets(assets, nmap_path, mode=scan_mode, cache=scan_cache)
+    table = build_fleet_table(assets)
+    if history_folder:
+        try:
+            AssetHistory(history_folder).record(table, complete=True)
+        except Exception as e:
+            logger.error(f"Could not record asset history: {e}", exc_info=True)
+    if store_file:
+        store = AssetStore(store_file)
+        try:
+            store.update(assets)
+        finally:
+            store.close()
+    quarantine = {file_path: entry['reason'] for file_path, entry in cache.quarantine.items()}
+    path = write_snapshot(output_folder, folder, parser.cache_key, assets, table, files, asset_files, quarantine, scan)
+    prune_snapshots(output_folder)
+    logger.info(f"Wrote {path} ({len(assets)} assets, {path.stat().st_size / 2 ** 20:.1f} MB)")
+    return path
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--folder', type=Path, default=Path('assets'))
+    arg_parser.add_argument('--output', type=Path,
+                            default=Path(os.getenv('ASSET_SNAPSHOT_FOLDER') or DEFAULT_SNAPSHOT_FOLDER))
+    arg_parser.add_argument('--cache', type=Path, default=Path(os.getenv('ASSET_PARSE_CACHE', str(DEFAULT_CACHE_FILE))))
+    arg_parser.add_argument('--history', default=os.getenv('ASSET_HISTORY_FOLDER', str(DEFAULT_HISTORY_FOLDER)),
+                            help='asset history folder (empty disables it)')
+    arg_parser.add_argument('--store', default=os.getenv('ASSET_STORE_FILE', ''),
+                            help='asset store (SQLite) to update as well (empty: none)')
+    arg_parser.add_argument('--engine', choices=PARSER_ENGINES, default=os.getenv('ASSET_PARSER_ENGINE', 'regex'))
+    arg_parser.add_argument('--lazy', action='store_true', default=os.getenv('ASSET_LAZY_SECTIONS', '0') == '1',
+                            help="parse like the dashboard's Lazy Sections mode; the dashboard only opens matching snapshots")
+    arg_parser.add_argument('--workers', type=int, default=0, help='parse worker processes (0 = one per core)')
+    arg_parser.add_argument('--no-scan', action='store_true', help='skip the nmap quick scans (statuses stay pending)')
+    arg_parser.add_argument('--nmap', default='nmap', help='nmap executable')
+    arg_parser.add_argument('--scan-mode', choices=QUICK_SCAN_MODES, default=os.getenv('ASSET_QUICK_SCAN_MODE', 'batch'))
+    arg_parser.add_argument('--scan-cache', default=os.getenv('ASSET_SCAN_CACHE', str(DEFAULT_SCAN_CACHE_FILE)),
+                            help="the dashboard's scan cache to store the quick scan results in (empty: none)")
+    args = arg_parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if not args.folder.is_dir():
+        arg_parser.error(f"{args.folder} is not a folder")
+    parser = AssetParser(engine=args.engine, lazy=args.lazy)
+    build_snapshot(args.folder, args.output, parser, args.cache, scan=not args.no_scan, nmap_path=args.nmap,
+                   scan_mode=args.scan_mode, history_folder=Path(args.history) if args.history else None,
+                   store_file=Path(args.store) if args.store else None,
+                   scan_cache_file=Path(args.scan_cache) if args.scan_cache else None, workers=args.workers or None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+import re
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Iterable
+
+import pandas as pd
+
+from asset_record import to_plain
+
+# Column -> dtype of the fleet table; list columns hold plain lists (of dicts for storage)
+FLEET_COLUMNS = {
+    'computer_name': 'string',
+    'file_path': 'string',
+    'last_modified': 'datetime64[ns]',
+    'ip_address': 'string',
+    'mac_address': 'string',
+    'status': 'category',
+    'nmap_scan_status': 'category',
+    'scanned_at': 'datetime64[ns]',
+    'os_version': 'category',
+    'os_family': 'category',
+    'os_language': 'category',
+    'os_activation': 'category',
+    'manufacturer': 'category',
+    'model': 'category',
+    'serial_number': 'string',
+    'bios_version': 'string',
+    'cpu': 'category',
+    'gpu': 'category',
+    'ram_gb': 'float64',
+    'storage_total_gb': 'float64',
+    'c_free_gb': 'float64',
+    'anydesk_id': 'string',
+    'user_email': 'string',
+    'storage': 'object',
+    'installed_programs': 'object',
+    'adobe_autodesk': 'object',
+    'stored_credentials': 'object',
+    'shared_folders': 'object',
+    'report_format': 'category',
+}
+
+_OS_FAMILIES = [
+    ('windows 11', 'Windows 11'), ('windows 10', 'Windows 10'), ('windows 8', 'Windows 8'),
+    ('windows 7', 'Windows 7'), ('windows server 2022', 'Windows Server 2022'),
+    ('windows server 2019', 'Windows Server 2019'), ('windows server 2016', 'Windows Server 2016'),
+    ('windows server', 'Windows Server'),
+]
+_C_DRIVE_FREE_PATTERNS = [re.compile(r'C:.*?(\d+\.?\d*)\s*GB.*?free', re.IGNORECASE),
+                          re.compile(r'Free Space.*?C.*?(\d+\.?\d*)\s*GB', re.IGNORECASE)]
+
+
+def normalize_os_version(os_string: Optional[str]) -> str:
+    """Family name ("Windows 11", "Windows Server 2019", ...) of an OS version string"""
+    if not os_string:
+        return "Unknown"
+    os_lower = os_string.lower()
+    for needle, family in _OS_FAMILIES:
+        if needle in os_lower:
+            return family
+    return os_string
+
+
+def c_drive_free_gb(asset: Mapping) -> Optional[float]:
+    """Free space on C:, from the storage list or, failing that, the raw report"""
+    try:
+        for device in asset.get('hardware_info', {}).get('storage', []):
+            if 'C:' in device.get('name', '').upper() or 'C DRIVE' in device.get('name', '').upper():
+                return device.get('free_space_gb')
+        raw_content = asset.get('raw_content', '')
+        if raw_content:
+            for pattern in _C_DRIVE_FREE_PATTERNS:
+                match = pattern.search(raw_content)
+                if match:
+                    return float(match.group(1))
+        return None
+    except Exception:
+        return None
+
+
+def _section(asset: Mapping, key: str) -> Mapping:
+    value = asset.get(key)
+    return value if isinstance(value, Mapping) else {}
+
+
+def _list(value: Any) -> List[Any]:
+    return to_plain(value) if isinstance(value, list) else []
+
+
+def fleet_row(asset: Mapping) -> Dict[str, Any]:
+    """The fleet table columns of one asset"""
+    os_info = _section(asset, 'os_info')
+    system_info = _section(asset, 'system_info')
+    hardware_info = _section(asset, 'hardware_info')
+    network_info = _section(asset, 'network_info')
+    software_info = _section(asset, 'software_info')
+    memory = hardware_info.get('memory')
+    storage = _list(hardware_info.get('storage'))
+    last_modified = asset.get('last_modified')
+    scanned_at = network_info.get('scanned_at')
+    return {
+        'computer_name': asset.get('computer_name'),
+        'file_path': asset.get('file_path'),
+        'last_modified': datetime.fromisoformat(last_modified) if last_modified else None,
+        'ip_address': network_info.get('ip_address'),
+        'mac_address': network_info.get('mac_address'),
+        'status': network_info.get('status'),
+        'nmap_scan_status': network_info.get('nmap_scan_status'),
+        'scanned_at': datetime.fromisoformat(scanned_at) if scanned_at else None,
+        'os_version': os_info.get('version'),
+        'os_family': normalize_os_version(os_info.get('version')),
+        'os_language': os_info.get('language'),
+        'os_activation': os_info.get('activation'),
+        'manufacturer': system_info.get('manufacturer'),
+        'model': system_info.get('model'),
+        'serial_number': system_info.get('serial_number'),
+        'bios_version': system_info.get('bios_version'),
+        'cpu': _section(hardware_info, 'processor').get('name'),
+        'gpu': hardware_info.get('gpu'),
+        'ram_gb': memory.get('total_gb') if isinstance(memory, Mapping) else None,
+        'storage_total_gb': sum(drive['size_gb'] for drive in storage
+                                if isinstance(drive, Mapping) and drive.get('size_gb') is not None),
+        'c_free_gb': c_drive_free_gb(asset),
+        'anydesk_id': asset.get('anydesk_id'),
+        'user_email': asset.get('user_email'),
+        'storage': storage,
+        'installed_programs': _list(software_info.get('installed_programs')),
+        'adobe_autodesk': _list(software_info.get('adobe_autodesk')),
+        'stored_credentials': _list(asset.get('stored_credentials')),
+        'shared_folders': _list(asset.get('shared_folders')),
+        'report_format': asset.get('report_format'),
+    }
+
+
+def build_fleet_table(assets: Mapping) -> pd.DataFrame:
+    """One row per asset, indexed by asset name, with the typed columns of FLEET_COLUMNS
+
+    Built once per load so filters, metrics and charts run as column operations
+    instead of walking the nested asset dicts on every rerun.
+    """
+    names = list(assets)
+    columns: Dict[str, List[Any]] = {column: [] for column in FLEET_COLUMNS}
+    for name in names:
+        for column, value in fleet_row(assets[name]).items():
+            columns[column].append(value)
+    return table_from_columns(names, columns)
+
+
+def table_from_columns(names: List[str], columns: Dict[str, List[Any]]) -> pd.DataFrame:
+    """Fleet table from plain per-column value lists, as build_fleet_table or table_columns make them"""
+    columns = {column: [datetime.fromisoformat(value) if isinstance(value, str) else value for value in values]
+               if FLEET_COLUMNS[column] == 'datetime64[ns]' else values
+               for column, values in columns.items()}
+    table = pd.DataFrame(columns, index=pd.Index(names, name='name', dtype='object'))
+    return table.astype({column: dtype for column, dtype in FLEET_COLUMNS.items() if dtype != 'object'})
+
+
+def table_columns(table: pd.DataFrame) -> Dict[str, List[Any]]:
+    """The columns of a fleet table as JSON-ready lists (missing values None, timestamps ISO strings)"""
+    columns = {}
+    for column, dtype in FLEET_COLUMNS.items():
+        values = table[column].astype(object)
+        if dtype == 'datetime64[ns]':
+            columns[column] = [value.isoformat() if not pd.isna(value) else None for value in values]
+        elif dtype == 'object':
+            columns[column] = values.tolist()
+        else:
+            columns[column] = [None if pd.isna(value) else value for value in values]
+    return columns
+
+
+def update_fleet_table(table: pd.DataFrame, assets: Mapping, names: Iterable[str]) -> pd.DataFrame:
+    """Table with the rows of names rebuilt from assets; names no longer in assets are dropped
+
+    Cheaper than build_fleet_table when only a few assets changed, e.g. after a watcher update.
+    """
+    names = set(names)
+    table = table[~table.index.isin(names)]
+    changed = {name: assets[name] for name in names if name in assets}
+    if not changed:
+        return table
+    # Categories differ between the two frames, so concat would fall back to object; restore the dtypes
+    table = pd.concat([table.astype({c: 'object' for c, d in FLEET_COLUMNS.items() if d == 'category'}),
+                       build_fleet_table(changed)])
+    table = table.astype({column: dtype for column, dtype in FLEET_COLUMNS.items() if dtype != 'object'})
+    # Back in the order of assets, so listings do not reshuffle after an update
+    return table.loc[[name for name in assets if name in table.index]]
+
+
+def filter_mask(table: pd.DataFrame, filters: Dict[str, Any]) -> pd.Series:
+    """Boolean row mask for the sidebar filters (all but the free-text search)"""
+    mask = pd.Series(True, index=table.index)
+    if filters['selected_os']:
+        mask &= table['os_family'].isin(filters['selected_os'])
+    if filters['selected_manufacturers']:
+        mask &= table['manufacturer'].isin(filters['selected_manufacturers'])
+    ram = table['ram_gb']
+    mask &= ~(ram.notna() & (ram != 0) & ((ram < filters['min_ram']) | (ram > filters['max_ram'])))
+    c_free = table['c_free_gb']
+    mask &= ~(c_free.notna() & ((c_free < filters['min_storage']) | (c_free > filters['max_storage'])))
+    if filters['show_low_storage']:
+        mask &= c_free.notna() & (c_free < 10)
+    if filters['anydesk_search']:
+        mask &= table['anydesk_id'].str.lower().str.contains(filters['anydesk_search'].lower(), regex=False).fillna(False)
+    return mask.astype(bool)
+
+
+def filter_options(table: pd.DataFrame) -> Dict[str, Any]:
+    """Choices and bounds for the sidebar filters"""
+    ram = table['ram_gb']
+    ram = ram[ram.notna() & (ram != 0)].astype(int)
+    c_free = table['c_free_gb'].dropna()
+    return {
+        'os_versions': sorted(table.loc[table['os_version'].notna(), 'os_family'].unique().tolist()),
+        'manufacturers': sorted(m for m in table['manufacturer'].dropna().unique().tolist() if m),
+        'min_ram': int(ram.min()) if len(ram) else 0,
+        'max_ram': int(ram.max()) if len(ram) else 128,
+        'max_storage': float(c_free.max()) if len(c_free) else 500.0,
+    }
@@ -0,0 +1,350 @@
+"""
+Push ingest service for asset reports.
+
+Instead of dropping its report on the share, the inventory script POSTs it here:
+
+    Invoke-RestMethod -Method Post -InFile $report -Headers @{'X-Ingest-Token' = $token} `
+        -Uri "http://SERVER:8765/reports?name=$($ip)_$($env:COMPUTERNAME).txt"
+
+Uploads go into a bounded queue. When it is full, the service answers 503 with a
+Retry-After header, so a burst (the whole office booting at 8:00) slows the senders
+down instead of piling up in memory. A writer thread takes the queue in batches:
+the batch's reports are written to the assets folder and parsed, and the parse cache
+is saved once per batch. A PC that sends several reports within one batch only has
+its last one written. The dashboard's folder watcher picks the reports up and reads
+their parses from the shared cache, so nothing is parsed twice.
+
+Run:
+    python ingest_service.py [--host 127.0.0.1] [--port 8765] [--folder assets] [--queue-size 1000]
+                             [--batch-size 200] [--batch-wait 0.5] [--workers N] [--budget 10] [--token SECRET]
+
+The service only listens on localhost unless --host says otherwise. Before opening it
+to the LAN (--host 0.0.0.0), set a token (--token or ASSET_INGEST_TOKEN): uploads
+without a matching X-Ingest-Token header are refused with 401.
+
+GET /stats returns throughput and queue depth as JSON, GET /health answers 200.
+"""
+import argparse
+import hmac
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from dataclasses import dataclass, asdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from asset_ingest import REPORT_SUFFIXES, IngestStats, parse_scanned, scanned_files
+from asset_parser import AssetParser, PARSER_ENGINES
+from parallel_parser import DEFAULT_TIME_BUDGET
+from parse_cache import ParseCache, DEFAULT_CACHE_FILE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+DEFAULT_QUEUE_SIZE = 1000
+# Reports per batch, and how long the writer waits for a batch to fill once it has one report
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_BATCH_WAIT = 0.5
+# Largest report accepted; real ones are a few tens of KB, bundles a few MB
+MAX_REPORT_BYTES = 64 * 2 ** 20
+# Seconds a rejected sender is asked to wait before trying again
+RETRY_AFTER = 2
+
+# Letters, digits, '_', '-', '.' and spaces only: no drive letters, streams (':') or separators
+_REPORT_NAME = re.compile(r'^[\w.\- ]+$')
+# Names Windows maps to devices, whatever the extension
+_DEVICE_NAMES = {'CON', 'PRN', 'AUX', 'NUL', 'CONIN$', 'CONOUT$'} | {f'{device}{n}' for device in ('COM', 'LPT')
+                                                                  for n in '123456789'}
+
+
+@dataclass
+class ServiceStats:
+    """Counters since the service started"""
+    received: int = 0
+    rejected: int = 0
+    written: int = 0
+    coalesced: int = 0
+    failed: int = 0
+    batches: int = 0
+    max_queue_depth: int = 0
+    last_batch_size: int = 0
+    last_batch_seconds: float = 0.0
+
+
+def report_name(name: Optional[str]) -> Optional[str]:
+    """The file name an upload is stored under, or None if it is not an acceptable report name"""
+    if not name:
+        return None
+    # Only the last path component, so an upload cannot write outside the assets folder
+    name = name.replace('\\', '/').rsplit('/', 1)[-1].strip()
+    if not _REPORT_NAME.match(name) or name.startswith('.') or not name.lower().endswith(REPORT_SUFFIXES):
+        return None
+    # Windows ignores trailing dots and spaces and treats CON.txt like CON
+    if name.split('.', 1)[0].rstrip(' ').upper() in _DEVICE_NAMES or name.endswith(('.', ' ')):
+        return None
+    return name
+
+
+def report_path(folder: Path, name: str) -> Path:
+    """Where a report named name is written; ValueError if that is not directly inside folder"""
+    path = Path(folder) / name
+    if path.resolve().parent != Path(folder).resolve():
+        raise ValueError(f"report name {name!r} resolves outside {folder}")
+    return path
+
+
+class IngestService:
+    """Bounded upload queue plus a writer thread that stores and parses the reports in batches"""
+
+    def __init__(self, folder: Path, parser: AssetParser, cache: ParseCache, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 batch_size: int = DEFAULT_BATCH_SIZE, batch_wait: float = DEFAULT_BATCH_WAIT,
+                 workers: Optional[int] = 1, budget: Optional[float] = DEFAULT_TIME_BUDGET):
+        self.folder = Path(folder)
+        self.parser = parser
+        self.cache = cache
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.workers = workers
+        # Per-file parse time budget: reports go through the guarded worker pool, so a pathological one cannot stall the writer
+        self.budget = budget
+        self.queue: 'queue.Queue[Tuple[str, bytes]]' = queue.Queue(maxsize=queue_size)
+        self.stats = ServiceStats()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._started = time.monotonic()
+
+    def start(self) -> None:
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+        self._started = time.monotonic()
+        self._writer = threading.Thread(target=self._write_loop, name='ingest-writer', daemon=True)
+        self._writer.start()
+
+    def stop(self) -> None:
+        """Stop once the queue has been written out"""
+        self._stop.set()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+
+    def submit(self, name: str, data: bytes) -> bool:
+        """Queue a report; False when the queue is full and the sender should retry later"""
+        try:
+            self.queue.put_nowait((name, data))
+        except queue.Full:
+            with self._lock:
+                self.stats.rejected += 1
+            return False
+        with self._lock:
+            self.stats.received += 1
+            self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.queue.qsize())
+        return True
+
+    def _next_batch(self) -> Dict[str, bytes]:
+        """Up to batch_size queued reports, waiting at most batch_wait for more once the first is in"""
+        try:
+            name, data = self.queue.get(timeout=0.2)
+        except queue.Empty:
+            return {}
+        batch = {name: data}
+        taken = 1
+        deadline = time.monotonic() + self.batch_wait
+        while taken < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                name, data = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            taken += 1
+            # Several reports from one PC in a burst: only the newest is worth writing
+            batch.pop(name, None)
+            batch[name] = data
+        with self._lock:
+            self.stats.coalesced += taken - len(batch)
+        return batch
+
+    def _write_loop(self) -> None:
+        while not (self._stop.is_set() and self.queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                try:
+                    self.write_batch(batch)
+                except Exception as e:
+                    logger.error(f"Could not write a batch of {len(batch)} reports: {e}", exc_info=True)
+                    with self._lock:
+                        self.stats.failed += len(batch)
+
+    def write_batch(self, batch: Dict[str, bytes]) -> None:
+        """Write a batch of reports to the assets folder, parse them and save the parse cache once"""
+        t0 = time.perf_counter()
+        paths = []
+        for name, data in batch.items():
+            try:
+                path = report_path(self.folder, name)
+            except ValueError as e:
+                logger.error(f"Skipping upload: {e}")
+                with self._lock:
+                    self.stats.failed += 1
+                continue
+            # Written under another name and moved into place, so the folder watcher never sees half a report
+            tmp_path = path.with_name(f".{name}.{os.getpid()}.part")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            paths.append(path)
+        entries = parse_scanned(self.cache, self.parser, scanned_files(paths), IngestStats(), workers=self.workers,
+                               budget=self.budget)
+        self.cache.save()
+        failed = sum(1 for path, asset in entries if not asset)
+        with self._lock:
+            self.stats.written += len(paths)
+            self.stats.failed += failed
+            self.stats.batches += 1
+            self.stats.last_batch_size = len(paths)
+            self.stats.last_batch_seconds = time.perf_counter() - t0
+        logger.info(f"Wrote {len(paths)} reports ({failed} failed to parse) in {self.stats.last_batch_seconds:.2f}s")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus queue depth and throughput, as served on /stats"""
+        with self._lock:
+            stats = asdict(self.stats)
+        elapsed = time.monotonic() - self._started
+        stats['queue_depth'] = self.queue.qsize()
+        stats['queue_size'] = self.queue.maxsize
+        stats['uptime_seconds'] = round(elapsed, 1)
+        stats['reports_per_second'] = round(stats['written'] / elapsed, 1) if elapsed > 0 else 0.0
+        return stats
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'AssetIngest/1'
+    # Keep-alive, so a client can push many reports over one connection
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def service(self) -> IngestService:
+        return self.server.service
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _reply(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == '/stats':
+            self._reply(200, self.service.snapshot())
+        elif path == '/health':
+            self._reply(200, {'status': 'ok'})
+        else:
+            self._reply(404, {'error': 'not found'})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/reports':
+            self._reply(404, {'error': 'not found'})
+            return
+        token = self.server.token
+        if token and not hmac.compare_digest(self.headers.get('X-Ingest-Token', '').encode('utf-8'), token.encode('utf-8')):
+            self._reply(401, {'error': 'missing or wrong X-Ingest-Token'})
+            self.close_connection = True
+            return
+        length = self.headers.get('Content-Length')
+        if length is None:
+            self._reply(411, {'error': 'Content-Length required'})
+            self.close_connection = True
+            return
+        try:
+            length = int(length)
+        except ValueError:
+            self._reply(400, {'error': 'bad Content-Length'})
+            self.close_connection = True
+            return
+        if length > MAX_REPORT_BYTES:
+            self._reply(413, {'error': f'report larger than {MAX_REPORT_BYTES} bytes'})
+            self.close_connection = True
+            return
+        data = self.rfile.read(length)
+        name = report_name(parse_qs(url.query).get('name', [None])[0] or self.headers.get('X-Report-Name'))
+        if name is None:
+            self._reply(400, {'error': f"name must be a file name ending in one of {', '.join(REPORT_SUFFIXES)}"})
+        elif not data:
+            self._reply(400, {'error': 'empty report'})
+        elif self.service.submit(name, data):
+            self._reply(202, {'queued': name})
+        else:
+            self._reply(503, {'error': 'queue full, retry later'}, {'Retry-After': str(RETRY_AFTER)})
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for a burst of connections while handler threads start
+    request_queue_size = 1024
+
+
+def make_server(service: IngestService, host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                token: Optional[str] = None) -> ThreadingHTTPServer:
+    """HTTP server for service (port 0 picks a free port); call serve_forever() to run it
+
+    With a token, uploads must carry it in the X-Ingest-Token header.
+    """
+    server = _Server((host, port), _Handler)
+    server.service = service
+    server.token = token
+    return server
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--host', default='127.0.0.1', help='0.0.0.0 accepts uploads from the LAN (set --token)')
+    arg_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    arg_parser.add_argument('--folder', type=Path, default=Path('assets'))
+    arg_parser.add_argument('--cache', type=Path, default=Path(os.getenv('ASSET_PARSE_CACHE', str(DEFAULT_CACHE_FILE))))
+    arg_parser.add_argument('--engine', choices=PARSER_ENGINES, default=os.getenv('ASSET_PARSER_ENGINE', 'regex'))
+    arg_parser.add_argument('--lazy', action='store_true', default=os.getenv('ASSET_LAZY_SECTIONS', '0') == '1',
+                            help="parse like the dashboard's Lazy Sections mode, so it can use the cache")
+    arg_parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE)
+    arg_parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    arg_parser.add_argument('--batch-wait', type=float, default=DEFAULT_BATCH_WAIT)
+    arg_parser.add_argument('--workers', type=int, default=1, help='parse worker processes per batch (0 = one per core)')
+    arg_parser.add_argument('--budget', type=float, default=float(os.getenv('ASSET_PARSE_TIME_BUDGET', str(DEFAULT_TIME_BUDGET))),
+                            help='seconds a report may take to parse before it is quarantined (0 = no limit, parse in-process)')
+    arg_parser.add_argument('--token', default=os.getenv('ASSET_INGEST_TOKEN', ''),
+                            help='shared secret uploads must send as X-Ingest-Token')
+    args = arg_parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = AssetParser(engine=args.engine, lazy=args.lazy)
+    service = IngestService(args.folder, parser, ParseCache(parser.cache_key, args.cache), args.queue_size,
+                            args.batch_size, args.batch_wait, args.workers or None,
+                            args.budget or None)
+    server = make_server(service, args.host, args.port, args.token or None)
+    if not args.token and args.host not in ('127.0.0.1', 'localhost', '::1'):
+        logger.warning(f"Listening on {args.host} without --token: any host that can reach it can upload reports")
+    service.start()
+    logger.info(f"Accepting reports on http://{args.host}:{server.server_port}/reports, writing to {args.folder}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -8,17 +8,100 @@ import json
 import logging
 from datetime import datetime
 import os
-import subprocess
-import re
-import concurrent.futures
-
-from asset_parser import AssetParser
+import sqlite3
+
+from asset_parser import AssetParser, PARSER_ENGINES
+from report_formats import GENERIC_FORMAT
+from parse_cache import ParseCache, DEFAULT_CACHE_FILE
+from parallel_parser import parse_files
+from asset_ingest import FolderScanner, load_folder, parse_scanned, scanned_files
+from asset_watcher import FolderWatcher, WATCH_MODES
+from asset_record import to_plain
+from asset_history import AssetHistory, DEFAULT_HISTORY_FOLDER
+from network_scan import (run_nmap_scan, apply_quick_scan, apply_full_scan, scan_address, scan_target,
+                          QUICK_SCAN_MODES)
+from scan_worker import ScanWorker
+from scan_cache import ScanCache, DEFAULT_SCAN_CACHE_FILE
+from scan_scheduler import FullScanScheduler, DEFAULT_JOBS_FILE, PRIORITY_ON_DEMAND, PRIORITY_ROUTINE
+from asset_store import AssetStore
+from fleet_snapshot import (DEFAULT_SNAPSHOT_FOLDER, inventory_record, read_snapshot, latest_snapshot,
+                            changes_since)
+from fleet_table import (build_fleet_table, update_fleet_table, filter_mask, filter_options, normalize_os_version,
+                         c_drive_free_gb)
 from dashboard_components import DashboardComponents
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Default asset parsing engine ('regex' or 'tokenizer'), can be switched from the sidebar
+DEFAULT_PARSER_ENGINE = os.getenv('ASSET_PARSER_ENGINE', 'regex')
+# Leave installed programs, credentials, shared folders, Adobe/Autodesk and BitLocker out of the load
+# and parse them when a card asks for them (also switchable from the sidebar)
+LAZY_SECTIONS = os.getenv('ASSET_LAZY_SECTIONS', '0') == '1'
+# Parsed reports are cached here between refreshes and restarts
+PARSE_CACHE_FILE = Path(os.getenv('ASSET_PARSE_CACHE', str(DEFAULT_CACHE_FILE)))
+# Worker processes for parsing (0 = one per core) and files per worker round trip
+PARSE_WORKERS = int(os.getenv('ASSET_PARSE_WORKERS', '0'))
+PARSE_CHUNK_SIZE = int(os.getenv('ASSET_PARSE_CHUNK_SIZE', '32'))
+# Seconds one report may take before it is abandoned and quarantined (0 parses unguarded)
+PARSE_TIME_BUDGET = float(os.getenv('ASSET_PARSE_TIME_BUDGET', '10'))
+# Concurrent reads while parsing; raise it for high-latency shares
+PREFETCH_THREADS = int(os.getenv('ASSET_PREFETCH_THREADS', '8'))
+# Seconds an unchanged directory listing (same mtime and entry count) is trusted without stat-ing the files
+LISTING_TTL = float(os.getenv('ASSET_LISTING_TTL', '300'))
+# Follow changes in the assets folder: 'auto' (native events, polling on network shares), 'native', 'poll' or 'off'
+WATCH_MODE = os.getenv('ASSET_WATCH_MODE', 'auto')
+# Seconds between folder listings when polling, and how long a report must stay unchanged before it is parsed
+WATCH_POLL_INTERVAL = float(os.getenv('ASSET_WATCH_POLL_INTERVAL', '5'))
+WATCH_SETTLE_SECONDS = float(os.getenv('ASSET_WATCH_SETTLE', '2'))
+# Seconds without a page collecting changes (e.g. the browser tab was closed) before a session's watcher stops (0: never)
+WATCH_IDLE_TIMEOUT = float(os.getenv('ASSET_WATCH_IDLE_TIMEOUT', '300'))
+# Parquet history of each asset's fields, appended to when they change (empty disables it; needs pyarrow)
+HISTORY_FOLDER = os.getenv('ASSET_HISTORY_FOLDER', str(DEFAULT_HISTORY_FOLDER))
+# Snapshots written by fleet_snapshot.py; a new session opens the newest instead of parsing (empty disables it)
+SNAPSHOT_FOLDER = os.getenv('ASSET_SNAPSHOT_FOLDER', str(DEFAULT_SNAPSHOT_FOLDER))
+# SQLite index (asset_store.py) the filters and global search query instead of scanning the assets (empty: off)
+STORE_FILE = os.getenv('ASSET_STORE_FILE', '')
+# Quick scans as one nmap run per chunk of targets ('batch'), one nmap process per asset ('per-host')
+# or the built-in TCP/ping prober that needs no nmap ('probe')
+QUICK_SCAN_MODE = os.getenv('ASSET_QUICK_SCAN_MODE', 'batch')
+# Seconds between page updates while background quick scans are still running
+SCAN_REFRESH_SECONDS = float(os.getenv('ASSET_SCAN_REFRESH', '2'))
+# Scan results are kept here across reruns, sessions and restarts (empty disables it)
+SCAN_CACHE_FILE = os.getenv('ASSET_SCAN_CACHE', str(DEFAULT_SCAN_CACHE_FILE))
+# Seconds a scan result is reused as is, a failed scan's result likewise, and a stale one is still shown while rescanning
+SCAN_TTL = float(os.getenv('ASSET_SCAN_TTL', '900'))
+SCAN_FAILURE_TTL = float(os.getenv('ASSET_SCAN_FAILURE_TTL', '60'))
+SCAN_MAX_STALE = float(os.getenv('ASSET_SCAN_MAX_STALE', '86400'))
+# Seconds a full scan result stays fresh (keep ASSET_SCAN_MAX_STALE above it), full scans at once and per /24,
+# and where the full scan queue is kept across restarts (empty: not kept)
+FULL_SCAN_TTL = float(os.getenv('ASSET_FULL_SCAN_TTL', '21600'))
+FULL_SCAN_CONCURRENCY = int(os.getenv('ASSET_FULL_SCAN_CONCURRENCY', '4'))
+FULL_SCAN_PER_SUBNET = int(os.getenv('ASSET_FULL_SCAN_PER_SUBNET', '1'))
+FULL_SCAN_JOBS_FILE = os.getenv('ASSET_FULL_SCAN_JOBS', str(DEFAULT_JOBS_FILE))
+
+# Timer-driven partial reruns (Streamlit >= 1.37); without them the watcher and scans are checked on each rerun
+_fragment = getattr(st, 'fragment', None)
+
+
+@st.cache_resource
+def _full_scan_scheduler():
+    """One full scan scheduler per server process, so its concurrency limits hold across sessions"""
+    cache = ScanCache(Path(SCAN_CACHE_FILE), ttl=FULL_SCAN_TTL, failure_ttl=SCAN_FAILURE_TTL,
+                      max_stale=SCAN_MAX_STALE) if SCAN_CACHE_FILE else None
+    return FullScanScheduler(cache=cache, jobs_file=Path(FULL_SCAN_JOBS_FILE) if FULL_SCAN_JOBS_FILE else None,
+                             max_concurrent=FULL_SCAN_CONCURRENCY, per_subnet=FULL_SCAN_PER_SUBNET)
+
+
+def _age_text(seconds):
+    """Short age ("40s", "12m", "3h", "2d") for status timestamps"""
+    seconds = max(0, int(seconds))
+    for unit, size in (('d', 86400), ('h', 3600), ('m', 60)):
+        if seconds >= size:
+            return f"{seconds // size}{unit}"
+    return f"{seconds}s"
+
 # Page configuration
 st.set_page_config(
     page_title="IT Asset Management Dashboard",
@@ -193,14 +276,62 @@ def apply_windows11_theme():
 
 class ITAssetDashboard:
     def __init__(self):
-        self.asset_parser = AssetParser()
-        self.dashboard_components = DashboardComponents()
+        if 'parser_engine' not in st.session_state:
+            st.session_state.parser_engine = DEFAULT_PARSER_ENGINE if DEFAULT_PARSER_ENGINE in PARSER_ENGINES else 'regex'
+        if 'parse_profiling' not in st.session_state:
+            st.session_state.parse_profiling = False
+            st.session_state.parse_profile = None
+        if 'lazy_sections' not in st.session_state:
+            st.session_state.lazy_sections = LAZY_SECTIONS
+        self.asset_parser = AssetParser(engine=st.session_state.parser_engine, profile=st.session_state.parse_profiling,
+                                        lazy=st.session_state.lazy_sections)
+        self.dashboard_components = DashboardComponents(self.asset_parser)
         self.assets_folder = Path("assets")
         
         if 'assets_data' not in st.session_state:
             st.session_state.assets_data = {}
         if 'last_refresh' not in st.session_state:
             st.session_state.last_refresh = None
+        if 'parse_cache_stats' not in st.session_state:
+            st.session_state.parse_cache_stats = None
+        if 'quarantined_files' not in st.session_state:
+            st.session_state.quarantined_files = {}
+        if 'ingest_stats' not in st.session_state:
+            st.session_state.ingest_stats = None
+        if 'folder_scanner' not in st.session_state:
+            st.session_state.folder_scanner = FolderScanner(self.assets_folder, listing_ttl=LISTING_TTL)
+        if 'folder_watcher' not in st.session_state:
+            st.session_state.folder_watcher = FolderWatcher(
+                self.assets_folder, mode=WATCH_MODE if WATCH_MODE in WATCH_MODES else 'auto',
+                poll_interval=WATCH_POLL_INTERVAL, settle_seconds=WATCH_SETTLE_SECONDS,
+                idle_timeout=WATCH_IDLE_TIMEOUT or None)
+            st.session_state.watch_folder = WATCH_MODE != 'off'
+            st.session_state.watch_changes = None
+        if 'fleet_table' not in st.session_state:
+            # Columnar view of assets_data (fleet_table.py), rebuilt at ingest
+            st.session_state.fleet_table = None
+        if 'asset_history' not in st.session_state:
+            st.session_state.asset_history = AssetHistory(Path(HISTORY_FOLDER)) if HISTORY_FOLDER else None
+        if 'asset_files' not in st.session_state:
+            # Report path -> asset name, for applying per-file changes
+            st.session_state.asset_files = {}
+            st.session_state.parse_cache = None
+        if 'asset_store' not in st.session_state:
+            st.session_state.asset_store = self._open_store()
+        if 'scan_worker' not in st.session_state:
+            st.session_state.scan_cache = ScanCache(Path(SCAN_CACHE_FILE), ttl=SCAN_TTL, failure_ttl=SCAN_FAILURE_TTL,
+                                                    max_stale=SCAN_MAX_STALE) if SCAN_CACHE_FILE else None
+            # Quick scans run off the page's thread; their results are applied on later reruns
+            st.session_state.scan_worker = ScanWorker(mode=QUICK_SCAN_MODE if QUICK_SCAN_MODE in QUICK_SCAN_MODES else 'batch',
+                                                      cache=st.session_state.scan_cache)
+        if 'full_scan_seq' not in st.session_state:
+            # Last full scan result of the shared scheduler this session has applied
+            st.session_state.full_scan_seq = 0
+        self.full_scan_scheduler = _full_scan_scheduler()
+        if 'snapshot_checked' not in st.session_state:
+            # The fleet snapshot is only tried for the first load of a session
+            st.session_state.snapshot_checked = False
+            st.session_state.snapshot_info = None
         if 'theme_mode' not in st.session_state:
             st.session_state.theme_mode = 'light'
         if 'show_asset_details' not in st.session_state:
@@ -237,100 +368,61 @@ class ITAssetDashboard:
 
 
     def _run_nmap_scan(self, ip_address: str, nmap_executable_path: str = "nmap", scan_type: str = "Full Scan") -> dict:
-        result = { "status": "unknown", "mac_address": None, "nmap_output": "", "error_message": None }
-        logger.info(f"Starting nmap scan for IP: {ip_address}")
-        try:
-            command = []
-            if scan_type == "Quick Scan":
-                command = [nmap_executable_path, "-sn", "-T4", ip_address]
-            elif scan_type == "Full Scan":
-                command = [nmap_executable_path, "-T4", "-A", "-v", "-Pn", ip_address]
-            else:
-                result["error_message"] = f"Invalid scan type: {scan_type}"
-                logger.error(result["error_message"])
-                return result
-
-            logger.info(f"Executing Nmap {scan_type} for {ip_address}: {' '.join(command)}")
-            process = subprocess.run(command, capture_output=True, text=True, timeout=120)
-            result["nmap_output"] = process.stdout
-
-            if process.returncode == 0:
-                if "Host seems down" in process.stdout: result["status"] = "offline"
-                elif "Host is up" in process.stdout: result["status"] = "online"
-                elif scan_type == "Full Scan" and re.search(r"\d+/open/", process.stdout): result["status"] = "online"
-                else: result["status"] = "offline"
-                logger.info(f"Nmap {scan_type} for {ip_address}: Parsed status: {result['status']}.")
-                if scan_type == "Full Scan":
-                    mac_match = re.search(r"MAC Address: ([0-9A-Fa-f:]{17})", process.stdout, re.IGNORECASE)
-                    if mac_match: result["mac_address"] = mac_match.group(1).upper()
-            else:
-                result["error_message"] = f"Nmap scan failed (code {process.returncode}): {process.stderr}"
-                logger.error(result["error_message"])
-        except FileNotFoundError:
-            result["error_message"] = f"Nmap not found at '{nmap_executable_path}'."
-            logger.error(result["error_message"])
-        except subprocess.TimeoutExpired:
-            result["error_message"] = "Nmap scan timed out."
-            logger.error(result["error_message"])
-        except Exception as e:
-            result["error_message"] = f"Nmap scan error: {e}"
-            logger.error(result["error_message"], exc_info=True)
-        return result
+        return run_nmap_scan(ip_address, nmap_executable_path=nmap_executable_path, scan_type=scan_type)
 
-    def load_assets_data(self):
+    def load_assets_data(self, force_scan=False):
        logger.info("Starting load_assets_data...")
        try:
            if not self.assets_folder.exists():
                self.assets_folder.mkdir(exist_ok=True); return {}
-           asset_files = list(self.assets_folder.glob("*.txt"))
-           if not asset_files: return {}
            
            assets_data = {}
-           logger.info(f"Found {len(asset_files)} asset files. Processing texts...")
+           parse_cache = ParseCache(self.asset_parser.cache_key, PARSE_CACHE_FILE)
            
-           for file_path_obj in asset_files:
+           if self.asset_parser.profiler is not None:
+               # Profiling measures real parsing work: in this process, no cache
+               asset_files = sorted(self.assets_folder.glob("*.txt"))
+               parsed_items = list(zip(asset_files, parse_files(self.asset_parser, asset_files, workers=1)))
+               st.session_state.parse_profile = self.asset_parser.profiler.report()
+               scanned = scanned_files(asset_files)
+           else:
+               # One scandir listing for the metadata, reads prefetched while parsing runs;
+               # report bundles (.zip, .tar.gz, .gz, .7z) come back as one item per report inside
+               scanned, parsed_items, ingest_stats = load_folder(
+                   st.session_state.folder_scanner, parse_cache, self.asset_parser, force_scan=force_scan,
+                   workers=PARSE_WORKERS or None, chunk_size=PARSE_CHUNK_SIZE,
+                   budget=PARSE_TIME_BUDGET or None, prefetch_threads=PREFETCH_THREADS)
+               asset_files = [file.path for file in scanned]
+               st.session_state.ingest_stats = ingest_stats
+           st.session_state.snapshot_info = None
+           # Changes made from here on reach the inventory through the watcher
+           self._sync_watcher(scanned)
+           if not asset_files: return {}
+           logger.info(f"Found {len(asset_files)} asset files.")
+           
+           asset_index = {}
+           for file_path_obj, asset_data_item in parsed_items:
                file_path_str = str(file_path_obj)
                try:
-                   asset_data_item = self.asset_parser.parse_asset_file(file_path_obj)
                    if asset_data_item:
-                       asset_name = asset_data_item.get('computer_name', file_path_obj.stem)
-                       if 'network_info' not in asset_data_item: asset_data_item['network_info'] = {}
-                       asset_data_item['network_info']['nmap_scan_status'] = 'pending_quick_scan'
-                       asset_data_item['network_info']['status'] = asset_data_item['network_info'].get('status', 'unknown')
-                       assets_data[asset_name] = asset_data_item
+                       asset_name, assets_data[asset_name] = self._to_record(file_path_obj, asset_data_item)
+                       asset_index[file_path_str] = asset_name
                except Exception as e:
                    logger.error(f"Error processing text for file {file_path_str}: {e}", exc_info=True)
 
-           logger.info("Text parsing complete. Launching concurrent NMAP quick scans...")
-           nmap_exe_path = st.session_state.get('nmap_path', 'nmap')
-
-           def scan_asset(name, item):
-               ip_addr = item.get('network_info', {}).get('ip_address')
-               if ip_addr and ip_addr != 'N/A':
-                   return name, self._run_nmap_scan(ip_addr, nmap_executable_path=nmap_exe_path, scan_type="Quick Scan")
-               return name, None
-
-           # Run nmap concurrently to prevent Streamlit hanging for minutes
-           with concurrent.futures.ThreadPoolExecutor(max_workers=30) as executor:
-               future_to_name = {executor.submit(scan_asset, name, item): name for name, item in assets_data.items()}
-               for future in concurrent.futures.as_completed(future_to_name):
-                   asset_name = future_to_name[future]
-                   try:
-                       name, nmap_result = future.result()
-                       item = assets_data[asset_name]
-                       if nmap_result is not None:
-                           item['network_info']['nmap_scan_status'] = 'completed_quick_scan'
-                           if nmap_result.get('status') and nmap_result.get('status') not in ['unknown', 'error']:
-                               item['network_info']['status'] = nmap_result['status']
-                           item['network_info']['nmap_quick_scan_output'] = nmap_result.get('nmap_output', '')
-                           if nmap_result.get('error_message'):
-                               item['network_info']['nmap_scan_status'] = 'failed_quick_scan'
-                               item['network_info']['nmap_error'] = nmap_result['error_message']
-                               logger.error(f"Nmap Quick Scan failed for {asset_name}: {nmap_result['error_message']}")
-                       else:
-                           item['network_info']['nmap_scan_status'] = 'skipped_no_ip'
-                   except Exception as e:
-                       logger.error(f"Thread scan failed for {asset_name}: {e}")
+           parse_cache.prune()
+           parse_cache.save()
+           st.session_state.parse_cache = parse_cache
+           st.session_state.asset_files = asset_index
+           st.session_state.parse_cache_stats = dict(parse_cache.stats)
+           st.session_state.quarantined_files = {path: entry['reason'] for path, entry in parse_cache.quarantine.items()}
+           logger.info(f"Parse cache: {parse_cache.summary()}, {parse_cache.stats['removed']} removed")
+
+           st.session_state.fleet_table = build_fleet_table(assets_data)
+           self._record_history(st.session_state.fleet_table)
+           self._update_store(assets_data)
+           logger.info("Text parsing complete. Quick scans continue in the background...")
+           self._queue_quick_scans(restart=True)
 
            st.session_state.last_refresh = datetime.now()
            logger.info(f"load_assets_data completed. Loaded {len(assets_data)} assets.")
@@ -339,31 +431,261 @@ class ITAssetDashboard:
            logger.error(f"Major error in load_assets_data: {e}", exc_info=True)
            st.error(f"Error loading assets data: {e}"); return {}
 
-    def normalize_os_version(self, os_string):
-        if not os_string: return "Unknown"
-        os_lower = os_string.lower()
-        if "windows 11" in os_lower: return "Windows 11"
-        if "windows 10" in os_lower: return "Windows 10"
-        if "windows 8" in os_lower: return "Windows 8"
-        if "windows 7" in os_lower: return "Windows 7"
-        if "windows server 2022" in os_lower: return "Windows Server 2022"
-        if "windows server 2019" in os_lower: return "Windows Server 2019"
-        if "windows server 2016" in os_lower: return "Windows Server 2016"
-        if "windows server" in os_lower: return "Windows Server"
-        return os_string
+    def _to_record(self, file_path_obj, asset_data_item):
+        """(asset name, compact record) for a freshly parsed report, marked for a quick scan"""
+        return inventory_record(file_path_obj, asset_data_item)
 
-    def get_c_drive_free_space(self, asset):
+    def load_snapshot(self):
+        """Open the newest fleet snapshot and parse only the reports changed since it was written
+
+        Returns the assets, or None when there is no snapshot built with this folder and parser.
+        """
+        st.session_state.snapshot_checked = True
+        if not SNAPSHOT_FOLDER or self.asset_parser.profiler is not None or not self.assets_folder.exists():
+            return None
+        snapshot_path = latest_snapshot(Path(SNAPSHOT_FOLDER))
+        if snapshot_path is None:
+            return None
         try:
-            for device in asset.get('hardware_info', {}).get('storage', []):
-                if ('C:' in device.get('name','').upper() or 'C DRIVE' in device.get('name','').upper()):
-                    return device.get('free_space_gb')
-            raw_content = asset.get('raw_content', '')
-            if raw_content:
-                for pattern in [r'C:.*?(\d+\.?\d*)\s*GB.*?free', r'Free Space.*?C.*?(\d+\.?\d*)\s*GB']:
-                    match = re.search(pattern, raw_content, re.IGNORECASE)
-                    if match: return float(match.group(1))
+            snapshot = read_snapshot(snapshot_path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Cannot open fleet snapshot {snapshot_path}: {e}")
             return None
-        except: return None
+        if snapshot.parser_key != self.asset_parser.cache_key or snapshot.folder != str(self.assets_folder):
+            logger.info(f"Fleet snapshot {snapshot_path.name} was built for another folder or parser, parsing instead")
+            return None
+        st.session_state.assets_data = snapshot.assets
+        st.session_state.fleet_table = snapshot.table
+        st.session_state.asset_files = dict(snapshot.asset_files)
+        st.session_state.quarantined_files = snapshot.quarantine
+        st.session_state.parse_cache = None
+        st.session_state.ingest_stats = None
+        st.session_state.snapshot_info = snapshot.summary()
+        st.session_state.last_refresh = snapshot.created
+        logger.info(f"Opened fleet snapshot {snapshot.summary()}")
+        scanned = st.session_state.folder_scanner.scan()
+        changes = changes_since(snapshot.files, scanned)
+        if changes:
+            # Parsed and quick-scanned like watcher changes
+            self.apply_folder_changes(changes)
+        # Statuses are as old as the snapshot: the scan cache serves fresh ones and rescans the rest
+        self._queue_quick_scans(restart=True)
+        indexed = self._store_count()
+        if indexed is not None and indexed != len(st.session_state.assets_data):
+            # Snapshot built without --store: index its assets once
+            self._update_store(st.session_state.assets_data)
+        self._sync_watcher(scanned)
+        return st.session_state.assets_data
+
+    def _queue_quick_scans(self, names=None, restart=False):
+        """Hand the assets' quick scans to the background worker; names limits it (None: all)
+
+        restart drops the scans still queued for the inventory this load replaces.
+        """
+        table = self.fleet_table()
+        addresses = table['ip_address'] if names is None else table['ip_address'][table.index.isin(list(names))]
+        worker = st.session_state.scan_worker
+        worker.nmap_executable_path = st.session_state.get('nmap_path', 'nmap')
+        if restart:
+            # The new records have no full scan results yet: apply every one the scheduler has again
+            st.session_state.full_scan_seq = 0
+            if worker.cache is not None:
+                # Results other sessions and processes saved since this one started
+                worker.cache.reload()
+        worker.submit({name: scan_address(ip_addr) for name, ip_addr in addresses.items()}, restart=restart)
+        # Cached results and assets without an address are ready at once
+        self.apply_scan_results(worker.drain())
+        if st.session_state.nmap_scan_type == "Full Scan":
+            self._queue_full_scans(addresses.map(scan_address).dropna())
+
+    def _queue_full_scans(self, addresses, priority=PRIORITY_ROUTINE):
+        """Hand full scans of addresses to the shared scheduler"""
+        scheduler = self.full_scan_scheduler
+        scheduler.nmap_executable_path = st.session_state.get('nmap_path', 'nmap')
+        return scheduler.submit(addresses, priority)
+
+    def apply_full_scan_results(self, results):
+        """Record finished full scans (address -> result) in the assets with those addresses and in the fleet table"""
+        assets_data = st.session_state.assets_data
+        if not results:
+            return
+        addresses = self.fleet_table()['ip_address'].map(scan_address)
+        names = [name for name, ip_addr in addresses.items() if ip_addr in results and name in assets_data]
+        for name in names:
+            apply_full_scan(name, assets_data[name], results[addresses[name]])
+        if names:
+            st.session_state.fleet_table = update_fleet_table(self.fleet_table(), assets_data, names)
+            self._update_store(assets_data, names)
+
+    def apply_scan_results(self, results):
+        """Record finished quick scans in the assets and the fleet table"""
+        assets_data = st.session_state.assets_data
+        names = []
+        for name, (ip_addr, nmap_result) in results.items():
+            asset = assets_data.get(name)
+            # Dropped, or re-reported with another address, while it was being scanned
+            if asset is None or scan_target(asset) != ip_addr:
+                continue
+            apply_quick_scan(name, asset, nmap_result)
+            names.append(name)
+        if names:
+            st.session_state.fleet_table = update_fleet_table(self.fleet_table(), assets_data, names)
+            # Status, scan status and MAC are searchable in the store too
+            self._update_store(assets_data, names)
+
+    def _sync_watcher(self, scanned):
+        """Start or stop the folder watcher to match the sidebar toggle, from the listing just loaded"""
+        watcher = st.session_state.folder_watcher
+        if st.session_state.watch_folder:
+            watcher.start(scanned)
+        elif watcher.running:
+            watcher.stop()
+
+    def apply_folder_changes(self, changes):
+        """Upsert changed reports into the inventory and drop deleted ones, without a full reload"""
+        assets_data = st.session_state.assets_data
+        asset_files = st.session_state.asset_files
+        parse_cache = st.session_state.parse_cache
+        if parse_cache is None or parse_cache.parser_key != self.asset_parser.cache_key:
+            # Reports pushed through ingest_service.py arrive already parsed in the shared cache
+            parse_cache = st.session_state.parse_cache = ParseCache(self.asset_parser.cache_key, PARSE_CACHE_FILE)
+
+        touched = set()
+
+        def drop(file_path):
+            # A report bundle takes the reports inside it along
+            prefix = str(file_path) + os.sep
+            for file_path_str in [key for key in asset_files if key == str(file_path) or key.startswith(prefix)]:
+                name = asset_files.pop(file_path_str)
+                # Another report may have taken over the name since
+                if assets_data.get(name, {}).get('file_path') == file_path_str:
+                    del assets_data[name]
+                    touched.add(name)
+
+        for file_path in changes.removals:
+            drop(file_path)
+            parse_cache.forget(file_path)
+
+        upserted = {}
+        if changes.upserts:
+            for file in changes.upserts:
+                drop(file.path)
+            # The guarded pool outlives this call, so it is sized as for a full load
+            parsed_items = parse_scanned(parse_cache, self.asset_parser, changes.upserts, workers=PARSE_WORKERS or None,
+                                         budget=PARSE_TIME_BUDGET or None, prefetch_threads=PREFETCH_THREADS)
+            for file_path_obj, asset_data_item in parsed_items:
+                file_path_str = str(file_path_obj)
+                if not asset_data_item:
+                    continue
+                try:
+                    asset_name, record = self._to_record(file_path_obj, asset_data_item)
+                except Exception as e:
+                    logger.error(f"Error processing text for file {file_path_str}: {e}", exc_info=True)
+                    continue
+                assets_data[asset_name] = upserted[asset_name] = record
+                asset_files[file_path_str] = asset_name
+        parse_cache.save()
+        st.session_state.quarantined_files = {path: entry['reason'] for path, entry in parse_cache.quarantine.items()}
+        st.session_state.fleet_table = update_fleet_table(self.fleet_table(), assets_data, touched | set(upserted))
+        if upserted:
+            self._queue_quick_scans(upserted)
+        self._record_history(st.session_state.fleet_table, touched | set(upserted))
+        self._update_store(assets_data, touched | set(upserted))
+        st.session_state.watch_changes = f"{changes.summary()} at {datetime.now().strftime('%H:%M:%S')}"
+        st.session_state.last_refresh = datetime.now()
+
+    def _open_store(self):
+        if not STORE_FILE:
+            return None
+        try:
+            return AssetStore(Path(STORE_FILE))
+        except sqlite3.Error as e:
+            logger.error(f"Cannot open asset store {STORE_FILE}, filtering in memory: {e}")
+            return None
+
+    def _store_count(self):
+        store = st.session_state.asset_store
+        try:
+            return store.count() if store is not None else None
+        except sqlite3.Error as e:
+            logger.error(f"Cannot read asset store: {e}")
+            return None
+
+    def _update_store(self, assets_data, names=None):
+        """Bring the asset store in line with assets_data; names limits it to the assets touched (None: all)"""
+        store = st.session_state.asset_store
+        if store is None:
+            return
+        try:
+            store.update(assets_data, names)
+        except sqlite3.Error as e:
+            logger.error(f"Could not update asset store: {e}", exc_info=True)
+
+    def _record_history(self, table, names=None):
+        """Append the assets whose fields changed to the history; names limits it to the assets touched (None: all)"""
+        history = st.session_state.asset_history
+        if history is None or not history.available:
+            return
+        try:
+            if names is None:
+                history.record(table, complete=True)
+            else:
+                history.record(table[table.index.isin(names)], removed=[name for name in names if name not in table.index])
+        except Exception as e:
+            logger.error(f"Could not record asset history: {e}", exc_info=True)
+
+    def check_folder_changes(self):
+        """Apply settled changes from the watcher; reruns the page when the inventory changed"""
+        watcher = st.session_state.folder_watcher
+        if not watcher.running:
+            return
+        changes = watcher.drain()
+        if changes:
+            self.apply_folder_changes(changes)
+            st.rerun()
+        status = f"👁️ Watching folder ({watcher.backend})"
+        if watcher.pending:
+            status += f" · {watcher.pending} changing"
+        if st.session_state.watch_changes:
+            status += f" · last: {st.session_state.watch_changes}"
+        st.caption(status)
+
+    def check_scan_results(self):
+        """Apply the quick and full scans finished in the background; reruns the page so cards and charts show them"""
+        worker = st.session_state.scan_worker
+        results = worker.drain()
+        full_scan_seq, full_results = self.full_scan_scheduler.results_since(st.session_state.full_scan_seq)
+        st.session_state.full_scan_seq = full_scan_seq
+        if results or full_results:
+            self.apply_scan_results(results)
+            self.apply_full_scan_results(full_results)
+            st.rerun()
+        if worker.pending:
+            st.caption(f"📡 Quick scans: {worker.completed} done, {worker.pending} pending")
+        status = self.full_scan_scheduler.status()
+        if status['queued'] or status['running'] or status['retrying']:
+            st.caption(f"🛰️ Full scans: {status['running']} running, {status['queued']} queued, "
+                       f"{status['retrying']} waiting to retry · ETA {_age_text(status['eta_seconds'])}")
+
+    def normalize_os_version(self, os_string):
+        return normalize_os_version(os_string)
+
+    def get_c_drive_free_space(self, asset):
+        return c_drive_free_gb(asset)
+
+    def fleet_table(self):
+        """The columnar fleet table, rebuilt if it fell out of step with assets_data"""
+        table = st.session_state.fleet_table
+        if table is None or len(table) != len(st.session_state.assets_data):
+            table = st.session_state.fleet_table = build_fleet_table(st.session_state.assets_data)
+        return table
+
+    def fleet_rows(self, assets):
+        """Fleet table rows of an asset dict, usually the filtered one"""
+        table = self.fleet_table()
+        if len(assets) == len(table):
+            return table
+        return table[table.index.isin(list(assets))]
 
     def check_and_install_dependencies(self):
         # ... (implementation unchanged) ...
@@ -376,7 +698,13 @@ class ITAssetDashboard:
         with col1:
             st.markdown('<p class="main-title">🖥️ IT Asset Management Dashboard</p>', unsafe_allow_html=True)
             if st.session_state.last_refresh:
-                st.markdown(f'<p class="caption-text">Last updated: {st.session_state.last_refresh.strftime("%Y-%m-%d %H:%M:%S")}</p>', unsafe_allow_html=True)
+                caption = f'Last updated: {st.session_state.last_refresh.strftime("%Y-%m-%d %H:%M:%S")}'
+                cache_stats = st.session_state.get('parse_cache_stats')
+                if cache_stats:
+                    caption += f" · {cache_stats['hits']} reports from cache, {cache_stats['misses']} parsed"
+                    if cache_stats.get('quarantined'):
+                        caption += f", {cache_stats['quarantined']} quarantined"
+                st.markdown(f'<p class="caption-text">{caption}</p>', unsafe_allow_html=True)
 
         with col2:
             # Theme toggle
@@ -387,6 +715,8 @@ class ITAssetDashboard:
         with col3:
             if st.button("Refresh Data 🔄"): # Changed button text and logic
                 st.session_state.refresh_trigger = True
+                # An explicit refresh re-stats every report: in-place rewrites do not change the folder mtime
+                st.session_state.force_scan = True
                 st.rerun()
 
         with col4:
@@ -406,24 +736,17 @@ class ITAssetDashboard:
                'nmap_scan_type': st.session_state.get('nmap_scan_type', "Quick Scan"),
                'nmap_path': st.session_state.get('nmap_path', "nmap")
            }
-        all_os_versions_set, all_manufacturers_set, all_ram_values_list, all_storage_values_list = set(), set(), [], []
-        for asset in st.session_state.assets_data.values():
-            if 'os_info' in asset and asset['os_info'].get('version'): all_os_versions_set.add(self.normalize_os_version(asset['os_info']['version']))
-            if 'system_info' in asset and asset['system_info'].get('manufacturer'): all_manufacturers_set.add(asset['system_info']['manufacturer'])
-            memory_gb = asset.get('hardware_info', {}).get('memory', {}).get('total_gb', 0)
-            if memory_gb: all_ram_values_list.append(int(memory_gb))
-            c_drive_free = self.get_c_drive_free_space(asset)
-            if c_drive_free is not None: all_storage_values_list.append(c_drive_free)
-        sorted_os_options, sorted_manufacturer_options = sorted(list(all_os_versions_set)), sorted(list(all_manufacturers_set))
+        options = filter_options(self.fleet_table())
+        sorted_os_options, sorted_manufacturer_options = options['os_versions'], options['manufacturers']
         if not st.session_state.selected_os_filter and sorted_os_options: st.session_state.selected_os_filter = sorted_os_options.copy()
         filters['selected_os'] = st.sidebar.multiselect("OS", sorted_os_options, default=st.session_state.selected_os_filter, key="selected_os_multiselect", on_change=lambda: setattr(st.session_state, 'selected_os_filter', st.session_state.selected_os_multiselect))
         if not st.session_state.selected_manufacturers_filter and sorted_manufacturer_options: st.session_state.selected_manufacturers_filter = sorted_manufacturer_options.copy()
         filters['selected_manufacturers'] = st.sidebar.multiselect("Manufacturer", sorted_manufacturer_options, default=st.session_state.selected_manufacturers_filter, key="selected_manufacturers_multiselect", on_change=lambda: setattr(st.session_state, 'selected_manufacturers_filter', st.session_state.selected_manufacturers_multiselect))
         st.sidebar.subheader("Hardware")
-        actual_min_ram, actual_max_ram = (min(all_ram_values_list) if all_ram_values_list else 0), (max(all_ram_values_list) if all_ram_values_list else 128)
+        actual_min_ram, actual_max_ram = options['min_ram'], options['max_ram']
         current_ram_filter = st.session_state.ram_range_filter if st.session_state.ram_range_filter else (actual_min_ram, actual_max_ram)
         filters['min_ram'], filters['max_ram'] = st.sidebar.slider("RAM (GB)", actual_min_ram, actual_max_ram, current_ram_filter, key="ram_slider", on_change=lambda: setattr(st.session_state, 'ram_range_filter', st.session_state.ram_slider))
-        actual_min_storage, actual_max_storage = 0.0, (max(all_storage_values_list) if all_storage_values_list else 500.0)
+        actual_min_storage, actual_max_storage = 0.0, options['max_storage']
         current_storage_filter = st.session_state.storage_range_filter if st.session_state.storage_range_filter else (actual_min_storage, actual_max_storage)
         filters['min_storage'], filters['max_storage'] = st.sidebar.slider("C: Free Space (GB)", actual_min_storage, actual_max_storage, current_storage_filter, key="storage_slider", on_change=lambda: setattr(st.session_state, 'storage_range_filter', st.session_state.storage_slider))
         st.sidebar.subheader("Quick Filters")
@@ -434,29 +757,140 @@ class ITAssetDashboard:
         scan_type_options = ["Quick Scan", "Full Scan", "Disabled"]
         try: current_scan_type_index = scan_type_options.index(st.session_state.nmap_scan_type)
         except ValueError: current_scan_type_index = 0; st.session_state.nmap_scan_type = "Quick Scan"
-        st.sidebar.selectbox("Nmap Scan Type (info only)", scan_type_options, index=current_scan_type_index, key="nmap_scan_type_selector", help="Quick Scan is auto on load. Others for future use.")
+        st.sidebar.selectbox("Nmap Scan Type", scan_type_options, index=current_scan_type_index, key="nmap_scan_type_selector", help="Quick Scan runs on every load. Full Scan also queues routine full scans (-A) of the whole fleet, a few at a time. A single asset can be full-scanned from its card's technical details.", on_change=self._on_scan_type_change)
         filters['nmap_scan_type'] = st.session_state.nmap_scan_type
         filters['nmap_path'] = st.sidebar.text_input("Nmap Path", value=st.session_state.nmap_path, key="nmap_path_input", on_change=lambda: setattr(st.session_state, 'nmap_path', st.session_state.nmap_path_input))
+        st.sidebar.subheader("Parsing")
+        st.sidebar.selectbox("Parser Engine", PARSER_ENGINES, index=PARSER_ENGINES.index(st.session_state.parser_engine), key="parser_engine_selector", help="'regex' is the legacy per-field search, 'tokenizer' reads each file in a single pass. Changing it reloads the data.", on_change=self._on_parser_engine_change)
+        st.sidebar.checkbox("Profile Parsing", value=st.session_state.parse_profiling, key="parse_profiling_cb", help="Time every field pattern and parse step on the next load (no cache, single process). Changing it reloads the data.", on_change=self._on_parse_profiling_change)
+        st.sidebar.checkbox("Lazy Sections", value=st.session_state.lazy_sections, key="lazy_sections_cb", help="Parse installed programs, credentials, shared folders, Adobe/Autodesk and BitLocker only when an asset's details are opened. Faster loads and less memory, but the general search only covers sections already opened. Changing it reloads the data.", on_change=self._on_lazy_sections_change)
+        st.sidebar.checkbox("Watch Folder", value=st.session_state.watch_folder, key="watch_folder_cb", help="Apply new, changed and deleted reports as they appear, without a full reload.", on_change=self._on_watch_folder_change)
+        if st.session_state.ingest_stats:
+            st.sidebar.caption(f"Last load: {st.session_state.ingest_stats.summary()}")
+        elif st.session_state.snapshot_info:
+            st.sidebar.caption(f"Opened from snapshot {st.session_state.snapshot_info}")
+        self.render_report_formats()
+        if st.session_state.parse_profiling and st.session_state.parse_profile:
+            self.render_parse_profile(st.session_state.parse_profile)
+        if st.session_state.quarantined_files:
+            with st.sidebar.expander(f"⚠️ Quarantined Reports ({len(st.session_state.quarantined_files)})", expanded=False):
+                st.caption("Skipped until the file changes.")
+                for path, reason in st.session_state.quarantined_files.items():
+                    st.markdown(f"- **{Path(path).name}**: {reason}")
         with st.sidebar.expander("⚙️ View Customization", expanded=False):
             st.checkbox("Summary & Charts", value=st.session_state.show_summary_section, key="show_summary_cb", on_change=lambda: setattr(st.session_state, 'show_summary_section', st.session_state.show_summary_cb))
             st.checkbox("Asset Bubbles", value=st.session_state.show_bubbles_section, key="show_bubbles_cb", on_change=lambda: setattr(st.session_state, 'show_bubbles_section', st.session_state.show_bubbles_cb))
             st.checkbox("Asset Details Table", value=st.session_state.show_details_table_section, key="show_details_table_cb", on_change=lambda: setattr(st.session_state, 'show_details_table_section', st.session_state.show_details_table_cb))
         return filters
 
+    def _on_parser_engine_change(self):
+        st.session_state.parser_engine = st.session_state.parser_engine_selector
+        st.session_state.refresh_trigger = True
+
+    def _on_lazy_sections_change(self):
+        st.session_state.lazy_sections = st.session_state.lazy_sections_cb
+        st.session_state.refresh_trigger = True
+
+    def _on_watch_folder_change(self):
+        st.session_state.watch_folder = st.session_state.watch_folder_cb
+        if st.session_state.watch_folder:
+            # Reload (mostly from the cache) so watching starts from an up-to-date listing
+            st.session_state.refresh_trigger = True
+        else:
+            st.session_state.folder_watcher.stop()
+
+    def render_watch_status(self):
+        """Sidebar status of the folder watcher, refreshed on a timer where fragments are available"""
+        watcher = st.session_state.folder_watcher
+        if st.session_state.watch_folder and watcher.suspended:
+            # Stopped while no page collected its changes; catches up from the listing it had
+            watcher.resume()
+        if not watcher.running:
+            return
+        with st.sidebar:
+            if _fragment is not None:
+                _fragment(run_every=max(1.0, WATCH_SETTLE_SECONDS))(self.check_folder_changes)()
+            else:
+                self.check_folder_changes()
+
+    def render_scan_status(self):
+        """Sidebar scan cache hit rate, status ages and progress of the background quick scans (timer-refreshed while they run)"""
+        cache = st.session_state.scan_cache
+        if cache is not None and cache.hit_rate() is not None:
+            st.sidebar.caption(f"🗄️ Scan cache: {cache.hit_rate():.0%} hit rate ({cache.summary()}), TTL {_age_text(cache.ttl)}")
+        table = st.session_state.fleet_table
+        if table is not None and table['scanned_at'].notna().any():
+            ages = (datetime.now() - table['scanned_at'].dropna()).dt.total_seconds()
+            st.sidebar.caption(f"🕒 Statuses checked {_age_text(ages.min())} to {_age_text(ages.max())} ago, "
+                               f"median {_age_text(ages.median())}")
+        status = self.full_scan_scheduler.status()
+        full_scans_busy = status['queued'] or status['running'] or status['retrying']
+        if not st.session_state.scan_worker.busy and not full_scans_busy \
+                and self.full_scan_scheduler.results_since(st.session_state.full_scan_seq)[0] == st.session_state.full_scan_seq:
+            return
+        with st.sidebar:
+            if _fragment is not None:
+                _fragment(run_every=max(0.5, SCAN_REFRESH_SECONDS))(self.check_scan_results)()
+            else:
+                self.check_scan_results()
+
+    def _on_scan_type_change(self):
+        st.session_state.nmap_scan_type = st.session_state.nmap_scan_type_selector
+        if st.session_state.nmap_scan_type == "Full Scan" and st.session_state.assets_data:
+            self._queue_full_scans(self.fleet_table()['ip_address'].map(scan_address).dropna())
+
+    def _on_parse_profiling_change(self):
+        st.session_state.parse_profiling = st.session_state.parse_profiling_cb
+        st.session_state.parse_profile = None
+        st.session_state.refresh_trigger = True
+
+    def render_parse_profile(self, report):
+        """Sidebar debug panel with the slowest patterns and parse steps of the last load"""
+        with st.sidebar.expander(f"🐞 Parser Profile ({report['files']} files)", expanded=False):
+            st.markdown("**Patterns** (per-field search, slowest first)")
+            patterns_df = pd.DataFrame(report['patterns'])
+            if not patterns_df.empty:
+                st.dataframe(patterns_df[['field', 'priority', 'total_ms', 'calls', 'matches', 'misses', 'mean_offset', 'pattern']].head(25), hide_index=True)
+            st.markdown("**Parse steps**")
+            methods_df = pd.DataFrame(report['methods'])
+            if not methods_df.empty:
+                st.dataframe(methods_df[['method', 'total_ms', 'calls', 'matches', 'misses', 'mean_us']], hide_index=True)
+
+    def render_report_formats(self):
+        """Sidebar breakdown of the fleet by report layout, with the parse time of the last load"""
+        table = self.fleet_table()
+        if table.empty:
+            return
+        counts = table['report_format'].astype(object).fillna(GENERIC_FORMAT).value_counts()
+        parsed = st.session_state.ingest_stats.formats if st.session_state.ingest_stats else None
+        with st.sidebar.expander(f"📄 Report Formats ({len(counts)})", expanded=False):
+            for name, count in counts.items():
+                timing = ''
+                if parsed and parsed.counts.get(name):
+                    timing = f", last load parsed {parsed.counts[name]} at {parsed.seconds[name] / parsed.counts[name] * 1000:.2f} ms each"
+                st.markdown(f"- **{name}**: {count} reports{timing}")
+
     def filter_assets(self, filters):
         # ... (implementation unchanged) ...
-        filtered_assets = {}
-        for name, asset in st.session_state.assets_data.items():
-            if filters['selected_os'] and self.normalize_os_version(asset.get('os_info', {}).get('version', '')) not in filters['selected_os']: continue
-            if filters['selected_manufacturers'] and asset.get('system_info', {}).get('manufacturer', '') not in filters['selected_manufacturers']: continue
-            memory_gb = asset.get('hardware_info', {}).get('memory', {}).get('total_gb', 0)
-            if memory_gb and (memory_gb < filters['min_ram'] or memory_gb > filters['max_ram']): continue
-            c_drive_free = self.get_c_drive_free_space(asset)
-            if c_drive_free is not None and (c_drive_free < filters['min_storage'] or c_drive_free > filters['max_storage']): continue
-            if filters['show_low_storage'] and (c_drive_free is None or c_drive_free >= 10): continue
-            if filters['anydesk_search'] and filters['anydesk_search'].lower() not in asset.get('anydesk_id', '').lower(): continue
-            if filters['search_term'] and filters['search_term'].lower() not in json.dumps(asset).lower(): continue
-            filtered_assets[name] = asset
+        assets_data = st.session_state.assets_data
+        if not assets_data:
+            return {}
+        store = st.session_state.asset_store
+        if store is not None:
+            # One indexed query, the global search included (substrings, via an FTS5 trigram index)
+            try:
+                matched = set(store.filter_names(filters))
+                return {name: assets_data[name] for name in assets_data if name in matched}
+            except sqlite3.Error as e:
+                logger.error(f"Asset store query failed, filtering in memory: {e}")
+        table = self.fleet_table()
+        names = table.index[filter_mask(table, filters).to_numpy()]
+        filtered_assets = {name: assets_data[name] for name in names}
+        # Free-text search covers the whole asset (raw report included), so it runs last, on the remaining rows
+        if filters['search_term']:
+            term = filters['search_term'].lower()
+            filtered_assets = {name: asset for name, asset in filtered_assets.items()
+                               if term in json.dumps(asset, default=to_plain).lower()}
         return filtered_assets
 
 
@@ -500,7 +934,11 @@ class ITAssetDashboard:
 
        status_indicator_class = f"status-indicator-{status_for_class}"
        status_text_class = f"status-{status_for_class}"
-       plain_status_text = raw_status.capitalize() if status_for_class in ["online", "offline"] else "Unknown"
+       plain_status_text = raw_status.capitalize() if status_for_class in ["online", "offline"] else "Pending" if status_for_class == "pending" else "Unknown"
+       scanned_at = asset.get('network_info', {}).get('scanned_at')
+       status_title = f"Checked {scanned_at}" if scanned_at else "Not checked yet"
+       if scanned_at:
+           plain_status_text += f" · {_age_text((datetime.now() - datetime.fromisoformat(scanned_at)).total_seconds())}"
 
        # --- HTML Construction ---
        anydesk_id_val = asset.get('anydesk_id', '')
@@ -528,7 +966,7 @@ class ITAssetDashboard:
                        <span class="asset-ip">{ip_address}</span>
                    </div>
                    <div class="card-actions-group">
-                       <span class="status-text-badge {status_text_class}">{plain_status_text}</span>
+                       <span class="status-text-badge {status_text_class}" title="{status_title}">{plain_status_text}</span>
                        {anydesk_html}
                    </div>
                </div>
@@ -543,8 +981,9 @@ class ITAssetDashboard:
        </div>
        """, unsafe_allow_html=True)
        
-       # Expander for deep technical details (Rendered natively in Streamlit inside the loop)
-       with st.expander("Show Technical Details"):
+       # Deep technical details, rendered only when asked for: the BitLocker section may still have to be parsed
+       if st.checkbox("Show Technical Details", key=f"tech_details_{name}"):
+            self.asset_parser.load_sections(asset)
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown("**Hardware & OS**")
@@ -570,11 +1009,40 @@ class ITAssetDashboard:
                 st.markdown("**Quick WinRM**")
                 st.code(winrm_cmd, language="powershell")
 
+            history = st.session_state.asset_history
+            if history is not None and history.versions(name) > 1:
+                st.markdown("**History** (C: free and total storage, GB)")
+                series = history.series(name).set_index('last_modified')
+                st.line_chart(series[['c_free_gb', 'storage_total_gb']])
+
+            self.render_full_scan(name, asset)
+
+    def render_full_scan(self, name, asset):
+        """Full scan button and last result of one asset"""
+        network_info = asset.get('network_info', {})
+        ip_addr = scan_target(asset)
+        if ip_addr is None:
+            return
+        priority = self.full_scan_scheduler.job_priority(ip_addr)
+        if priority is not None:
+            st.caption(f"🛰️ Full scan queued ({priority})")
+        elif st.button("🔍 Full Scan", key=f"full_scan_{name}", help="Queue an nmap full scan (-A) of this asset ahead of routine ones"):
+            self._queue_full_scans([ip_addr], PRIORITY_ON_DEMAND)
+            st.rerun()
+        if network_info.get('nmap_full_scan_output'):
+            st.caption(f"Last full scan: {network_info.get('full_scanned_at', 'N/A')}")
+            st.code(network_info['nmap_full_scan_output'], language=None)
+        elif network_info.get('nmap_full_scan_error'):
+            st.caption(f"Last full scan failed: {network_info['nmap_full_scan_error']}")
+
     def render_status_distribution_chart(self, assets):
         # ... (implementation unchanged) ...
         if not assets: return
-        st.subheader("Assets by Status"); status_counts = {}
-        for asset_data in assets.values(): status = asset_data.get('network_info', {}).get('status', 'unknown'); status_counts[status] = status_counts.get(status, 0) + 1
+        st.subheader("Assets by Status")
+        rows = self.fleet_rows(assets)
+        # Assets whose quick scan has not come back yet count as pending, not unknown
+        statuses = rows['status'].astype(object).fillna('unknown').mask(rows['nmap_scan_status'] == 'pending_quick_scan', 'pending')
+        status_counts = statuses.value_counts(sort=False).to_dict()
         if status_counts:
             fig = px.pie(values=list(status_counts.values()), names=list(status_counts.keys()), title="Asset Status Overview")
             fig.update_traces(textposition='inside', textinfo='percent+label'); st.plotly_chart(fig, use_container_width=True)
@@ -595,25 +1063,11 @@ class ITAssetDashboard:
         col1, col2, col3, col4 = st.columns(4)
 
         # Calculate metrics
-        total_assets = len(assets)
-        online_assets = sum(1 for asset in assets.values()
-                          if asset.get('network_info', {}).get('status') == 'online')
-
-        ram_total = 0
-        storage_total = 0
-
-        for asset in assets.values():
-            # RAM total (convert to GB if needed)
-            ram_info = asset.get('hardware_info', {}).get('memory', {})
-            if isinstance(ram_info, dict) and 'total_gb' in ram_info:
-                ram_total += ram_info['total_gb']
-
-            # Storage total
-            storage_info = asset.get('hardware_info', {}).get('storage', [])
-            if isinstance(storage_info, list):
-                for drive in storage_info:
-                    if isinstance(drive, dict) and 'size_gb' in drive:
-                        storage_total += drive['size_gb']
+        table = self.fleet_rows(assets)
+        total_assets = len(table)
+        online_assets = int((table['status'] == 'online').sum())
+        ram_total = float(table['ram_gb'].sum())
+        storage_total = float(table['storage_total_gb'].sum())
 
         with col1:
             st.metric("Total Assets Managed", total_assets)
@@ -642,39 +1096,17 @@ class ITAssetDashboard:
 
         st.subheader("Asset Details")
 
-        table_data = []
-        try:
-            logger.info("render_asset_details: Starting preparation of table_data.")
-            for name, asset in assets.items():
-                try:
-                    row = {
-                        'Computer Name': name,
-                        'IP Address': asset.get('network_info', {}).get('ip_address', 'N/A'),
-                        'OS': asset.get('os_info', {}).get('version', 'N/A'),
-                        'Manufacturer': asset.get('system_info', {}).get('manufacturer', 'N/A'),
-                        'Model': asset.get('system_info', {}).get('model', 'N/A'),
-                        'RAM (GB)': asset.get('hardware_info', {}).get('memory', {}).get('total_gb', 'N/A'),
-                        'CPU': asset.get('hardware_info', {}).get('processor', {}).get('name', 'N/A'),
-                        'Status': asset.get('network_info', {}).get('status', 'Unknown')
-                    }
-                    table_data.append(row)
-                except Exception as e:
-                    logger.error(f"render_asset_details: Error processing asset '{name}': {str(e)}")
-                    # Optionally, add a placeholder row or skip
-            logger.info(f"render_asset_details: table_data preparation complete. Number of rows: {len(table_data)}")
-            if not table_data:
-                logger.warning("render_asset_details: table_data is empty after processing assets.")
-                st.info("No data could be prepared for the asset details table.")
-                return
-        except Exception as e:
-            logger.error(f"render_asset_details: Error during table_data preparation loop: {str(e)}")
-            st.error("An error occurred while preparing asset data for display.")
-            return
-
         try:
-            logger.info("render_asset_details: Creating DataFrame from table_data.")
-            df = pd.DataFrame(table_data)
-            logger.info(f"render_asset_details: DataFrame created. Shape: {df.shape}. Head: {df.head().to_string() if not df.empty else 'Empty DataFrame'}")
+            logger.info("render_asset_details: Selecting columns from the fleet table.")
+            table = self.fleet_rows(assets)
+            columns = {'ip_address': 'IP Address', 'os_version': 'OS', 'manufacturer': 'Manufacturer', 'model': 'Model',
+                       'ram_gb': 'RAM (GB)', 'cpu': 'CPU', 'status': 'Status'}
+            df = table[list(columns)].astype(object).rename(columns=columns)
+            df = df.where(df.notna(), 'N/A')
+            df['Status'] = df['Status'].replace('N/A', 'Unknown')
+            df.insert(0, 'Computer Name', table.index)
+            df = df.reset_index(drop=True)
+            logger.info(f"render_asset_details: DataFrame created. Shape: {df.shape}.")
         except Exception as e:
             logger.error(f"render_asset_details: Failed to create DataFrame: {str(e)}")
             st.error("Failed to create the data table for asset details.")
@@ -715,13 +1147,12 @@ class ITAssetDashboard:
         st.subheader("System Statistics")
 
         col1, col2 = st.columns(2)
+        table = self.fleet_rows(assets)
 
         with col1:
             # OS Distribution
-            os_data = {}
-            for asset in assets.values():
-                os_version = self.normalize_os_version(asset.get('os_info', {}).get('version', 'Unknown'))
-                os_data[os_version] = os_data.get(os_version, 0) + 1
+            os_data = table['os_family'].value_counts(sort=False)
+            os_data = os_data[os_data > 0].to_dict()
 
             if os_data:
                 fig_os = px.pie(
@@ -735,10 +1166,7 @@ class ITAssetDashboard:
 
         with col2:
             # Manufacturer Distribution
-            manufacturer_data = {}
-            for asset in assets.values():
-                manufacturer = asset.get('system_info', {}).get('manufacturer', 'Unknown')
-                manufacturer_data[manufacturer] = manufacturer_data.get(manufacturer, 0) + 1
+            manufacturer_data = table['manufacturer'].astype(object).fillna('Unknown').value_counts(sort=False).to_dict()
 
             if manufacturer_data:
                 fig_mfg = px.pie(
@@ -755,6 +1183,8 @@ class ITAssetDashboard:
         try:
             if 'view_asset' in st.query_params:
                 try:
+                    if not st.session_state.assets_data and not st.session_state.snapshot_checked:
+                        self.load_snapshot()
                     if not st.session_state.assets_data:
                         with st.spinner("Loading asset data..."):
                              st.session_state.assets_data = self.load_assets_data()
@@ -775,31 +1205,27 @@ class ITAssetDashboard:
             self.check_and_install_dependencies()
             apply_windows11_theme()
             
+            if not st.session_state.assets_data and not st.session_state.snapshot_checked and 'refresh_trigger' not in st.session_state:
+                self.load_snapshot()
             if not st.session_state.assets_data or 'refresh_trigger' in st.session_state:
                 if 'refresh_trigger' in st.session_state: del st.session_state['refresh_trigger']
                 logger.info("No Nmap queue to reset.") # Nmap queue was removed
-                with st.spinner("Loading asset data (including Nmap Quick Scans)..."):
-                    st.session_state.assets_data = self.load_assets_data()
+                with st.spinner("Loading asset data..."):
+                    st.session_state.assets_data = self.load_assets_data(force_scan=st.session_state.pop('force_scan', False))
 
             self.render_header()
             filters = self.render_sidebar_filters() # This now returns a dict of actual filter values
+            self.render_watch_status()
+            self.render_scan_status()
 
             # This block for active pills display logic is kept from previous state,
             # ensure it correctly uses session state for filter values.
             if st.session_state.assets_data and filters:
-                all_os_versions_set, all_manufacturers_set, all_ram_values_list, all_storage_values_list = set(), set(), [], []
-                for asset in st.session_state.assets_data.values():
-                    if asset.get('os_info', {}).get('version'): all_os_versions_set.add(self.normalize_os_version(asset['os_info']['version']))
-                    if asset.get('system_info', {}).get('manufacturer'): all_manufacturers_set.add(asset['system_info']['manufacturer'])
-                    memory_gb = asset.get('hardware_info', {}).get('memory', {}).get('total_gb', 0)
-                    if memory_gb: all_ram_values_list.append(int(memory_gb))
-                    c_drive_free = self.get_c_drive_free_space(asset)
-                    if c_drive_free is not None: all_storage_values_list.append(c_drive_free)
-
-                default_min_ram = min(all_ram_values_list) if all_ram_values_list else 0
-                default_max_ram = max(all_ram_values_list) if all_ram_values_list else 128
+                options = filter_options(self.fleet_table())
+                all_os_versions_set, all_manufacturers_set = set(options['os_versions']), set(options['manufacturers'])
+                default_min_ram, default_max_ram = options['min_ram'], options['max_ram']
                 default_min_storage = 0.0
-                default_max_storage = max(all_storage_values_list) if all_storage_values_list else 500.0
+                default_max_storage = options['max_storage']
 
                 active_pills_data = []
                 if len(st.session_state.selected_os_filter) != len(all_os_versions_set):
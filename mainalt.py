@@ -30,6 +30,7 @@ import streamlit as st
 
 # ──────────────────────────────── Local
 from asset_parser import AssetParser          # External helper (provide your own)
+from parallel_parser import parse_files
 # from dashboard_components import DashboardComponents   # optional
 
 # ╭──────────────────────────────────────────────────────────────╮
@@ -43,6 +44,9 @@ class Config:
     CACHE_TTL_SECONDS       = 300                # 5 min
     THEME_TOGGLE_EMOJI      = "🌓"
     LOG_LEVEL               = os.getenv("LOG_LEVEL", "INFO").upper()
+    PARSER_ENGINE           = os.getenv("ASSET_PARSER_ENGINE", "regex")   # or "tokenizer"
+    PARSE_WORKERS           = int(os.getenv("ASSET_PARSE_WORKERS", "0"))   # 0 = one per core
+    PARSE_CHUNK_SIZE        = int(os.getenv("ASSET_PARSE_CHUNK_SIZE", "32"))
 
 
 # ╭──────────────────────────────────────────────────────────────╮
@@ -127,7 +131,7 @@ def apply_windows11_theme() -> None:
 class ITAssetDashboard:
     # ─────────────────────── STATE INIT ────────────────────────
     def __init__(self) -> None:
-        self.parser = AssetParser()
+        self.parser = AssetParser(engine=Config.PARSER_ENGINE)
 
         # initialise persistent session-state keys
         defaults = {
@@ -154,13 +158,18 @@ class ITAssetDashboard:
             log.warning("Assets folder does not exist.")
             return assets
 
-        for f in assets_folder.glob("*.txt"):
-            try:
-                asset = self.parser.parse_asset_file(f)
-                name = asset.get("computer_name", f.stem)
-                assets[name] = asset
-            except Exception as exc:               # noqa: BLE001
-                log.exception("Error parsing %s: %s", f, exc)
+        files = sorted(assets_folder.glob("*.txt"))
+        parsed = parse_files(
+            self.parser, files,
+            workers=Config.PARSE_WORKERS or None,
+            chunk_size=Config.PARSE_CHUNK_SIZE,
+        )
+        for f, asset in zip(files, parsed):
+            if asset is None:
+                log.warning("Could not parse %s", f)
+                continue
+            name = asset.get("computer_name", f.stem)
+            assets[name] = asset
         return assets
 
     async def _nmap_scan_one(
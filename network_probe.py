@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import os
+import socket
+import struct
+import time
+from typing import Dict, Any, Optional, Iterable, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows: no descriptor limit to raise
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# RPC, SMB, RDP and WinRM: a Windows PC answers on at least one of them, if only with a reset
+DEFAULT_PORTS = (135, 445, 3389, 5985)
+# Seconds a host has to answer, and hosts probed at once
+DEFAULT_TIMEOUT = 1.0
+DEFAULT_CONCURRENCY = 1000
+
+
+def _raise_fd_limit(needed: int) -> int:
+    """Raise the soft open-file limit towards needed (POSIX); returns the limit in effect"""
+    if resource is None:
+        return needed
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+    return needed if soft == resource.RLIM_INFINITY else soft
+
+
+def _checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def _echo_request(identifier: int, sequence: int) -> bytes:
+    payload = b'asset-probe'
+    header = struct.pack('!BBHHH', 8, 0, 0, identifier, sequence)
+    return struct.pack('!BBHHH', 8, 0, _checksum(header + payload), identifier, sequence) + payload
+
+
+def icmp_available() -> bool:
+    """Whether this process may send pings without privileges (Linux ping_group_range, macOS)"""
+    try:
+        socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP).close()
+        return True
+    except (OSError, AttributeError):
+        return False
+
+
+async def _tcp_probe(ip_address: str, port: int) -> Optional[str]:
+    """How the host answered on port ('open', 'refused'), or None if it did not"""
+    try:
+        _, writer = await asyncio.open_connection(ip_address, port)
+    except ConnectionRefusedError:
+        return 'refused'
+    except OSError:
+        return None
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return 'open'
+
+
+async def _icmp_probe(ip_address: str) -> Optional[str]:
+    """'echo-reply' if the host answered a ping, else None"""
+    loop = asyncio.get_running_loop()
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+    except OSError:
+        return None
+    try:
+        sock.setblocking(False)
+        # Connected, so the kernel only hands this socket replies from that host
+        sock.connect((ip_address, 0))
+        await loop.sock_sendall(sock, _echo_request(os.getpid() & 0xFFFF, 1))
+        while True:
+            data = await loop.sock_recv(sock, 512)
+            if data and data[0] >> 4 == 4:
+                # macOS includes the IP header, Linux does not
+                data = data[(data[0] & 0x0F) * 4:]
+            if data and data[0] == 0:
+                return 'echo-reply'
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+
+async def _probe_host(ip_address: str, ports: Tuple[int, ...], timeout: float, icmp: bool) -> Dict[str, Any]:
+    """run_nmap_scan's result shape for one host: online as soon as any probe gets an answer"""
+    probes = {asyncio.ensure_future(_tcp_probe(ip_address, port)): f"tcp/{port}" for port in ports}
+    if icmp:
+        probes[asyncio.ensure_future(_icmp_probe(ip_address))] = 'icmp'
+    answer = None
+    pending = set(probes)
+    try:
+        async with asyncio.timeout(timeout):
+            while pending and answer is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result() is not None:
+                        answer = f"{probes[task]} {task.result()}"
+                        break
+    except TimeoutError:
+        pass
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    if answer is not None:
+        output = f"Probe report for {ip_address}\nHost is up ({answer})."
+        return {"status": "online", "mac_address": None, "nmap_output": output, "error_message": None}
+    probed = ', '.join(probes.values())
+    output = f"Probe report for {ip_address}\nHost seems down (no answer from {probed} within {timeout:g}s)."
+    return {"status": "offline", "mac_address": None, "nmap_output": output, "error_message": None}
+
+
+async def probe_hosts_async(ip_addresses: Iterable[str], ports: Tuple[int, ...] = DEFAULT_PORTS,
+                            timeout: float = DEFAULT_TIMEOUT, concurrency: int = DEFAULT_CONCURRENCY,
+                            icmp: Optional[bool] = None) -> Dict[str, Dict[str, Any]]:
+    """Liveness of many hosts, probed concurrently; see probe_hosts"""
+    ip_addresses = list(dict.fromkeys(ip_addresses))
+    if icmp is None:
+        icmp = icmp_available()
+    # Every host in flight holds one socket per probe
+    per_host = len(ports) + (1 if icmp else 0)
+    limit = _raise_fd_limit(concurrency * per_host + 64)
+    concurrency = max(1, min(concurrency, (limit - 64) // per_host))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe(ip_address):
+        async with semaphore:
+            try:
+                return ip_address, await _probe_host(ip_address, ports, timeout, icmp)
+            except Exception as e:
+                return ip_address, {"status": "unknown", "mac_address": None, "nmap_output": "",
+                                    "error_message": f"Probe error: {e}"}
+
+    return dict(await asyncio.gather(*(probe(ip_address) for ip_address in ip_addresses)))
+
+
+def probe_hosts(ip_addresses: Iterable[str], ports: Tuple[int, ...] = DEFAULT_PORTS, timeout: float = DEFAULT_TIMEOUT,
+                concurrency: int = DEFAULT_CONCURRENCY, icmp: Optional[bool] = None) -> Dict[str, Dict[str, Any]]:
+    """Up/down for many hosts without nmap: one result per address, in run_nmap_scan's shape
+
+    Each host gets TCP connects to ports, plus an unprivileged ping where the OS allows
+    one (icmp=None: if available). A connection accepted or refused means the host is
+    up; no answer from any probe within timeout means down. concurrency hosts are in
+    flight at once. Must not be called from a running event loop (use probe_hosts_async).
+    """
+    t0 = time.perf_counter()
+    results = asyncio.run(probe_hosts_async(ip_addresses, ports, timeout, concurrency, icmp))
+    up = sum(1 for result in results.values() if result["status"] == "online")
+    logger.info(f"Probed {len(results)} hosts in {time.perf_counter() - t0:.1f}s: {up} up")
+    return results
@@ -0,0 +1,273 @@
+import concurrent.futures
+import ipaddress
+import logging
+import os
+import re
+import subprocess
+import tempfile
+import xml.etree.ElementTree as ElementTree
+from datetime import datetime
+from collections.abc import Mapping
+from typing import Dict, Any, Optional, List, Tuple, Iterable, Iterator
+
+from network_probe import probe_hosts
+from scan_cache import ScanCache
+
+logger = logging.getLogger(__name__)
+
+# Seconds one nmap run may take
+NMAP_TIMEOUT = 120
+# Quick scans in flight at once
+QUICK_SCAN_THREADS = 30
+# 'batch': one nmap run per chunk of targets; 'per-host': one nmap process per asset;
+# 'probe': the built-in TCP/ping prober of network_probe.py, no nmap at all
+QUICK_SCAN_MODES = ['batch', 'per-host', 'probe']
+# Targets per batched nmap run, batched runs at once, and seconds one run may take
+BATCH_CHUNK_SIZE = 1024
+BATCH_PARALLEL_RUNS = 4
+BATCH_TIMEOUT = 900
+
+
+def run_nmap_scan(ip_address: str, nmap_executable_path: str = "nmap", scan_type: str = "Full Scan") -> dict:
+    """Run nmap against one host: {status, mac_address, nmap_output, error_message}"""
+    result = { "status": "unknown", "mac_address": None, "nmap_output": "", "error_message": None }
+    logger.info(f"Starting nmap scan for IP: {ip_address}")
+    try:
+        command = []
+        if scan_type == "Quick Scan":
+            command = [nmap_executable_path, "-sn", "-T4", ip_address]
+        elif scan_type == "Full Scan":
+            command = [nmap_executable_path, "-T4", "-A", "-v", "-Pn", ip_address]
+        else:
+            result["error_message"] = f"Invalid scan type: {scan_type}"
+            logger.error(result["error_message"])
+            return result
+
+        logger.info(f"Executing Nmap {scan_type} for {ip_address}: {' '.join(command)}")
+        process = subprocess.run(command, capture_output=True, text=True, timeout=NMAP_TIMEOUT)
+        result["nmap_output"] = process.stdout
+
+        if process.returncode == 0:
+            if "Host seems down" in process.stdout: result["status"] = "offline"
+            elif "Host is up" in process.stdout: result["status"] = "online"
+            elif scan_type == "Full Scan" and re.search(r"\d+/open/", process.stdout): result["status"] = "online"
+            else: result["status"] = "offline"
+            logger.info(f"Nmap {scan_type} for {ip_address}: Parsed status: {result['status']}.")
+            if scan_type == "Full Scan":
+                mac_match = re.search(r"MAC Address: ([0-9A-Fa-f:]{17})", process.stdout, re.IGNORECASE)
+                if mac_match: result["mac_address"] = mac_match.group(1).upper()
+        else:
+            result["error_message"] = f"Nmap scan failed (code {process.returncode}): {process.stderr}"
+            logger.error(result["error_message"])
+    except FileNotFoundError:
+        result["error_message"] = f"Nmap not found at '{nmap_executable_path}'."
+        logger.error(result["error_message"])
+    except subprocess.TimeoutExpired:
+        result["error_message"] = "Nmap scan timed out."
+        logger.error(result["error_message"])
+    except Exception as e:
+        result["error_message"] = f"Nmap scan error: {e}"
+        logger.error(result["error_message"], exc_info=True)
+    return result
+
+
+def scan_address(ip_addr: Any) -> Optional[str]:
+    """The address to scan for a report's IP field (IPv4 normalised), or None when it has none"""
+    if not isinstance(ip_addr, str) or not ip_addr.strip() or ip_addr.strip() == 'N/A':
+        return None
+    return _ipv4(ip_addr) or ip_addr.strip()
+
+
+def scan_target(asset: Mapping) -> Optional[str]:
+    """The IP address to scan for an asset, or None when it has none"""
+    return scan_address(asset.get('network_info', {}).get('ip_address'))
+
+
+def _ipv4(target: str) -> Optional[str]:
+    try:
+        return str(ipaddress.IPv4Address(target.strip()))
+    except ValueError:
+        return None
+
+
+def _host_output(ip_addr: str, state: str, reason: str, mac: Optional[str], vendor: Optional[str]) -> str:
+    # Same wording as nmap's normal output, so the per-host and batched results read alike
+    lines = [f"Nmap scan report for {ip_addr}"]
+    if state == 'up':
+        lines.append(f"Host is up ({reason}).")
+        if mac:
+            lines.append(f"MAC Address: {mac}" + (f" ({vendor})" if vendor else ''))
+    else:
+        lines.append("Host seems down.")
+    return '\n'.join(lines)
+
+
+def parse_nmap_xml(xml_text: str) -> Dict[str, Dict[str, Any]]:
+    """Per-IPv4 results (run_nmap_scan's shape) from nmap -oX output; hosts nmap did not report are absent"""
+    results = {}
+    for host in ElementTree.fromstring(xml_text).iter('host'):
+        addresses = {address.get('addrtype'): address for address in host.iter('address')}
+        if 'ipv4' not in addresses:
+            continue
+        ip_addr = addresses['ipv4'].get('addr')
+        status = host.find('status')
+        state = status.get('state') if status is not None else 'unknown'
+        reason = status.get('reason', '') if status is not None else ''
+        mac_address = addresses.get('mac')
+        mac = mac_address.get('addr').upper() if mac_address is not None and mac_address.get('addr') else None
+        vendor = mac_address.get('vendor') if mac_address is not None else None
+        results[ip_addr] = {
+            "status": "online" if state == 'up' else "offline",
+            "mac_address": mac,
+            "nmap_output": _host_output(ip_addr, state, reason, mac, vendor),
+            "error_message": None,
+        }
+    return results
+
+
+def run_nmap_batch(ip_addresses: List[str], nmap_executable_path: str = "nmap") -> Dict[str, Dict[str, Any]]:
+    """Quick-scan many IPv4 addresses with one nmap process; one result per address, as run_nmap_scan returns"""
+    logger.info(f"Executing Nmap batch Quick Scan for {len(ip_addresses)} hosts")
+    error_message = None
+    results = {}
+    # A list file, not arguments: thousands of targets would overflow the Windows command line
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', prefix='nmap-targets-', delete=False) as f:
+        f.write('\n'.join(ip_addresses) + '\n')
+        target_file = f.name
+    try:
+        # -n: no reverse DNS, which would otherwise dominate a large sweep; -oX -: XML on stdout
+        command = [nmap_executable_path, "-sn", "-T4", "-n", "-iL", target_file, "-oX", "-"]
+        process = subprocess.run(command, capture_output=True, text=True, timeout=BATCH_TIMEOUT)
+        if process.returncode == 0:
+            results = parse_nmap_xml(process.stdout)
+        else:
+            error_message = f"Nmap scan failed (code {process.returncode}): {process.stderr}"
+    except FileNotFoundError:
+        error_message = f"Nmap not found at '{nmap_executable_path}'."
+    except subprocess.TimeoutExpired:
+        error_message = f"Nmap batch scan timed out after {BATCH_TIMEOUT}s."
+    except ElementTree.ParseError as e:
+        error_message = f"Unreadable nmap XML output: {e}"
+    except Exception as e:
+        error_message = f"Nmap scan error: {e}"
+        logger.error(error_message, exc_info=True)
+    finally:
+        try:
+            os.unlink(target_file)
+        except OSError:
+            pass
+    if error_message:
+        logger.error(f"Nmap batch Quick Scan of {len(ip_addresses)} hosts failed: {error_message}")
+        return {ip_addr: {"status": "unknown", "mac_address": None, "nmap_output": "", "error_message": error_message}
+                for ip_addr in ip_addresses}
+    # Hosts that did not answer are left out of -sn XML output
+    for ip_addr in ip_addresses:
+        results.setdefault(ip_addr, {"status": "offline", "mac_address": None, "error_message": None,
+                                     "nmap_output": _host_output(ip_addr, 'down', '', None, None)})
+    up = sum(1 for ip_addr in ip_addresses if results[ip_addr]["status"] == "online")
+    logger.info(f"Nmap batch Quick Scan: {up} of {len(ip_addresses)} hosts up")
+    return results
+
+
+def apply_quick_scan(asset_name: str, asset: Mapping, nmap_result: Optional[Dict[str, Any]]) -> None:
+    """Record a quick scan result (None: nothing to scan) in the asset's network_info"""
+    network_info = asset['network_info']
+    if nmap_result is None:
+        network_info['nmap_scan_status'] = 'skipped_no_ip'
+        return
+    network_info['nmap_scan_status'] = 'completed_quick_scan'
+    # A cached result keeps the time it was taken
+    network_info['scanned_at'] = nmap_result.get('scanned_at') or datetime.now().isoformat(timespec='seconds')
+    if nmap_result.get('status') and nmap_result.get('status') not in ['unknown', 'error']:
+        network_info['status'] = nmap_result['status']
+    network_info['nmap_quick_scan_output'] = nmap_result.get('nmap_output', '')
+    # Only seen for hosts on nmap's own segment; the report's MAC wins when it has one
+    if nmap_result.get('mac_address') and not network_info.get('mac_address'):
+        network_info['mac_address'] = nmap_result['mac_address']
+    if nmap_result.get('error_message'):
+        # Already logged by the scan, once per run rather than once per asset
+        network_info['nmap_scan_status'] = 'failed_quick_scan'
+        network_info['nmap_error'] = nmap_result['error_message']
+
+
+def apply_full_scan(asset_name: str, asset: Mapping, nmap_result: Dict[str, Any]) -> None:
+    """Record a full scan result in the asset's network_info; its status counts if it is newer than the quick scan's"""
+    network_info = asset['network_info']
+    full_scanned_at = nmap_result.get('scanned_at') or datetime.now().isoformat(timespec='seconds')
+    network_info['full_scan_status'] = 'completed_full_scan'
+    network_info['full_scanned_at'] = full_scanned_at
+    network_info['nmap_full_scan_output'] = nmap_result.get('nmap_output', '')
+    if nmap_result.get('status') not in [None, 'unknown', 'error'] and full_scanned_at >= network_info.get('scanned_at', ''):
+        network_info['status'] = nmap_result['status']
+        network_info['scanned_at'] = full_scanned_at
+    if nmap_result.get('mac_address') and not network_info.get('mac_address'):
+        network_info['mac_address'] = nmap_result['mac_address']
+    if nmap_result.get('error_message'):
+        network_info['full_scan_status'] = 'failed_full_scan'
+        network_info['nmap_full_scan_error'] = nmap_result['error_message']
+
+
+def _quick_scan_host(ip_addr: str, nmap_executable_path: str) -> Dict[str, Dict[str, Any]]:
+    return {ip_addr: run_nmap_scan(ip_addr, nmap_executable_path=nmap_executable_path, scan_type="Quick Scan")}
+
+
+def iter_quick_scans(ip_addresses: Iterable[str], nmap_executable_path: str = "nmap", mode: str = 'batch',
+                     max_workers: int = QUICK_SCAN_THREADS,
+                     chunk_size: int = BATCH_CHUNK_SIZE) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Quick-scan addresses (as scan_address returns them), yielding (address, result) as results come in
+
+    'batch' and 'probe' results arrive a chunk of targets at a time, 'per-host' ones one
+    by one. Closing the iterator early cancels the scans that have not started.
+    """
+    addresses = list(dict.fromkeys(ip_addresses))
+    if mode == 'probe':
+        for i in range(0, len(addresses), chunk_size):
+            yield from probe_hosts(addresses[i:i + chunk_size]).items()
+        return
+    chunks, singles = [], addresses
+    if mode == 'batch':
+        ipv4 = [ip_addr for ip_addr in addresses if _ipv4(ip_addr) == ip_addr]
+        chunks = [ipv4[i:i + chunk_size] for i in range(0, len(ipv4), chunk_size)]
+        # Host names and IPv6 addresses keep the per-host scan
+        singles = [ip_addr for ip_addr in addresses if _ipv4(ip_addr) != ip_addr]
+    batch_executor = concurrent.futures.ThreadPoolExecutor(max_workers=BATCH_PARALLEL_RUNS)
+    # nmap runs concurrently, one process per host
+    host_executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {batch_executor.submit(run_nmap_batch, chunk, nmap_executable_path): chunk for chunk in chunks}
+        futures.update({host_executor.submit(_quick_scan_host, ip_addr, nmap_executable_path): [ip_addr]
+                        for ip_addr in singles})
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                logger.error(f"Quick scan of {len(futures[future])} hosts failed: {e}")
+                results = {ip_addr: {"status": "unknown", "mac_address": None, "nmap_output": "",
+                                     "error_message": f"Nmap scan error: {e}"} for ip_addr in futures[future]}
+            yield from results.items()
+    finally:
+        batch_executor.shutdown(cancel_futures=True)
+        host_executor.shutdown(cancel_futures=True)
+
+
+def quick_scan_assets(assets: Mapping, nmap_executable_path: str = "nmap", mode: str = 'batch',
+                      max_workers: int = QUICK_SCAN_THREADS, cache: Optional[ScanCache] = None) -> None:
+    """Run quick scans for the given assets and record status in their network_info
+
+    With a ScanCache the results are stored in it too, with the time they were taken.
+    """
+    targets: Dict[str, List[str]] = {}
+    for name, asset in assets.items():
+        ip_addr = scan_target(asset)
+        if ip_addr is None:
+            apply_quick_scan(name, asset, None)
+        else:
+            # Several reports can share an address (a reinstalled or renamed PC): scanned once
+            targets.setdefault(ip_addr, []).append(name)
+    for ip_addr, nmap_result in iter_quick_scans(list(targets), nmap_executable_path, mode, max_workers):
+        if cache is not None:
+            nmap_result = cache.store(ip_addr, "Quick Scan", nmap_result)
+        for name in targets[ip_addr]:
+            apply_quick_scan(name, assets[name], nmap_result)
+    if cache is not None:
+        cache.save()
@@ -0,0 +1,257 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import count as counter, repeat
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Sequence, Callable, Tuple, Iterable
+
+from asset_parser import AssetParser, open_report
+from parse_cache import file_digest
+
+logger = logging.getLogger(__name__)
+
+# Below this many files the pool start-up (one interpreter per worker) costs more than it saves
+PARALLEL_MIN_FILES = 200
+# Files handed to a worker per round trip; large enough to amortise pickling, small enough to balance
+DEFAULT_CHUNK_SIZE = 32
+# Seconds a single file may take in guarded mode before it is abandoned and quarantined
+DEFAULT_TIME_BUDGET = 10.0
+# Seconds a file may wait for a guarded worker to pick it up (pool start-up included) before the pool is deemed stuck
+PICKUP_TIMEOUT = 60.0
+# Seconds between checks for files picked up by guarded workers
+PICKUP_POLL = 0.25
+
+# Parser instance of the current worker process, built once by _init_worker
+_worker_parser: Optional[AssetParser] = None
+# Guarded workers report here when they pick up a file: (call id, index, time.time())
+_worker_started = None
+
+_END = object()
+
+
+def default_workers() -> int:
+    """One worker per core"""
+    return os.cpu_count() or 1
+
+
+def parse_one(parser: AssetParser, file_path: Path) -> Optional[Dict[str, Any]]:
+    """Parse a single report"""
+    return parser.parse_asset_file(Path(file_path))
+
+
+def parse_one_with_digest(parser: AssetParser, file_path: Path) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Parse a single report and return its content hash alongside, for the parse cache"""
+    file_path = Path(file_path)
+    try:
+        with open_report(file_path) as (data, stat_result):
+            digest = file_digest(data)
+            try:
+                return parser.parse_asset_bytes(data, file_path, stat_result.st_mtime), digest
+            except Exception as e:
+                logger.error(f"Error parsing asset file {file_path}: {e}")
+                return None, digest
+    except OSError as e:
+        logger.error(f"Cannot read asset file {file_path}: {e}")
+        return None, None
+
+
+def parse_prefetched(parser: AssetParser, item: Tuple[str, bytes, float]) -> Tuple[Optional[Dict[str, Any]], str, float]:
+    """Parse a report whose bytes were already read: item is (path, data, mtime); returns (asset, digest, CPU seconds)"""
+    file_path, data, mtime = item
+    file_path = Path(file_path)
+    t0 = time.thread_time()
+    try:
+        asset = parser.parse_asset_bytes(data, file_path, mtime)
+    except Exception as e:
+        logger.error(f"Error parsing asset file {file_path}: {e}")
+        asset = None
+    return asset, file_digest(data), time.thread_time() - t0
+
+
+def _init_worker(engine: str, field_specs, lazy: bool = False, formats: bool = True, started=None) -> None:
+    global _worker_parser, _worker_started
+    _worker_parser = AssetParser(engine=engine, field_specs=field_specs, lazy=lazy, formats=formats)
+    _worker_started = started
+
+
+def _worker_call(func: Callable, item):
+    return func(_worker_parser, item)
+
+
+def _guarded_call(func: Callable, call_id: int, i: int, item):
+    _worker_started.put((call_id, i, time.time()))
+    return func(_worker_parser, item)
+
+
+def map_files(parser: AssetParser, func: Callable, paths: Sequence[Any], workers: Optional[int] = None,
+              chunk_size: Optional[int] = None, min_files: int = PARALLEL_MIN_FILES) -> List[Any]:
+    """Apply func(parser, path) to every path, over worker processes when the fleet is large enough
+
+    Results come back in the order of paths; a "path" can be any picklable item func
+    understands, e.g. prefetched (path, data, mtime) tuples. Workers build their own
+    AssetParser with the same engine, field specs and lazy mode as parser. Runs serially when
+    workers <= 1, when there are fewer than min_files paths, or when the pool cannot be started.
+    """
+    paths = list(paths)
+    workers = workers or default_workers()
+    workers = min(workers, len(paths))
+    if workers <= 1 or len(paths) < min_files:
+        return [func(parser, path) for path in paths]
+
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    logger.info(f"Parsing {len(paths)} files with {workers} worker processes (chunks of {chunk_size})")
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(parser.engine, parser.field_specs, parser.lazy, parser.formats)) as executor:
+            return list(executor.map(_worker_call, repeat(func), paths, chunksize=chunk_size))
+    except (BrokenProcessPool, OSError) as e:
+        logger.warning(f"Process pool unavailable ({e}), parsing serially")
+        return [func(parser, path) for path in paths]
+
+
+def _item_name(item) -> str:
+    return str(item[0] if isinstance(item, tuple) else item)
+
+
+class _GuardedPool:
+    """Worker processes kept from one guarded parse to the next, for one parser configuration"""
+
+    def __init__(self, parser: AssetParser, workers: int):
+        self.parser_key = parser.cache_key
+        self.workers = workers
+        # Not fork: the dashboard has watcher, scan and prefetch threads running, and a child forked while
+        # one of them holds a lock (the logging handler's, say) would hang and be taken for a hung parser
+        context = get_context('spawn')
+        self.started = context.Queue()
+        self.pool = context.Pool(workers, initializer=_init_worker,
+                                 initargs=(parser.engine, parser.field_specs, parser.lazy, parser.formats, self.started))
+
+    def pickups(self, call_id: int) -> Iterable[Tuple[int, float]]:
+        """(index, time) of the files of call_id picked up by a worker since the last call"""
+        while True:
+            try:
+                started_call, i, started_at = self.started.get_nowait()
+            except queue.Empty:
+                return
+            if started_call == call_id:
+                yield i, started_at
+
+    def terminate(self) -> None:
+        self.pool.terminate()
+        self.pool.join()
+        self.started.close()
+
+
+_guarded_pool: Optional[_GuardedPool] = None
+# One guarded parse at a time uses the pool; it already keeps every core busy
+_guarded_lock = threading.Lock()
+_guarded_calls = counter()
+
+
+def _get_guarded_pool(parser: AssetParser, workers: int) -> _GuardedPool:
+    """The shared pool (caller holds _guarded_lock), started again for another parser or more workers"""
+    global _guarded_pool
+    if _guarded_pool is not None and (_guarded_pool.parser_key != parser.cache_key or _guarded_pool.workers < workers):
+        _guarded_pool.terminate()
+        _guarded_pool = None
+    if _guarded_pool is None:
+        _guarded_pool = _GuardedPool(parser, workers)
+    return _guarded_pool
+
+
+def shutdown_guarded_pool() -> None:
+    """Stop the guarded worker processes; the next guarded parse starts new ones"""
+    global _guarded_pool
+    with _guarded_lock:
+        if _guarded_pool is not None:
+            _guarded_pool.terminate()
+            _guarded_pool = None
+
+
+atexit.register(shutdown_guarded_pool)
+
+
+def map_files_guarded(parser: AssetParser, func: Callable, items: Iterable[Any], budget: float = DEFAULT_TIME_BUDGET,
+                      workers: Optional[int] = None) -> Tuple[List[Any], Dict[int, str]]:
+    """Apply func(parser, item) to every item in worker processes, giving each file at most budget seconds
+
+    A regex stuck on a pathological report cannot be interrupted in-thread, so files are
+    handed out one at a time and a worker that overruns is killed with the pool; the other
+    files in flight are resubmitted on a fresh pool. A file's budget starts when a worker
+    picks it up. The pool is kept for later calls with the same parser, and calls take
+    turns on it. items is consumed lazily, so it can be a prefetching generator. Returns
+    (results, failures) where failures maps the index of every abandoned item to the reason.
+    """
+    global _guarded_pool
+    items = iter(items)
+    results: Dict[int, Any] = {}
+    failures: Dict[int, str] = {}
+    workers = max(1, workers or default_workers())
+    retry = deque()
+    count = 0
+    exhausted = False
+    with _guarded_lock:
+        while not exhausted or retry:
+            guarded = _get_guarded_pool(parser, workers)
+            call_id = next(_guarded_calls)
+            done = queue.Queue()
+            # index -> (item, deadline); the deadline allows for the wait until a worker picks the file up
+            running: Dict[int, Tuple[Any, float]] = {}
+            try:
+                while True:
+                    while len(running) < workers:
+                        if retry:
+                            i, item = retry.popleft()
+                        else:
+                            item = next(items, _END)
+                            if item is _END:
+                                exhausted = True
+                                break
+                            i, count = count, count + 1
+                        running[i] = (item, time.time() + PICKUP_TIMEOUT + budget)
+                        guarded.pool.apply_async(_guarded_call, (func, call_id, i, item),
+                                                 callback=lambda result, i=i: done.put((i, result, None)),
+                                                 error_callback=lambda error, i=i: done.put((i, None, error)))
+                    if not running:
+                        break
+                    for i, started_at in guarded.pickups(call_id):
+                        if i in running:
+                            running[i] = (running[i][0], started_at + budget)
+                    oldest = min(running, key=lambda i: running[i][1])
+                    remaining = running[oldest][1] - time.time()
+                    try:
+                        i, result, error = done.get(timeout=max(0.0, min(remaining, PICKUP_POLL)))
+                    except queue.Empty:
+                        if remaining > 0:
+                            continue
+                        failures[oldest] = f"no result within the {budget:g}s time budget (parser hung or worker died)"
+                        logger.warning(f"{_item_name(running.pop(oldest)[0])}: {failures[oldest]}, restarting the parse workers")
+                        # Everything else that was in flight starts over on the next pool
+                        retry.extendleft(sorted(((i, item) for i, (item, _) in running.items()), reverse=True))
+                        guarded.terminate()
+                        _guarded_pool = None
+                        break
+                    del running[i]
+                    if error is not None:
+                        failures[i] = f"parser crashed: {error}"
+                    else:
+                        results[i] = result
+            except BaseException:
+                # Files still in flight would hold up the next call
+                guarded.terminate()
+                _guarded_pool = None
+                raise
+    return [results.get(i) for i in range(count)], failures
+
+
+def parse_files(parser: AssetParser, paths: Sequence[Path], workers: Optional[int] = None,
+                chunk_size: Optional[int] = None, min_files: int = PARALLEL_MIN_FILES) -> List[Optional[Dict[str, Any]]]:
+    """Parse many reports, returning one asset (or None) per path in the same order"""
+    return map_files(parser, parse_one, paths, workers, chunk_size, min_files)
@@ -0,0 +1,278 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the cache database changes; an older one is emptied
+CACHE_FORMAT_VERSION = 2
+
+DEFAULT_CACHE_FILE = Path('.asset_cache') / 'parse_cache.sqlite'
+# Seconds a save waits for another process's write to finish
+BUSY_TIMEOUT = 10.0
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS entries (
+        path TEXT PRIMARY KEY,
+        parser TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        sha1 TEXT,
+        asset TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS quarantine (
+        path TEXT PRIMARY KEY,
+        parser TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        reason TEXT,
+        since TEXT
+    )""",
+]
+
+
+def file_digest(data: bytes) -> str:
+    """Content hash used to recognise a report that was rewritten without changes"""
+    return hashlib.sha1(data).hexdigest()
+
+
+class ParseCache:
+    """Persistent cache of parsed asset files, keyed by path and file fingerprint
+
+    An entry is reused when the file's size and mtime are unchanged. When only the
+    mtime moved, the content hash decides. Entries written by another parser version,
+    engine or field spec set are thrown away when the cache is opened.
+
+    Files that could not be parsed within the time budget are quarantined with a reason
+    and skipped until their size or mtime changes.
+
+    The cache is a SQLite database (WAL mode) with one row per report, shared by the
+    dashboard sessions, ingest_service.py and fleet_snapshot.py. Lookups read the rows
+    they need; changes are kept in memory and save() writes only those rows, in one
+    transaction, so the cost of a save follows the changed reports, not the fleet size.
+    Another process's rows are never rewritten, so concurrent saves lose nothing.
+    """
+
+    def __init__(self, parser_key: str, cache_file: Path = DEFAULT_CACHE_FILE):
+        self.parser_key = parser_key
+        self.cache_file = Path(cache_file)
+        self.stats = {'hits': 0, 'misses': 0, 'rehashed': 0, 'removed': 0, 'quarantined': 0}
+        self._seen = set()
+        # Changes not saved yet, key -> row (None: delete the row)
+        self._entries: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._quarantine: Dict[str, Optional[Dict[str, Any]]] = {}
+        # A dashboard session reruns on different threads; the lock serialises them
+        self._lock = threading.Lock()
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.cache_file), timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._open()
+
+    def _open(self) -> None:
+        with self._lock, self._connection:
+            version = self._connection.execute('PRAGMA user_version').fetchone()[0]
+            if version != CACHE_FORMAT_VERSION:
+                self._connection.execute('DROP TABLE IF EXISTS entries')
+                self._connection.execute('DROP TABLE IF EXISTS quarantine')
+            for statement in _SCHEMA:
+                self._connection.execute(statement)
+            self._connection.execute(f'PRAGMA user_version={CACHE_FORMAT_VERSION}')
+            dropped = self._connection.execute('DELETE FROM entries WHERE parser != ?', (self.parser_key,)).rowcount
+            self._connection.execute('DELETE FROM quarantine WHERE parser != ?', (self.parser_key,))
+        if dropped:
+            logger.info(f"Dropped {dropped} parse cache entries written by another parser version")
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _entry(self, key: str) -> Optional[Dict[str, Any]]:
+        if key in self._entries:
+            return self._entries[key]
+        with self._lock:
+            row = self._connection.execute('SELECT size, mtime_ns, sha1, asset FROM entries WHERE path = ?',
+                                           (key,)).fetchone()
+        if row is None:
+            return None
+        return {'size': row[0], 'mtime_ns': row[1], 'sha1': row[2], 'asset': json.loads(row[3])}
+
+    def _quarantine_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        if key in self._quarantine:
+            return self._quarantine[key]
+        with self._lock:
+            row = self._connection.execute('SELECT size, mtime_ns, reason, since FROM quarantine WHERE path = ?',
+                                           (key,)).fetchone()
+        if row is None:
+            return None
+        return {'size': row[0], 'mtime_ns': row[1], 'reason': row[2], 'since': row[3]}
+
+    @property
+    def quarantine(self) -> Dict[str, Dict[str, Any]]:
+        """Quarantined reports: path -> size, mtime_ns, reason and since"""
+        with self._lock:
+            quarantine = {path: {'size': size, 'mtime_ns': mtime_ns, 'reason': reason, 'since': since}
+                          for path, size, mtime_ns, reason, since in self._connection.execute(
+                              'SELECT path, size, mtime_ns, reason, since FROM quarantine')}
+        for key, entry in self._quarantine.items():
+            if entry is None:
+                quarantine.pop(key, None)
+            else:
+                quarantine[key] = entry
+        return quarantine
+
+    def lookup(self, file_path: Path, stat_result: os.stat_result, data: Optional[bytes] = None) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Return (hit, asset) for a file; on a hit the asset is a private copy of the cached parse
+
+        data is the file content, if the caller already has it; it is only needed when the
+        size matches but the mtime does not. A cached None means the file failed to parse.
+        """
+        key = str(file_path)
+        self._seen.add(key)
+        entry = self._entry(key)
+        if entry is None or entry['size'] != stat_result.st_size:
+            return False, None
+        if entry['mtime_ns'] != stat_result.st_mtime_ns:
+            if data is None:
+                try:
+                    data = file_path.read_bytes()
+                except OSError:
+                    return False, None
+            if file_digest(data) != entry['sha1']:
+                return False, None
+            # Same content written again: refresh the fingerprint so the next lookup is a plain stat match
+            entry['mtime_ns'] = stat_result.st_mtime_ns
+            self._entries[key] = entry
+            self.stats['rehashed'] += 1
+        self.stats['hits'] += 1
+        return True, copy.deepcopy(entry['asset'])
+
+    def store(self, file_path: Path, stat_result: os.stat_result, data: Optional[bytes], asset: Optional[Dict[str, Any]],
+              digest: Optional[str] = None) -> None:
+        """Remember the parse result for a file; failed parses (None) are cached too
+
+        Pass digest instead of data when the content was hashed elsewhere (e.g. in a worker process).
+        """
+        key = str(file_path)
+        self._seen.add(key)
+        self._entries[key] = {
+            'size': stat_result.st_size,
+            'mtime_ns': stat_result.st_mtime_ns,
+            'sha1': digest if digest is not None else file_digest(data),
+            'asset': copy.deepcopy(asset)
+        }
+        self.stats['misses'] += 1
+
+    def get_or_parse(self, parser, file_path: Path) -> Optional[Dict[str, Any]]:
+        """Return the asset for file_path, parsing it only if it is new or changed"""
+        try:
+            stat_result = file_path.stat()
+        except OSError as e:
+            logger.error(f"Cannot stat asset file {file_path}: {e}")
+            return None
+        if self.quarantine_reason(file_path, stat_result):
+            return None
+        hit, asset = self.lookup(file_path, stat_result)
+        if hit:
+            return asset
+        try:
+            data = file_path.read_bytes()
+        except OSError as e:
+            logger.error(f"Cannot read asset file {file_path}: {e}")
+            return None
+        try:
+            asset = parser.parse_asset_bytes(data, file_path, stat_result.st_mtime)
+        except Exception as e:
+            logger.error(f"Error parsing asset file {file_path}: {e}")
+            asset = None
+        self.store(file_path, stat_result, data, asset)
+        return asset
+
+    def quarantine_reason(self, file_path: Path, stat_result: os.stat_result) -> Optional[str]:
+        """Why file_path is quarantined, or None; a changed file is released from quarantine"""
+        key = str(file_path)
+        entry = self._quarantine_entry(key)
+        if entry is None:
+            return None
+        self._seen.add(key)
+        if entry['size'] == stat_result.st_size and entry['mtime_ns'] == stat_result.st_mtime_ns:
+            self.stats['quarantined'] += 1
+            return entry['reason']
+        logger.info(f"{file_path} changed, releasing it from quarantine")
+        self._quarantine[key] = None
+        return None
+
+    def add_quarantine(self, file_path: Path, stat_result: os.stat_result, reason: str) -> None:
+        """Skip file_path on later runs until it changes"""
+        key = str(file_path)
+        self._seen.add(key)
+        self._entries[key] = None
+        self._quarantine[key] = {
+            'size': stat_result.st_size,
+            'mtime_ns': stat_result.st_mtime_ns,
+            'reason': reason,
+            'since': datetime.now().isoformat(timespec='seconds')
+        }
+        self.stats['quarantined'] += 1
+        logger.warning(f"Quarantined {file_path}: {reason}")
+
+    def forget(self, file_path: Path) -> None:
+        """Drop the entry and any quarantine of a report that was deleted"""
+        key = str(file_path)
+        self._seen.discard(key)
+        if self._entry(key) is not None:
+            self.stats['removed'] += 1
+        self._entries[key] = None
+        self._quarantine[key] = None
+
+    def prune(self, keep: Optional[Iterable[str]] = None) -> None:
+        """Drop entries for files that were not looked up in this run (deleted reports)"""
+        keep = set(keep) if keep is not None else self._seen
+        with self._lock:
+            stored = [path for (path,) in self._connection.execute('SELECT path FROM entries')]
+            quarantined = [path for (path,) in self._connection.execute('SELECT path FROM quarantine')]
+        for key in stored + [key for key, entry in self._entries.items() if entry is not None]:
+            if key not in keep and self._entries.get(key, True) is not None:
+                self._entries[key] = None
+                self.stats['removed'] += 1
+        for key in quarantined + list(self._quarantine):
+            if key not in keep:
+                self._quarantine[key] = None
+
+    def save(self) -> None:
+        """Write the entries changed since the last save, in one transaction"""
+        if not self._entries and not self._quarantine:
+            return
+        entries, self._entries = self._entries, {}
+        quarantine, self._quarantine = self._quarantine, {}
+        try:
+            with self._lock, self._connection:
+                for key, entry in entries.items():
+                    if entry is None:
+                        self._connection.execute('DELETE FROM entries WHERE path = ?', (key,))
+                    else:
+                        self._connection.execute(
+                            'INSERT OR REPLACE INTO entries (path, parser, size, mtime_ns, sha1, asset) VALUES (?, ?, ?, ?, ?, ?)',
+                            (key, self.parser_key, entry['size'], entry['mtime_ns'], entry['sha1'], json.dumps(entry['asset'])))
+                for key, entry in quarantine.items():
+                    if entry is None:
+                        self._connection.execute('DELETE FROM quarantine WHERE path = ?', (key,))
+                    else:
+                        self._connection.execute(
+                            'INSERT OR REPLACE INTO quarantine (path, parser, size, mtime_ns, reason, since) VALUES (?, ?, ?, ?, ?, ?)',
+                            (key, self.parser_key, entry['size'], entry['mtime_ns'], entry['reason'], entry['since']))
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.error(f"Could not write parse cache {self.cache_file}: {e}")
+            # Kept for the next save, unless newer changes replaced them meanwhile
+            self._entries = {**entries, **self._entries}
+            self._quarantine = {**quarantine, **self._quarantine}
+
+    def summary(self) -> str:
+        """Short hit/miss line for logs and the dashboard header"""
+        return f"{self.stats['hits']} cached, {self.stats['misses']} parsed"
@@ -0,0 +1,117 @@
+import functools
+import time
+from typing import Dict, Any, List, Callable
+
+# AssetParser methods timed when profiling is on
+PROFILED_METHODS = (
+    'parse_asset_file', 'parse_asset_content', 'tokenize_content', 'parse_memory_size', 'parse_storage_info',
+    'parse_network_info', 'parse_software_list', 'parse_adobe_autodesk', 'parse_shared_folders',
+    'parse_stored_credentials', 'parse_bitlocker_status', 'parse_systeminfo',
+)
+
+
+class ParseProfiler:
+    """Cumulative time, call and match/miss counts per field pattern and per parser method
+
+    A call counts as a match when it returns something truthy. Pattern statistics come
+    from searching each field's patterns on their own, in priority order and stopping at
+    the first hit, the way per-field extraction works; offset is where the pattern
+    matched, or the content length on a miss, i.e. how far into the file it had to scan.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.methods: Dict[str, Dict[str, float]] = {}
+        self.patterns: Dict[tuple, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _new_entry() -> Dict[str, float]:
+        return {'calls': 0, 'matches': 0, 'misses': 0, 'seconds': 0.0}
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """Return func timed under name"""
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                entry = self.methods.get(name)
+                if entry is None:
+                    entry = self.methods[name] = self._new_entry()
+                entry['seconds'] += time.perf_counter() - t0
+                entry['calls'] += 1
+            if result:
+                entry['matches'] += 1
+            else:
+                entry['misses'] += 1
+            return result
+        return timed
+
+    def instrument(self, parser) -> None:
+        """Time every profiled method of one parser instance (instance attributes, the class is untouched)"""
+        for name in PROFILED_METHODS:
+            setattr(parser, name, self.wrap(name, getattr(parser, name)))
+        parser.field_matcher.match = self.wrap('field_sweep', parser.field_matcher.match)
+
+    def profile_patterns(self, field_matcher, field_names, content: str) -> None:
+        """Search each field's patterns one by one against content and record the cost of each"""
+        self.files += 1
+        length = len(content)
+        for name in field_names:
+            for priority, pattern in enumerate(field_matcher._compiled.get(name, [])):
+                entry = self.patterns.get((name, priority))
+                if entry is None:
+                    entry = self.patterns[(name, priority)] = dict(self._new_entry(), pattern=pattern.pattern, offset=0)
+                t0 = time.perf_counter()
+                match = pattern.search(content)
+                entry['seconds'] += time.perf_counter() - t0
+                entry['calls'] += 1
+                if match:
+                    entry['matches'] += 1
+                    entry['offset'] += match.start()
+                    break
+                entry['misses'] += 1
+                entry['offset'] += length
+
+    def reset(self) -> None:
+        self.files = 0
+        self.methods.clear()
+        self.patterns.clear()
+
+    def report(self) -> Dict[str, Any]:
+        """Structured report, slowest first"""
+        def row(entry):
+            calls = entry['calls'] or 1
+            return {
+                'calls': entry['calls'],
+                'matches': entry['matches'],
+                'misses': entry['misses'],
+                'total_ms': entry['seconds'] * 1e3,
+                'mean_us': entry['seconds'] / calls * 1e6,
+            }
+
+        patterns: List[Dict[str, Any]] = [
+            dict(field=name, priority=priority, pattern=entry['pattern'],
+                 mean_offset=entry['offset'] / (entry['calls'] or 1), **row(entry))
+            for (name, priority), entry in self.patterns.items()
+        ]
+        methods = [dict(method=name, **row(entry)) for name, entry in self.methods.items()]
+        return {
+            'files': self.files,
+            'patterns': sorted(patterns, key=lambda r: r['total_ms'], reverse=True),
+            'methods': sorted(methods, key=lambda r: r['total_ms'], reverse=True),
+        }
+
+    def format_report(self, limit: int = 15) -> str:
+        """Plain-text tables of the slowest patterns and methods"""
+        report = self.report()
+        lines = [f"Profiled {report['files']} files", '', 'Patterns (per-field search, priority order):']
+        for r in report['patterns'][:limit]:
+            lines.append(f"  {r['field']:<18} #{r['priority']} {r['total_ms']:9.2f} ms {r['calls']:7} calls "
+                         f"{r['matches']:7} hit {r['misses']:7} miss  offset {r['mean_offset']:8.0f}  {r['pattern'][:50]}")
+        lines += ['', 'Methods:']
+        for r in report['methods']:
+            lines.append(f"  {r['method']:<26} {r['total_ms']:9.2f} ms {r['calls']:7} calls "
+                         f"{r['matches']:7} hit {r['misses']:7} miss  {r['mean_us']:8.1f} us/call")
+        return '\n'.join(lines)
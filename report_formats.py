@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, List, Tuple, Iterable
+
+# Name recorded for reports that match no known layout and go through the generic field specs
+GENERIC_FORMAT = 'generic'
+
+# Fingerprints only look at the first labelled lines of a report, within its first characters
+HEAD_LINES = 8
+HEAD_CHARS = 2048
+
+
+@dataclass(frozen=True)
+class ReportFormat:
+    """One layout of the inventory script's report
+
+    head are labels that appear, in this order, among the first HEAD_LINES labelled
+    lines. labels lists, per field, the only labels this layout writes for it; fields
+    left out keep every label of the generic spec. disks_title is the (lower-cased)
+    title of the layout's Local Disks section.
+    """
+    name: str
+    head: Tuple[str, ...]
+    disks_title: Optional[str] = None
+    labels: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()
+
+    def matches(self, head_labels: List[str]) -> bool:
+        position = 0
+        for label in self.head:
+            try:
+                position = head_labels.index(label, position) + 1
+            except ValueError:
+                return False
+        return True
+
+
+# Known layouts, most common first
+REPORT_FORMATS = (
+    # Current script: "Hostname", "CPU"/"RAM" and "=== Local Disks (Space & Type) ==="
+    ReportFormat('infopc-space-type', head=('IP Address', 'Hostname', 'PC Domain'),
+                 disks_title='local disks (space & type)',
+                 labels=(
+                     ('computer_name', ('Hostname',)),
+                     ('ip_address', ('IP Address',)),
+                     ('os_version', ('OS Version',)),
+                     ('manufacturer', ('System Manufacturer',)),
+                     ('model', ('System Model',)),
+                     ('processor', ('CPU',)),
+                     ('memory', ('RAM',)),
+                     ('anydesk_id', ('AnyDesk ID',)),
+                     ('user_email', ('User Email(s)',)),
+                     ('gpu', ('GPU',)),
+                     ('bios_version', ('BIOS Version',)),
+                     ('windows_language', ('Windows Language',)),
+                     ('antivirus', ('Antivirus',)),
+                     ('office_version', ('Office Version',)),
+                     ('os_activation', ('OS Activation',)),
+                     ('network_mode', ('Network Mode',)),
+                     ('os_install_date', ('OS Install Date',)),
+                     ('disk_drive', ()),
+                 )),
+    # Older script: "Computer Name" and "=== Local Disks (in MB) ==="
+    ReportFormat('infopc-mb', head=('Computer Name',), disks_title='local disks (in mb)',
+                 labels=(
+                     ('computer_name', ('Computer Name',)),
+                     ('disk_drive', ()),
+                 )),
+)
+
+
+def head_labels(content: str, limit: int = HEAD_LINES) -> List[str]:
+    """Labels of the first limit 'Label: value' lines of a report"""
+    labels = []
+    for line in content[:HEAD_CHARS].lstrip('\ufeff').split('\n'):
+        label, sep, value = line.partition(':')
+        if sep and label.strip():
+            labels.append(label.strip())
+            if len(labels) == limit:
+                break
+    return labels
+
+
+def fingerprint(content: str, formats: Iterable[ReportFormat] = REPORT_FORMATS) -> Optional[ReportFormat]:
+    """The known layout of a report, judged from its first lines, or None"""
+    labels = head_labels(content)
+    for report_format in formats:
+        if report_format.matches(labels):
+            return report_format
+    return None
+
+
+class FormatStats:
+    """Reports parsed and parse time per report format"""
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        self.counts[name] = self.counts.get(name, 0) + 1
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def __bool__(self):
+        return bool(self.counts)
+
+    def rows(self) -> List[Tuple[str, int, float]]:
+        """(format, reports, seconds), most frequent format first"""
+        return sorted(((name, count, self.seconds[name]) for name, count in self.counts.items()),
+                      key=lambda row: -row[1])
+
+    def summary(self) -> str:
+        return ', '.join(f"{name} {count} ({seconds / count * 1000:.2f} ms/report)"
+                         for name, count, seconds in self.rows())
@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the cache file changes
+SCAN_CACHE_FORMAT_VERSION = 1
+
+DEFAULT_SCAN_CACHE_FILE = Path('.asset_cache') / 'scan_cache.json'
+# Seconds a result is fresh, a failed scan's result is fresh, and a stale result may still be shown
+DEFAULT_TTL = 900.0
+DEFAULT_FAILURE_TTL = 60.0
+DEFAULT_MAX_STALE = 86400.0
+
+
+def scanned_at(at: float) -> str:
+    """The ISO time a result was taken, as recorded in network_info['scanned_at']"""
+    return datetime.fromtimestamp(at).isoformat(timespec='seconds')
+
+
+class ScanCache:
+    """Persistent scan results keyed by address and scan type, each with a time to live
+
+    A result younger than ttl (failure_ttl if the scan failed) is fresh and is reused
+    without scanning. An older one is stale: it is still shown, up to max_stale, while the
+    caller scans again. The file is shared by every session and process; save() merges
+    in what the others wrote and keeps the newer result for each key.
+    """
+
+    def __init__(self, cache_file: Path = DEFAULT_SCAN_CACHE_FILE, ttl: float = DEFAULT_TTL,
+                 failure_ttl: float = DEFAULT_FAILURE_TTL, max_stale: float = DEFAULT_MAX_STALE):
+        self.cache_file = Path(cache_file)
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.max_stale = max_stale
+        # Scan workers store from their own threads
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = self._read_file()
+        self.stats = {'hits': 0, 'stale': 0, 'misses': 0}
+        self._dirty = False
+
+    @staticmethod
+    def _key(ip_addr: str, scan_type: str) -> str:
+        return f"{scan_type}|{ip_addr}"
+
+    def _read_file(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable scan cache {self.cache_file}: {e}")
+            return {}
+        if data.get('format') != SCAN_CACHE_FORMAT_VERSION:
+            return {}
+        return data.get('entries', {})
+
+    def _expires(self, entry: Dict[str, Any]) -> float:
+        return entry['at'] + (self.failure_ttl if entry['result'].get('error_message') else self.ttl)
+
+    def reload(self) -> None:
+        """Take in results other sessions or processes saved since"""
+        entries = self._read_file()
+        with self._lock:
+            for key, entry in entries.items():
+                if key not in self.entries or self.entries[key]['at'] < entry['at']:
+                    self.entries[key] = entry
+
+    def lookup(self, ip_addr: str, scan_type: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """(result, fresh) for an address; result is None when there is none worth showing"""
+        now = time.time()
+        with self._lock:
+            entry = self.entries.get(self._key(ip_addr, scan_type))
+            if entry is None or now - entry['at'] > self.max_stale:
+                self.stats['misses'] += 1
+                return None, False
+            result = dict(entry['result'], scanned_at=scanned_at(entry['at']))
+            if now < self._expires(entry):
+                self.stats['hits'] += 1
+                return result, True
+            self.stats['stale'] += 1
+            return result, False
+
+    def store(self, ip_addr: str, scan_type: str, result: Dict[str, Any], at: Optional[float] = None) -> Dict[str, Any]:
+        """Remember a result; returns it with its scanned_at time"""
+        at = time.time() if at is None else at
+        with self._lock:
+            self.entries[self._key(ip_addr, scan_type)] = {
+                'at': at, 'result': {key: value for key, value in result.items() if key != 'scanned_at'}}
+            self._dirty = True
+        return dict(result, scanned_at=scanned_at(at))
+
+    def hit_rate(self) -> Optional[float]:
+        """Share of lookups answered from the cache, stale ones included; None before the first lookup"""
+        with self._lock:
+            lookups = sum(self.stats.values())
+            return (self.stats['hits'] + self.stats['stale']) / lookups if lookups else None
+
+    def summary(self) -> str:
+        with self._lock:
+            return f"{self.stats['hits']} fresh, {self.stats['stale']} stale, {self.stats['misses']} missed"
+
+    def save(self) -> None:
+        """Merge in other writers' results, drop results too old to show, and write the file atomically"""
+        if not self._dirty:
+            return
+        self.reload()
+        now = time.time()
+        with self._lock:
+            self.entries = {key: entry for key, entry in self.entries.items() if now - entry['at'] <= self.max_stale}
+            data = {'format': SCAN_CACHE_FORMAT_VERSION, 'entries': dict(self.entries)}
+            self._dirty = False
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Per-process and per-thread temporary name: sessions save from their own scan workers
+            tmp_file = self.cache_file.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            logger.error(f"Could not save scan cache {self.cache_file}: {e}")
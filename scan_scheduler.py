@@ -0,0 +1,296 @@
+import concurrent.futures
+import ipaddress
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterable, Tuple, Deque
+
+from network_scan import run_nmap_scan
+from scan_cache import ScanCache
+
+logger = logging.getLogger(__name__)
+
+# Job priorities, most urgent first
+PRIORITY_ON_DEMAND = 0
+PRIORITY_STALE = 1
+PRIORITY_ROUTINE = 2
+PRIORITY_NAMES = {PRIORITY_ON_DEMAND: 'on demand', PRIORITY_STALE: 'stale', PRIORITY_ROUTINE: 'routine'}
+
+DEFAULT_JOBS_FILE = Path('.asset_cache') / 'full_scan_jobs.json'
+# Bump when the layout of the jobs file changes
+JOBS_FORMAT_VERSION = 1
+# Full scans at once in total and per /24 subnet
+DEFAULT_MAX_CONCURRENT = 4
+DEFAULT_PER_SUBNET = 1
+# Tries per job, and seconds before the first retry (doubled for each further one)
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 30.0
+# Seconds between writes of the jobs file while the queue changes
+SAVE_INTERVAL = 5.0
+# Seconds a full scan is assumed to take before one has finished
+INITIAL_SCAN_SECONDS = 60.0
+
+
+def subnet_of(ip_addr: str) -> str:
+    """The /24 an IPv4 address belongs to; any other target is a subnet of its own"""
+    try:
+        return str(ipaddress.IPv4Network(f"{ip_addr.strip()}/24", strict=False))
+    except ValueError:
+        return ip_addr
+
+
+@dataclass
+class ScanJob:
+    address: str
+    priority: int
+    enqueued_at: float
+    attempts: int = 0
+    # Earliest start, for a retry waiting out its backoff
+    not_before: float = 0.0
+    last_error: Optional[str] = None
+
+
+class FullScanScheduler:
+    """Queue of nmap Full Scans, run in the background within global and per-/24 limits
+
+    Jobs run by priority: on demand from a card, then assets whose cached full scan went
+    stale, then routine scans of the fleet. Within a priority the /24 subnets take turns,
+    so one large subnet cannot hold up the others. A failed scan is retried with growing
+    delays, up to MAX_ATTEMPTS tries. Results go into the scan cache under "Full Scan",
+    and sessions pick them up with results_since(). The queue is saved to jobs_file and
+    picked up again after a restart; jobs that were running start over.
+    """
+
+    def __init__(self, nmap_executable_path: str = "nmap", cache: Optional[ScanCache] = None,
+                 jobs_file: Optional[Path] = DEFAULT_JOBS_FILE, max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                 per_subnet: int = DEFAULT_PER_SUBNET):
+        self.nmap_executable_path = nmap_executable_path
+        self.cache = cache
+        self.jobs_file = Path(jobs_file) if jobs_file else None
+        self.max_concurrent = max(1, max_concurrent)
+        self.per_subnet = max(1, per_subnet)
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_concurrent,
+                                                               thread_name_prefix='full-scan')
+        # address -> job, whether queued, waiting to retry or running
+        self._jobs: Dict[str, ScanJob] = {}
+        # priority -> subnet -> queued jobs; a subnet moves to the back after each job it starts
+        self._queues: Dict[int, Dict[str, Deque[ScanJob]]] = {priority: {} for priority in PRIORITY_NAMES}
+        self._delayed: List[ScanJob] = []
+        self._running: Dict[str, ScanJob] = {}
+        self._running_subnets: Counter = Counter()
+        # address -> (sequence number, result) of finished scans
+        self._results: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._sequence = 0
+        self._average_seconds = INITIAL_SCAN_SECONDS
+        self._saved_at = 0.0
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if self.jobs_file is None:
+            return
+        try:
+            with open(self.jobs_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable full scan jobs {self.jobs_file}: {e}")
+            return
+        if data.get('format') != JOBS_FORMAT_VERSION:
+            return
+        with self._cond:
+            for item in data.get('jobs', []):
+                job = ScanJob(**item)
+                self._jobs[job.address] = job
+                if job.not_before > time.time():
+                    self._delayed.append(job)
+                else:
+                    self._enqueue(job)
+            if self._jobs:
+                logger.info(f"Resuming {len(self._jobs)} full scan jobs from {self.jobs_file}")
+                self._start()
+
+    def _save(self) -> None:
+        """Write the queue (caller holds the lock); running jobs are saved as queued"""
+        self._dirty = False
+        self._saved_at = time.time()
+        if self.jobs_file is None:
+            return
+        try:
+            self.jobs_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.jobs_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'format': JOBS_FORMAT_VERSION, 'jobs': [asdict(job) for job in self._jobs.values()]}, f)
+            os.replace(tmp_file, self.jobs_file)
+        except OSError as e:
+            logger.error(f"Could not save full scan jobs {self.jobs_file}: {e}")
+
+    def _enqueue(self, job: ScanJob, front: bool = False) -> None:
+        queue = self._queues[job.priority].setdefault(subnet_of(job.address), deque())
+        if front:
+            queue.appendleft(job)
+        else:
+            queue.append(job)
+
+    def _dequeue(self, job: ScanJob) -> None:
+        subnets = self._queues[job.priority]
+        subnet = subnet_of(job.address)
+        if job in subnets.get(subnet, ()):
+            subnets[subnet].remove(job)
+            if not subnets[subnet]:
+                del subnets[subnet]
+
+    def _publish(self, address: str, result: Dict[str, Any]) -> None:
+        self._sequence += 1
+        self._results[address] = (self._sequence, result)
+
+    def _start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='full-scan-scheduler', daemon=True)
+            self._thread.start()
+
+    def submit(self, addresses: Iterable[str], priority: int = PRIORITY_ROUTINE) -> int:
+        """Queue full scans of addresses; returns the number of jobs queued or moved up
+
+        On demand, a scan runs even if the cache has a fresh result. Otherwise a fresh
+        cached result is published without a scan, and a stale one is published and
+        scanned again with at least stale priority. An address already queued keeps one
+        job, at the more urgent of the two priorities.
+        """
+        queued = 0
+        now = time.time()
+        with self._cond:
+            for address in dict.fromkeys(addresses):
+                job_priority = priority
+                if priority != PRIORITY_ON_DEMAND and self.cache is not None:
+                    cached, fresh = self.cache.lookup(address, "Full Scan")
+                    if cached is not None:
+                        self._publish(address, cached)
+                    if fresh:
+                        continue
+                    if cached is not None:
+                        job_priority = min(priority, PRIORITY_STALE)
+                job = self._jobs.get(address)
+                if job is None:
+                    job = self._jobs[address] = ScanJob(address, job_priority, now)
+                elif address in self._running or (job.priority <= job_priority and job not in self._delayed):
+                    continue
+                elif job in self._delayed:
+                    if job_priority != PRIORITY_ON_DEMAND:
+                        continue
+                    # Asked for from a card: no need to wait out the backoff
+                    self._delayed.remove(job)
+                    job.not_before = 0.0
+                else:
+                    self._dequeue(job)
+                job.priority = min(job.priority, job_priority)
+                self._enqueue(job, front=job.priority == PRIORITY_ON_DEMAND)
+                queued += 1
+            if queued:
+                self._dirty = True
+                self._start()
+                self._cond.notify()
+        return queued
+
+    def results_since(self, sequence: int) -> Tuple[int, Dict[str, Dict[str, Any]]]:
+        """(latest sequence number, address -> result) of the scans finished after sequence"""
+        with self._cond:
+            if sequence >= self._sequence:
+                return self._sequence, {}
+            return self._sequence, {address: result for address, (number, result) in self._results.items()
+                                    if number > sequence}
+
+    def job_priority(self, address: str) -> Optional[str]:
+        """Priority name of the address's job, or None when it has none"""
+        with self._cond:
+            job = self._jobs.get(address)
+            return PRIORITY_NAMES[job.priority] if job is not None else None
+
+    def status(self) -> Dict[str, Any]:
+        """Queued, waiting to retry and running jobs, and the estimated seconds until the queue is done"""
+        with self._cond:
+            queued = sum(len(queue) for subnets in self._queues.values() for queue in subnets.values())
+            remaining = queued + len(self._delayed) + len(self._running)
+            # Subnet limits can keep fewer scans running; the estimate assumes they do not
+            slots = min(self.max_concurrent, remaining) or 1
+            return {'queued': queued, 'retrying': len(self._delayed), 'running': len(self._running),
+                    'eta_seconds': self._average_seconds * remaining / slots if remaining else 0.0}
+
+    def _next_job(self) -> Optional[ScanJob]:
+        for priority in sorted(self._queues):
+            subnets = self._queues[priority]
+            for subnet in list(subnets):
+                if self._running_subnets[subnet] >= self.per_subnet:
+                    continue
+                queue = subnets.pop(subnet)
+                job = queue.popleft()
+                if queue:
+                    # To the back of the rotation: the other subnets go first next time
+                    subnets[subnet] = queue
+                return job
+        return None
+
+    def _run(self) -> None:
+        with self._cond:
+            while True:
+                now = time.time()
+                for job in [job for job in self._delayed if job.not_before <= now]:
+                    self._delayed.remove(job)
+                    self._enqueue(job)
+                while len(self._running) < self.max_concurrent:
+                    job = self._next_job()
+                    if job is None:
+                        break
+                    job.attempts += 1
+                    self._running[job.address] = job
+                    self._running_subnets[subnet_of(job.address)] += 1
+                    try:
+                        self._executor.submit(self._scan, job, self.nmap_executable_path)
+                    except RuntimeError:
+                        # The interpreter is shutting down; the job stays in the saved queue
+                        self._thread = None
+                        return
+                if self._dirty and (not self._jobs or now - self._saved_at >= SAVE_INTERVAL):
+                    self._save()
+                if not self._jobs:
+                    self._thread = None
+                    return
+                timeout = SAVE_INTERVAL
+                if self._delayed:
+                    timeout = min(timeout, max(0.0, min(job.not_before for job in self._delayed) - now))
+                self._cond.wait(timeout)
+
+    def _scan(self, job: ScanJob, nmap_executable_path: str) -> None:
+        started = time.time()
+        try:
+            result = run_nmap_scan(job.address, nmap_executable_path=nmap_executable_path, scan_type="Full Scan")
+        except Exception as e:
+            result = {"status": "unknown", "mac_address": None, "nmap_output": "", "error_message": f"Nmap scan error: {e}"}
+        finished = time.time()
+        final = not result.get('error_message') or job.attempts >= MAX_ATTEMPTS
+        if final and self.cache is not None:
+            result = self.cache.store(job.address, "Full Scan", result, at=finished)
+            self.cache.save()
+        with self._cond:
+            del self._running[job.address]
+            self._running_subnets[subnet_of(job.address)] -= 1
+            self._average_seconds = 0.8 * self._average_seconds + 0.2 * (finished - started)
+            if not final:
+                job.last_error = result['error_message']
+                job.not_before = finished + RETRY_DELAY * 2 ** (job.attempts - 1)
+                self._delayed.append(job)
+                logger.warning(f"Full scan of {job.address} failed (try {job.attempts} of {MAX_ATTEMPTS}), "
+                               f"retrying in {job.not_before - finished:.0f}s: {job.last_error}")
+            else:
+                del self._jobs[job.address]
+                self._publish(job.address, result)
+            self._dirty = True
+            self._cond.notify()
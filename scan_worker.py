@@ -0,0 +1,125 @@
+import logging
+import threading
+from collections.abc import Mapping
+from typing import Dict, Any, Optional, List, Tuple
+
+from network_scan import iter_quick_scans, QUICK_SCAN_THREADS
+from scan_cache import ScanCache
+
+logger = logging.getLogger(__name__)
+
+
+class ScanWorker:
+    """Runs quick scans on a background thread, so loading the inventory never waits for the network
+
+    submit() queues assets by name and address and returns at once. The worker thread
+    scans the queued addresses (iter_quick_scans) and keeps each result until the page
+    collects it with drain() on a later rerun. Assets sharing an address are scanned once.
+
+    With a cache, fresh results are handed back without a scan, and stale ones are handed
+    back at once and scanned again (the new result follows on a later drain).
+    """
+
+    def __init__(self, nmap_executable_path: str = "nmap", mode: str = 'batch', max_workers: int = QUICK_SCAN_THREADS,
+                 cache: Optional[ScanCache] = None):
+        # Read when a round of scans starts
+        self.nmap_executable_path = nmap_executable_path
+        self.mode = mode
+        self.max_workers = max_workers
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        # address -> asset names, queued and being scanned
+        self._waiting: Dict[str, List[str]] = {}
+        self._active: Dict[str, List[str]] = {}
+        # asset name -> (address scanned, result); (None, None) for an asset without an address
+        self._results: Dict[str, Tuple[Optional[str], Optional[Dict[str, Any]]]] = {}
+        # Bumped by a restart: results of older rounds are dropped
+        self._generation = 0
+        self.completed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    @property
+    def pending(self) -> int:
+        """Assets queued or being scanned"""
+        with self._lock:
+            return sum(len(names) for names in self._waiting.values()) + sum(len(names) for names in self._active.values())
+
+    @property
+    def busy(self) -> bool:
+        """Scans queued or running, or results not collected yet"""
+        with self._lock:
+            return bool(self._waiting or self._active or self._results)
+
+    def submit(self, targets: Mapping, restart: bool = False) -> None:
+        """Queue asset name -> address (None: nothing to scan); restart drops earlier scans and results"""
+        with self._lock:
+            if restart:
+                self._generation += 1
+                self._waiting.clear()
+                self._active.clear()
+                self._results.clear()
+                self.completed = 0
+            for name, ip_addr in targets.items():
+                if ip_addr is None:
+                    self._results[name] = (None, None)
+                    continue
+                if self.cache is not None:
+                    cached, fresh = self.cache.lookup(ip_addr, "Quick Scan")
+                    if cached is not None:
+                        self._results[name] = (ip_addr, cached)
+                    if fresh:
+                        continue
+                self._waiting.setdefault(ip_addr, []).append(name)
+            if self._waiting and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='quick-scans', daemon=True)
+                self._thread.start()
+
+    def drain(self) -> Dict[str, Tuple[Optional[str], Optional[Dict[str, Any]]]]:
+        """Results finished since the last call: asset name -> (address scanned, result)"""
+        with self._lock:
+            results, self._results = self._results, {}
+            return results
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._waiting:
+                    self._thread = None
+                    return
+                self._active, self._waiting = self._waiting, {}
+                generation = self._generation
+                addresses = list(self._active)
+                nmap_executable_path, mode, max_workers = self.nmap_executable_path, self.mode, self.max_workers
+            logger.info(f"Background quick scans ({mode}) of {len(addresses)} addresses")
+            scans = iter_quick_scans(addresses, nmap_executable_path, mode, max_workers)
+            try:
+                for ip_addr, nmap_result in scans:
+                    if self.cache is not None:
+                        nmap_result = self.cache.store(ip_addr, "Quick Scan", nmap_result)
+                    with self._lock:
+                        if generation != self._generation:
+                            break
+                        for name in self._active.pop(ip_addr, []):
+                            self._results[name] = (ip_addr, nmap_result)
+                            self.completed += 1
+            except Exception as e:
+                logger.error(f"Background quick scans failed: {e}", exc_info=True)
+                with self._lock:
+                    if generation == self._generation:
+                        # Reported as failed scans rather than left pending
+                        for ip_addr, names in self._active.items():
+                            for name in names:
+                                self._results[name] = (ip_addr, {"status": "unknown", "mac_address": None,
+                                                                 "nmap_output": "", "error_message": f"Scan error: {e}"})
+            finally:
+                # Stops the scans not started yet when the round was abandoned
+                scans.close()
+                if self.cache is not None:
+                    self.cache.save()
+            with self._lock:
+                if generation == self._generation:
+                    self._active = {}